@@ -14,8 +14,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .result import Result, ResultLinesCollector
-from .sshpool import SshPool
 from .tidenexception import TidenException
 from .util import *
 from .assertions import *
@@ -24,3 +22,27 @@ import pluggy
 hookimpl = pluggy.HookimplMarker("tiden")
 """Marker to be imported and used in Tiden hooks implementations"""
 
+# heavy modules (SSH client, XML report) are imported on first access to their names,
+# so that CLI entry points and test modules start fast
+_lazy_attrs = {
+    'Result': '.result',
+    'ResultLinesCollector': '.result',
+    'SshPool': '.sshpool',
+}
+
+__all__ = [name for name in globals() if not name.startswith('_')] + list(_lazy_attrs.keys())
+
+
+def __getattr__(name):
+    if name not in _lazy_attrs:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    from importlib import import_module
+
+    value = getattr(import_module(_lazy_attrs[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(_lazy_attrs.keys()))
+
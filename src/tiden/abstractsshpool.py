@@ -14,6 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from functools import partial
 from itertools import chain
 from random import choice
 from .util import log_print
@@ -22,6 +23,10 @@ debug_abstract_pool = False
 
 
 class AbstractSshPool:
+    process_table = None
+    # True if `exec_on_host_stream` yields lines as they arrive, not after the command is finished
+    supports_streaming = False
+
     def __init__(self, ssh_config=None, **kwargs):
         self.config = ssh_config if ssh_config is not None else {}
         self.hosts = self.config.get('hosts', [])
@@ -47,9 +52,80 @@ class AbstractSshPool:
     def exec_on_host(self, host, commands, **kwargs):
         raise NotImplementedError
 
+    def exec_on_host_stream(self, host, command, **kwargs):
+        """
+        Execute command at host and yield its output line by line.
+        Pools without native streaming fall back to buffered `exec_on_host`.
+        :param host: host or ip address
+        :param command: the command
+        :param kwargs:
+            timeout - command timeout, seconds
+            until - predicate(line), stop reading command output after the first matched line
+        :return: generator of output lines
+        """
+        until = kwargs.pop('until', None)
+        output = self.exec_on_host(host, [command], **kwargs)[host]
+        for line in (output[0] if output else '').splitlines(keepends=True):
+            yield line
+            if until is not None and until(line):
+                return
+
+    def exec_stream(self, commands, on_line, **kwargs):
+        """
+        Execute commands at hosts and pass their output to callback line by line, without buffering whole output.
+        :param commands: the list of commands to execute for hosts or dict of list of commands indexed by host
+        :param on_line: callback(host, command_idx, line), returning True stops reading output of that command
+        :param kwargs: timeout - command timeout, seconds
+        :return: None
+        """
+        for host, host_commands in self._get_commands_for_hosts(commands):
+            self._stream_on_host(host, host_commands, on_line, **kwargs)
+
+    def _stream_on_host(self, host, commands, on_line, **kwargs):
+        for command_idx, command in enumerate(commands):
+            for _ in self.exec_on_host_stream(host, command, until=partial(on_line, host, command_idx), **kwargs):
+                pass
+
+    def _get_commands_for_hosts(self, commands):
+        """
+        Normalize commands passed to exec
+        :param commands: the command, the list of commands for all hosts or dict of list of commands indexed by host
+        :return: list of [host, commands]
+        """
+        commands_for_hosts = []
+        if isinstance(commands, list):
+            for host in self.hosts:
+                commands_for_hosts.append(
+                    [host, commands]
+                )
+        elif isinstance(commands, dict):
+            for host in commands.keys():
+                commands_for_hosts.append(
+                    [host, commands[host]]
+                )
+        else:
+            for host in self.hosts:
+                commands_for_hosts.append(
+                    [host, [commands]]
+                )
+        return commands_for_hosts
+
     def jps(self, jps_args=None, hosts=None, skip_reserved_java_processes=True):
         raise NotImplementedError
 
+    def get_java_processes(self, hosts=None):
+        raise NotImplementedError
+
+    def get_process_table(self):
+        """
+        :return: shared snapshot of java processes of pool hosts, see `ProcessTable`
+        """
+        if self.process_table is None:
+            from .processtable import ProcessTable
+
+            self.process_table = ProcessTable(self)
+        return self.process_table
+
     def dirsize(self, dir_path, *args):
         raise NotImplementedError
 
@@ -62,6 +138,31 @@ class AbstractSshPool:
     def killall(self, name, sig=-9, skip_reserved_java_processes=True, hosts=None):
         raise NotImplementedError
 
+    def close(self):
+        pass
+
+    def run_async(self, coro):
+        """
+        Run coroutine using pool `*_async` methods and wait for result.
+        """
+        import asyncio
+
+        return asyncio.run(coro)
+
+    async def exec_async(self, commands, **kwargs):
+        """
+        Awaitable version of `exec`. Pools without native event loop run blocking `exec` in default executor.
+        """
+        import asyncio
+
+        return await asyncio.get_event_loop().run_in_executor(None, partial(self.exec, commands, **kwargs))
+
+    async def exec_on_host_async(self, host, commands, **kwargs):
+        import asyncio
+
+        return await asyncio.get_event_loop().run_in_executor(
+            None, partial(self.exec_on_host, host, commands, **kwargs))
+
     def exec_at_nodes(self, nodes, func: lambda node_id, node: str):
         """
         Execute per-node command at hosts
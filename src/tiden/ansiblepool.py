@@ -24,12 +24,16 @@ from ansible.playbook.play import Play
 from ansible.executor.task_queue_manager import TaskQueueManager
 from ansible.plugins.callback import CallbackBase
 
+from .abstractsshpool import AbstractSshPool
 from .sshpool import SshPool, log_print
 
 SEPARATOR = '_THIS_IS_SEPARATOR_'
 
 
 class AnsiblePool(SshPool):
+    # commands are run by ansible tasks, there are no SSH channels to stream from
+    supports_streaming = False
+
     def __init__(self, ssh_config, **kwargs):
         super(AnsiblePool, self).__init__(ssh_config, **kwargs)
 
@@ -191,6 +195,12 @@ class AnsiblePool(SshPool):
 
         return results_callback.result
 
+    def exec_on_host_stream(self, host, command, **kwargs):
+        """
+        Output is yielded after the command is finished, see `AbstractSshPool.exec_on_host_stream`
+        """
+        return AbstractSshPool.exec_on_host_stream(self, host, command, until=kwargs.get('until'))
+
     def connect(self):
         results_callback = TidenPingCallback()
 
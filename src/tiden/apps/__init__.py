@@ -14,13 +14,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .nodestatus import NodeStatus
-from .app import App
-from .appconfigbuilder import AppConfigBuilder
-from .appexception import AppException, MissedRequirementException
-from .appscontainer import AppsContainer
-from .appfactory import AppFactory
-from .javaapp import JavaApp
+_lazy_attrs = {
+    "App": ".app",
+    "AppConfigBuilder": ".appconfigbuilder",
+    "AppException": ".appexception",
+    "AppFactory": ".appfactory",
+    "AppsContainer": ".appscontainer",
+    "JavaApp": ".javaapp",
+    "MissedRequirementException": ".appexception",
+    "NodeStatus": ".nodestatus",
+}
 
 __all__ = [
     "App",
@@ -32,3 +35,21 @@ __all__ = [
     "MissedRequirementException",
     "NodeStatus",
 ]
+
+
+def __getattr__(name):
+    """
+    Application classes are imported on first access, so that importing single application package
+    (e.g. `tiden.apps.ignite`) does not import all others
+    """
+    if name not in _lazy_attrs:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    from importlib import import_module
+
+    value = getattr(import_module(_lazy_attrs[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(__all__))
@@ -21,6 +21,7 @@ from signal import SIGKILL, SIGTERM
 
 from .appexception import AppException, MissedRequirementException
 from .appconfigbuilder import AppConfigBuilder
+from .logcursors import LogCursors
 from .nodestatus import NodeStatus
 from .. import log_put, log_print
 from ..util import log_print
@@ -32,6 +33,7 @@ class App:
     nodes = {}
     config = None
     ssh: SshPool = None
+    log_cursors: LogCursors = None
     name = ''
     app_type = ''
     artifact_name = ''
@@ -46,6 +48,7 @@ class App:
             name, config, ssh = args[0], args[1], args[2]
             self.config = config
             self.ssh: SshPool = ssh
+            self.log_cursors = LogCursors(ssh)
             self.nodes = {}
             self.app_type = None
             self.name = name
@@ -148,55 +151,37 @@ class App:
             for attr_param in ['local_regex', 'remote_regex']:
                 if kwargs[attr_name].get(attr_param) is None:
                     raise AppException("Missed %s for attribute %s " % (attr_param, attr_name))
-        cmd = {}
         seek_attrs = sorted(kwargs.keys())
-        # Construct the dictionary with remote commands
         attrs = {}
+        requests = []
         for id in ids:
             attrs[id] = {}
-            host = self.nodes[id]['host']
+            patterns = []
             for attr_name in seek_attrs:
-                cat_tmpl = "echo {}; echo {}; cat {}".format(id, attr_name, self.nodes[id]['log'])
-                if cmd.get(host) is None:
-                    cmd[host] = []
-
-                cmd[host].append("{cat} | grep {options} '{condition}'".format(
-                    cat=cat_tmpl,
-                    options=kwargs[attr_name].get('remote_grep_options', ''),
-                    condition=kwargs[attr_name]['remote_regex'])
-                )
-        result = self.ssh.exec(cmd)
-        # Process the results
-        for host in result.keys():
-            cmd_outputs = list(result[host])
-            for cmd_output_idx in range(0, len(cmd_outputs)):
-                # Split command output to lines
-                lines = cmd_outputs[cmd_output_idx].split('\n')
-                # First line is node id
-                id = int(str(lines[0]).rstrip())
-                # Second line is attribute name
-                attr_name = str(lines[1]).rstrip()
-                # Set None for attribute
                 attrs[id][attr_name] = None
-                starting_point = len("{}\n{}".format(id, attr_name))
-                if kwargs[attr_name].get('ignore_multiline', False):
-                    sarched_str = cmd_outputs[cmd_output_idx][starting_point:].replace('\n', '')
+                patterns.append((kwargs[attr_name].get('remote_grep_options', ''), kwargs[attr_name]['remote_regex']))
+            requests.append((self.nodes[id]['host'], self.nodes[id]['log'], patterns))
+
+        def _set_attr(id, attr_name, searched_str):
+            m = search(kwargs[attr_name]['local_regex'], searched_str)
+            if m:
+                if kwargs[attr_name].get('get_all_found', False):
+                    val = m.groups()
                 else:
-                    sarched_str = cmd_outputs[cmd_output_idx][starting_point:]
-                m = search(
-                    kwargs[attr_name]['local_regex'],
-                    sarched_str
-                )
-                if m:
-                    if kwargs[attr_name].get('get_all_found', False):
-                        val = m.groups()
-                    else:
-                        val = m.group(1)
-                    attr_type = kwargs[attr_name].get('force_type', kwargs[attr_name].get('type'))
-                    # Set type
-                    if attr_type == 'int':
-                        val = int(val)
-                    attrs[id][attr_name] = val
+                    val = m.group(1)
+                attr_type = kwargs[attr_name].get('force_type', kwargs[attr_name].get('type'))
+                # Set type
+                if attr_type == 'int':
+                    val = int(val)
+                attrs[id][attr_name] = val
+
+        # Every log is read once for all attributes, only bytes appended since the previous grep are read
+        for id, attrs_lines in zip(ids, self.log_cursors.grep_patterns(requests)):
+            for attr_name, lines in zip(seek_attrs, attrs_lines):
+                searched_str = ''.join(lines)
+                if kwargs[attr_name].get('ignore_multiline', False):
+                    searched_str = searched_str.replace('\n', '')
+                _set_attr(id, attr_name, searched_str)
         return attrs
 
     def stop_nodes(self, *args):
@@ -229,7 +214,17 @@ class App:
                     self.nodes[id]['status'] = NodeStatus.KILLED
             else:
                 log_print(f'No node {id} in the grid to kill')
-        return self.ssh.exec(cmd)
+        result = self.ssh.exec(cmd)
+        self.invalidate_process_table()
+        return result
+
+    def invalidate_process_table(self):
+        """
+        Drop the snapshot of processes (`ProcessTable`) after nodes are started or killed
+        """
+        process_table = getattr(self.ssh, 'process_table', None)
+        if process_table is not None:
+            process_table.invalidate()
 
     def set_node_option(self, node_filter, opt_name, opt_value):
         """
@@ -14,7 +14,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from jinja2 import Environment, FileSystemLoader
+from hashlib import sha256
+from os import path, stat
 
 from tiden import log_print, TidenException
 
@@ -26,6 +27,11 @@ class AppConfigBuilder:
     """
     current_config_set = None
 
+    # jinja2 environments by templates directory, compiled templates are cached by environment
+    template_environments = {}
+    # (templates directory, template name): (template mtime, names of variables, names of included templates)
+    template_variables = {}
+
     def __init__(self, tiden_ssh, tiden_config, app):
         self.tiden_ssh = tiden_ssh
         self.tiden_config = tiden_config
@@ -33,6 +39,10 @@ class AppConfigBuilder:
         self.app = app
 
         self.config_sets = {}
+        # generated config path: hash of template and variables it was rendered with
+        self.rendered_configs = {}
+        # (local file path, remote directory): content hash of the file when it was uploaded there last time
+        self.deployed_files = {}
 
     def register_config_set(self, config_set_name):
         """
@@ -167,6 +177,8 @@ class AppConfigBuilder:
         :param node_id: (optional) build configuration files exclusive for that node id
         :return:
         """
+        test_resource_dir = self.tiden_config['rt']['test_resource_dir']
+
         # for all registered configs generate files
         for cfg_set_name, cfg_set in self.config_sets.items():
             # skip generating configs not in filter
@@ -215,18 +227,97 @@ class AppConfigBuilder:
 
             # render template
             for template, config in dict_configs.items():
-                rendered_string = Environment(loader=FileSystemLoader(self.tiden_config['rt']['test_resource_dir']),
-                                              trim_blocks=True) \
-                    .get_template(template) \
-                    .render({**variables, **self.tiden_config})
+                self.__render_config(test_resource_dir, template, "%s/%s" % (test_resource_dir, config), variables)
+
+    @classmethod
+    def get_template_environment(cls, templates_dir):
+        from jinja2 import Environment, FileSystemLoader
+
+        if templates_dir not in cls.template_environments:
+            cls.template_environments[templates_dir] = Environment(
+                loader=FileSystemLoader(templates_dir),
+                trim_blocks=True,
+                auto_reload=True,
+            )
+        return cls.template_environments[templates_dir]
+
+    @classmethod
+    def get_template_variable_names(cls, templates_dir, template, _visited=None):
+        """
+        Names of variables referenced by template and templates included (imported, extended) by it
+        :param templates_dir: templates directory
+        :param template: template name
+        :return: (<latest mtime of template files>, <set of names>),
+            names are None if name of included template is not constant
+        """
+        from jinja2 import meta
+
+        env = cls.get_template_environment(templates_dir)
+        source, file_name, _ = env.loader.get_source(env, template)
+        mtime = stat(file_name).st_mtime_ns
+        cached = cls.template_variables.get((templates_dir, template))
+        if cached is None or cached[0] != mtime:
+            parsed = env.parse(source)
+            cached = (
+                mtime,
+                set(meta.find_undeclared_variables(parsed)),
+                list(meta.find_referenced_templates(parsed)),
+            )
+            cls.template_variables[(templates_dir, template)] = cached
+        _, names, included_templates = cached
+        if None in included_templates:
+            return mtime, None
+
+        visited = _visited if _visited is not None else {template}
+        names = set(names)
+        for included_template in included_templates:
+            if included_template in visited:
+                continue
+            visited.add(included_template)
+            included_mtime, included_names = cls.get_template_variable_names(templates_dir, included_template, visited)
+            if included_names is None:
+                return mtime, None
+            mtime = max(mtime, included_mtime)
+            names.update(included_names)
+        return mtime, names
+
+    def __render_config(self, templates_dir, template, config_path, variables):
+        """
+        Render template to config file. Template is rendered only with variables referenced by it, config
+        is not rendered again while template and these variables are not changed, and file is not rewritten
+        when rendered content is the same.
+        """
+        mtime, names = self.get_template_variable_names(templates_dir, template)
+        if names is None:
+            context = {**variables, **self.tiden_config}
+        else:
+            context = {}
+            for name in names:
+                if name in self.tiden_config:
+                    context[name] = self.tiden_config[name]
+                elif name in variables:
+                    context[name] = variables[name]
+        render_key = sha256(repr((template, mtime, sorted(context.items(), key=lambda item: item[0])))
+                            .encode('utf-8')).hexdigest()
+        if self.rendered_configs.get(config_path) == render_key and path.isfile(config_path):
+            return
 
-                with open("%s/%s" % (self.tiden_config['rt']['test_resource_dir'], config), "w+") as config_file:
-                    config_file.write(rendered_string)
+        rendered_string = self.get_template_environment(templates_dir).get_template(template).render(context)
+        current_string = None
+        if path.isfile(config_path):
+            with open(config_path) as config_file:
+                current_string = config_file.read()
+        if current_string != rendered_string:
+            with open(config_path, "w+") as config_file:
+                config_file.write(rendered_string)
+        self.rendered_configs[config_path] = render_key
 
     def build_config_and_deploy(self, config_type=None, config_set_name=None, node_id=None):
+        """
+        Build config files and upload files of test resource directory changed since the last deploy
+        """
         from glob import glob
-        from os import path
-        from tiden.util import unix_path
+        from tiden.util import unix_path, md5_for_filename
 
         if isinstance(config_type, (list, tuple)):
             for type in config_type:
@@ -235,10 +326,16 @@ class AppConfigBuilder:
             self.build_config(config_type, config_set_name, node_id)
         files = []
         test_resource_dir = self.tiden_config['rt']['test_resource_dir']
+        remote_dir = self.tiden_config['rt']['remote']['test_module_dir']
+        deployed_files = {}
         for file in glob(f"{test_resource_dir}/*"):
             if path.isfile(file):
-                files.append(unix_path(file))
-        self.tiden_ssh.upload(files, self.tiden_config['rt']['remote']['test_module_dir'])
+                deployed_files[(file, remote_dir)] = md5_for_filename(file)
+                if self.deployed_files.get((file, remote_dir)) != deployed_files[(file, remote_dir)]:
+                    files.append(unix_path(file))
+        if files:
+            self.tiden_ssh.upload(files, remote_dir)
+        self.deployed_files.update(deployed_files)
 
     def __str__(self):
         res = ['\nApplication config for app %s:\n' % str(self.app.__name__),
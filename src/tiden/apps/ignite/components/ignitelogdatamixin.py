@@ -63,8 +63,7 @@ class IgniteLogDataMixin(IgniteNodesMixin):
                     default_value = if set, self.nodes (node_option_name) = default_value, if nothing find
         :return:
         """
-        commands = {}
-        result_order = {}
+        result_order = []
 
         if 'default_value' in kwargs:
             default_value = kwargs['default_value']
@@ -103,23 +102,18 @@ class IgniteLogDataMixin(IgniteNodesMixin):
         else:
             assert False, "Unknown host group!"
 
+        requests = []
         for node_idx in node_idx_filter:
             if 'log' in self.nodes[node_idx]:
-                node_idx_host = self.nodes[node_idx]['host']
-                if commands.get(node_idx_host) is None:
-                    commands[node_idx_host] = []
-                    result_order[node_idx_host] = []
-                commands[node_idx_host].append('grep -E "%s" %s' % (grep_text, self.nodes[node_idx]['log']))
-                result_order[node_idx_host].append(node_idx)
+                requests.append((self.nodes[node_idx]['host'], self.nodes[node_idx]['log'], 'grep -E "%s"' % grep_text))
+                result_order.append(node_idx)
             else:
                 print_red('There is no log for node %s' % node_idx)
-        results = self.ssh.exec(commands)
 
-        for host in results.keys():
-            for res_node_idx in range(0, len(results[host])):
-                m = findall(regex_match, results[host][res_node_idx])
-                if m:
-                    self.nodes[result_order[host][res_node_idx]][node_option_name] = m
+        for node_idx, lines in zip(result_order, self.log_cursors.grep(requests)):
+            m = findall(regex_match, ''.join(lines))
+            if m:
+                self.nodes[node_idx][node_option_name] = m
 
         return self._collect_msg(node_option_name, host_group)
 
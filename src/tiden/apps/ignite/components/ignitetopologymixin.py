@@ -21,6 +21,7 @@ from time import time, sleep
 from ...nodestatus import NodeStatus
 from ... import AppException
 from .ignitenodesmixin import IgniteNodesMixin
+from ..topologywatcher import TopologyWatcher
 from ....util import log_put, log_print, get_logger
 from ....tidenexception import TidenException
 from ....report.steps import step
@@ -61,6 +62,13 @@ class IgniteTopologyMixin(IgniteNodesMixin):
                 {'regex': '(^.+Failed to read magic header)',
                  'remote_grep_options': '-E'}
         }
+        self.topology_watcher = None
+
+    def teardown(self):
+        if self.topology_watcher is not None:
+            self.topology_watcher.stop()
+            self.topology_watcher = None
+        super().teardown()
 
     def set_snapshot_timeout(self, timeout):
         self.snapshot_timeout = timeout
@@ -78,6 +86,32 @@ class IgniteTopologyMixin(IgniteNodesMixin):
         ver, servers, clients, heap, CPUs and node
         """
         commands = {}
+        for node_idx in self._get_nodes_to_check(check_only_servers, exclude_nodes):
+            host = self.nodes[node_idx]['host']
+
+            if host not in commands:
+                commands[host] = []
+
+            if self.nodes[node_idx].get('log') is not None:
+                commands[host].append(
+                    'cat %s | grep -E "%s.+Topology snapshot" | tail -n 1000' % (
+                        self.nodes[node_idx]['log'],
+                        snapshot_text
+                    )
+                )
+
+        results = self.ssh.exec(commands)
+
+        output = []
+        if len(results) > 0:
+            for host in results.keys():
+                for host_results in results[host]:
+                    snapshot = self._get_latest_topology_snapshot(host_results.split('\n'))
+                    if snapshot:
+                        output.append(snapshot)
+        return output
+
+    def _get_nodes_to_check(self, check_only_servers=False, exclude_nodes=[]):
         nodes_to_check = self.get_all_default_nodes() + self.get_all_additional_nodes() + self.get_all_client_nodes()
         if check_only_servers:
             nodes_to_check = self.get_all_default_nodes() + self.get_all_additional_nodes()
@@ -85,44 +119,68 @@ class IgniteTopologyMixin(IgniteNodesMixin):
         if exclude_nodes:
             nodes_to_check = [node_id for node_id in nodes_to_check if node_id not in exclude_nodes]
 
-        for node_idx in nodes_to_check:
-            if self.nodes[node_idx].get('status', NodeStatus.DISABLED) in (NodeStatus.STARTED, NodeStatus.STARTING):
-                host = self.nodes[node_idx]['host']
+        return [node_idx for node_idx in nodes_to_check
+                if self.nodes[node_idx].get('status', NodeStatus.DISABLED) in (NodeStatus.STARTED, NodeStatus.STARTING)]
 
-                if host not in commands:
-                    commands[host] = []
+    @staticmethod
+    def _get_latest_topology_snapshot(lines):
+        """
+        Parse topology snapshot messages
+        :param lines: log lines
+        :return: the snapshot with the maximum version number or None
+        """
+        snapshots = {}
+        for node_data in lines:
+            match = search(
+                '\[(ver)=(\d+),.*(servers)=(\d+), (clients)=(\d+),.*(CPUs)=(\d+),.* (heap)=([0-9\.MBG]+).*\]',
+                node_data
+            )
+            if match:
+                snapshot = {}
+                for idx in range(1, 6):
+                    if match.group(2 * idx - 1) != 'heap':
+                        snapshot[match.group(2 * idx - 1)] = int(match.group(2 * idx))
+                    else:
+                        snapshot[match.group(2 * idx - 1)] = match.group(2 * idx)
+                snapshots[snapshot['ver']] = snapshot.copy()
+        if snapshots:
+            return snapshots[max(snapshots.keys())]
+        return None
 
-                if self.nodes[node_idx].get('log') is not None:
-                    commands[host].append(
-                        'cat %s | grep -E "%s.+Topology snapshot" | tail -n 1000' % (
-                            self.nodes[node_idx]['log'],
-                            snapshot_text
-                        )
-                    )
+    def _get_topology_watcher(self):
+        """
+        Logs watcher holds one SSH channel per host for the whole time, so it is used only when pool
+        streams command output and may open several channels per host. Otherwise (or when watcher failed)
+        topology is polled by `last_topology_snapshot`.
+        """
+        if not getattr(self.ssh, 'supports_streaming', False) or getattr(self.ssh, 'channels_per_host', 1) < 2:
+            return None
+        if self.topology_watcher is not None and self.topology_watcher.failed:
+            return None
+        if self.topology_watcher is None:
+            self.topology_watcher = TopologyWatcher(self.ssh, self.known_fatal_errors)
+        return self.topology_watcher
 
-        results = self.ssh.exec(commands)
+    def _watch_node_logs(self, watcher):
+        logs = {}
+        for node_idx in self._get_nodes_to_check():
+            if self.nodes[node_idx].get('log') is not None:
+                logs.setdefault(self.nodes[node_idx]['host'], []).append(self.nodes[node_idx]['log'])
+        watcher.watch(logs)
 
+    def _watched_topology_snapshots(self, watcher, snapshot_text='', check_only_servers=False, exclude_nodes=[]):
+        """
+        The same as `last_topology_snapshot` but takes snapshots found by logs watcher
+        """
         output = []
-        if len(results) > 0:
-            for host in results.keys():
-                for host_results in results[host]:
-                    host_snapshots = {}
-                    for node_data in host_results.split('\n'):
-                        match = search(
-                            '\[(ver)=(\d+),.*(servers)=(\d+), (clients)=(\d+),.*(CPUs)=(\d+),.* (heap)=([0-9\.MBG]+).*\]',
-                            node_data
-                        )
-                        if match:
-                            snapshot = {}
-                            for idx in range(1, 6):
-                                if match.group(2 * idx - 1) != 'heap':
-                                    snapshot[match.group(2 * idx - 1)] = int(match.group(2 * idx))
-                                else:
-                                    snapshot[match.group(2 * idx - 1)] = match.group(2 * idx)
-                            host_snapshots[snapshot['ver']] = snapshot.copy()
-                    if host_snapshots:
-                        # Store only snapshot with the maximum version number
-                        output.append(host_snapshots[max(host_snapshots.keys())])
+        for node_idx in self._get_nodes_to_check(check_only_servers, exclude_nodes):
+            if self.nodes[node_idx].get('log') is not None:
+                snapshot = self._get_latest_topology_snapshot([
+                    line for line in watcher.get_snapshots(self.nodes[node_idx]['log'])
+                    if search('%s.+Topology snapshot' % snapshot_text, line)
+                ])
+                if snapshot:
+                    output.append(snapshot)
         return output
 
     def get_current_topology_version(self, snapshot_text=''):
@@ -151,6 +209,8 @@ class IgniteTopologyMixin(IgniteNodesMixin):
         }
 
         snapshot_found = False
+        watcher = self._get_topology_watcher()
+        events_seen = 0
         started = int(time())
         timeout_counter = 0
         other_nodes = kwargs.get('other_nodes', 0)
@@ -177,10 +237,24 @@ class IgniteTopologyMixin(IgniteNodesMixin):
             )
             stdout.flush()
 
-            snapshots = self.last_topology_snapshot(snapshot_text,
-                                                    check_only_servers=kwargs.get('check_only_servers', False),
-                                                    exclude_nodes=kwargs.get('exclude_nodes_from_check', []))
-            errors = self.check_fatal_errors_in_logs()
+            if watcher and watcher.failed:
+                log_print('Logs watcher failed, topology snapshots are read from logs', color='red')
+                watcher.stop()
+                watcher = None
+            if watcher:
+                self._watch_node_logs(watcher)
+                events_seen = watcher.events_count
+                snapshots = self._watched_topology_snapshots(
+                    watcher,
+                    snapshot_text,
+                    check_only_servers=kwargs.get('check_only_servers', False),
+                    exclude_nodes=kwargs.get('exclude_nodes_from_check', []))
+                errors = self._watched_fatal_errors(watcher)
+            else:
+                snapshots = self.last_topology_snapshot(snapshot_text,
+                                                        check_only_servers=kwargs.get('check_only_servers', False),
+                                                        exclude_nodes=kwargs.get('exclude_nodes_from_check', []))
+                errors = self.check_fatal_errors_in_logs()
             if errors:
                 raise AppException('Found errors on start nodes:\n' + errors)
             # print(snapshots)
@@ -188,7 +262,7 @@ class IgniteTopologyMixin(IgniteNodesMixin):
             # Wait for at least one Topology snapshot
             skip_nodes_check = 'skip_nodes_check' in kwargs or 'exclude_nodes_from_check' in kwargs
             if not snapshots or (len(snapshots) < max_topology_nodes and not skip_nodes_check):
-                sleep(2)
+                self._wait_for_log_events(watcher, events_seen)
                 timeout_counter = int(time()) - started
                 continue
 
@@ -196,7 +270,7 @@ class IgniteTopologyMixin(IgniteNodesMixin):
             # Otherwise large topology under ZooKeeper may fail
             first_snapshot = snapshots.pop()
             if not all(first_snapshot['ver'] == snapshot['ver'] for snapshot in snapshots):
-                sleep(2)
+                self._wait_for_log_events(watcher, events_seen)
                 timeout_counter = int(time()) - started
                 continue
 
@@ -211,7 +285,7 @@ class IgniteTopologyMixin(IgniteNodesMixin):
             if snapshot_found:
                 break
 
-            sleep(2)
+            self._wait_for_log_events(watcher, events_seen)
             timeout_counter = int(time()) - started
         log_put(
             "Waiting for topology snapshot: server(s) %s/%s, client(s) %s/%s, timeout %s/%s sec %s " %
@@ -232,7 +306,13 @@ class IgniteTopologyMixin(IgniteNodesMixin):
                   % (server_num, client_num)
             raise TidenException(msg)
 
-    def check_fatal_errors_in_logs(self):
+    def _wait_for_log_events(self, watcher, events_seen):
+        if watcher:
+            watcher.wait_for_events(events_seen, 2)
+        else:
+            sleep(2)
+
+    def _get_starting_nodes_with_logs(self):
         node_ids = []
         for node_id in self.nodes.keys():
             if self.nodes[node_id]:
@@ -241,6 +321,10 @@ class IgniteTopologyMixin(IgniteNodesMixin):
                 elif self.nodes[node_id]['status'] == NodeStatus.STARTING and not self.nodes[node_id].get('log'):
                     log_print('Found node STARTING status and no log file:\n{}'.format(self.nodes[node_id]),
                               color='red')
+        return node_ids
+
+    def check_fatal_errors_in_logs(self):
+        node_ids = self._get_starting_nodes_with_logs()
         if len(node_ids) == 0:
             return
         known_fatal_errors_from_log = self.grep_log(*node_ids, **self.known_fatal_errors)
@@ -251,3 +335,14 @@ class IgniteTopologyMixin(IgniteNodesMixin):
                     message += f'Error in logs of node {node_id_errors}. {error[0]}: {error[1]}\n'
         return message
 
+    def _watched_fatal_errors(self, watcher):
+        """
+        The same as `check_fatal_errors_in_logs` but takes errors found by logs watcher
+        """
+        message = ''
+        for node_id in self._get_starting_nodes_with_logs():
+            errors = watcher.get_errors(self.nodes[node_id]['log'])
+            for error_name in self.known_fatal_errors.keys():
+                if errors.get(error_name):
+                    message += f'Error in logs of node {node_id}. {error_name}: {errors[error_name]}\n'
+        return message
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime
+from hashlib import sha1
+from re import compile
+
+from ...util import read_yaml_file, write_yaml_file
+
+
+class ExceptionIndex:
+    """
+    Groups exceptions found in node logs by signature: exception class plus top stack frames.
+    Identical traces from all nodes are stored once with occurrences counted per node and per time window.
+
+    Index built from `Ignite.find_fails` output:
+        index = ExceptionIndex()
+        index.add_fails(ignite.find_fails(store_files=tmp_dir))
+        index.save(path.join(config['suite_var_dir'], ExceptionIndex.file_name))
+    """
+
+    file_name = 'exception_index.yaml'
+    top_frames = 5
+    # seconds
+    time_window = 60
+
+    exception_class_pattern = compile(r'((?:[a-zA-Z_$][\w$]*\.)+[\w$]*(?:Exception|Error|Throwable))')
+    frame_pattern = compile(r'^at\s+([^(]+)(?:\(([^:)]*)[^)]*\))?')
+    log_prefix_pattern = compile(r'^(\[[^\]]*\])+\s*')
+    variable_pattern = compile(r'0x[0-9a-fA-F]+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}|\d+')
+
+    def __init__(self, top_frames=None, time_window=None):
+        if top_frames is not None:
+            self.top_frames = top_frames
+        if time_window is not None:
+            self.time_window = time_window
+        self.signatures = {}
+
+    def get_signature(self, exception_lines):
+        """
+        Normalise stack trace
+        :param exception_lines: the lines of stack trace
+        :return: tuple (exception class or normalised first line, list of top frames)
+        """
+        first_line = exception_lines[0].strip() if exception_lines else ''
+        m = self.exception_class_pattern.search(first_line)
+        if m:
+            exception = m.group(1)
+        else:
+            exception = self.variable_pattern.sub('N', self.log_prefix_pattern.sub('', first_line))
+        frames = []
+        for line in exception_lines[1:]:
+            m = self.frame_pattern.match(line.strip())
+            if not m:
+                continue
+            frame = self.variable_pattern.sub('N', m.group(1).strip())
+            if m.group(2):
+                frame += f'({m.group(2)})'
+            frames.append(frame)
+            if len(frames) >= self.top_frames:
+                break
+        return exception, frames
+
+    def get_window(self, time):
+        if not isinstance(time, datetime):
+            return 'unknown'
+        seconds = (time.hour * 60 + time.minute) * 60 + time.second
+        seconds -= seconds % self.time_window
+        return '%02d:%02d:%02d' % (seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+    def add(self, node, exceptions):
+        """
+        Add exceptions found in node log
+        :param node: node log name or node id
+        :param exceptions: the list of exceptions in format of `Ignite.find_exceptions_list`
+        """
+        for exception_info in exceptions:
+            exception, frames = self.get_signature(exception_info['exception'])
+            signature_id = sha1('\n'.join([exception] + frames).encode('utf-8')).hexdigest()[:12]
+            if signature_id not in self.signatures:
+                self.signatures[signature_id] = {
+                    'signature': signature_id,
+                    'exception': exception,
+                    'frames': frames,
+                    'count': 0,
+                    'nodes': {},
+                    'windows': {},
+                    'example': {
+                        'node': node,
+                        'line': exception_info.get('line'),
+                        'exception': list(exception_info['exception']),
+                    },
+                }
+            entry = self.signatures[signature_id]
+            entry['count'] += 1
+            entry['nodes'][node] = entry['nodes'].get(node, 0) + 1
+            window = self.get_window(exception_info.get('time'))
+            entry['windows'][window] = entry['windows'].get(window, 0) + 1
+
+    def add_fails(self, found_exceptions):
+        """
+        Add exceptions in format of `Ignite.find_fails` output
+        """
+        for file_name, found_exception in found_exceptions.items():
+            self.add(file_name, found_exception['exceptions'])
+
+    def get_signatures(self, node=None):
+        """
+        :param node: (optional) only signatures found at the node
+        :return: the list of signatures, most frequent first
+        """
+        signatures = [entry for entry in self.signatures.values() if node is None or node in entry['nodes']]
+        return sorted(signatures, key=lambda entry: (-entry['count'], entry['exception']))
+
+    def save(self, file_path):
+        write_yaml_file(file_path, {
+            'top_frames': self.top_frames,
+            'time_window': self.time_window,
+            'signatures': self.get_signatures(),
+        })
+
+    @classmethod
+    def load(cls, file_path):
+        data = read_yaml_file(file_path) or {}
+        index = cls(top_frames=data.get('top_frames'), time_window=data.get('time_window'))
+        for entry in data.get('signatures', []):
+            index.signatures[entry['signature']] = entry
+        return index
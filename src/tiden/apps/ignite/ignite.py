@@ -14,13 +14,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from copy import deepcopy
+from collections import deque
+from multiprocessing.dummy import Pool as ThreadPool
 from os import path, remove
 from os.path import exists
 
 from datetime import datetime
 from itertools import cycle
-from re import search, compile, sub
+from re import search, compile, sub, findall
 from time import sleep, time
 from traceback import format_exc
 from zipfile import ZipFile
@@ -34,6 +35,8 @@ from ...util import log_put, log_print, print_red, apply_tiden_functions, util_s
 from ...tidenexception import TidenException
 from ...report.steps import step
 from .ignitecomponents import IgniteComponents
+from .exceptionindex import ExceptionIndex
+from .startorchestrator import StartOrchestrator
 
 
 class Ignite(IgniteComponents, App):
@@ -44,6 +47,30 @@ class Ignite(IgniteComponents, App):
 
     activation_timeout = 240
 
+    # lines before exception kept by find_fails to look up exception time
+    find_fails_context_lines = 100
+
+    exception_start_line_patterns = compile(
+        "^((Caused by:* )*class [a-zA-Z0-9\._]+Exception: "
+        "|java.lang.NullPointerException"
+        "|java.lang.[a-zA-Z0-9\._]+(Exception"
+        "|Error): )"
+        "|\] Fail"
+        "|\] Critical"
+        "|Error: Failed"
+        "|\(err\) Failed"
+        "|: Failed"
+    )
+
+    exception_end_line_patterns = compile(
+        "\.\.\. \d+ more|"
+        'at java\.lang\.Thread\.run\(Thread\.java:\d+\)|'
+        'at org.apache.ignite.startup.cmdline.CommandLineStartup.main\(CommandLineStartup.java:\d+\)|'
+        'at org\.apache\.ignite.spi.IgniteSpiThread\.run\(IgniteSpiThread\.java:\d+\)|'
+        'at org\.apache\.ignite\.testtools\.SimpleIgniteTestClient\.main\(SimpleIgniteTestClient\.java:\d+\)|'
+        '\[[0-9:,]+\]\[INFO\]'
+    )
+
     client_host_index = 0
 
     # for unique_node_ports
@@ -277,11 +304,17 @@ class Ignite(IgniteComponents, App):
     def get_folder_name_from_consistent_id(self, node_idx):
         return sub('[.,-]', '_', self.get_node_consistent_id(node_idx))
 
+    def get_ports_offset(self):
+        """
+        Shift of all node ports, `ignite.ports_offset` config option (set for every shard of sharded run)
+        """
+        return int(self.config.get('ignite', {}).get('ports_offset', 0))
+
     def get_base_disco_port(self):
-        return 47500
+        return 47500 + self.get_ports_offset()
 
     def get_base_communication_port(self):
-        return 47100
+        return 47100 + self.get_ports_offset()
 
     def get_node_communication_port(self, node_idx):
         if self.is_default_node(node_idx):
@@ -366,7 +399,6 @@ class Ignite(IgniteComponents, App):
         verbose = '-v' if kwargs.get('verbose', self._verbose) else ''
 
         server_num = len(self.get_alive_default_nodes()) + len(self.get_alive_additional_nodes())
-        commands = {}
         node_start_line = "cd %s; " \
                           "nohup " \
                           "  bin/ignite.sh " \
@@ -391,7 +423,7 @@ class Ignite(IgniteComponents, App):
             run_counter=str(self.nodes[node_id]['run_counter']),
         )
 
-        commands[self.nodes[node_id]['host']] = [node_start_line % (
+        node_start_command = node_start_line % (
             self.nodes[node_id]['ignite_home'],
             self.nodes[node_id]['config'],
             node_jvm_options,
@@ -400,13 +432,15 @@ class Ignite(IgniteComponents, App):
             self.get_node_communication_port(node_id),
             self.get_node_consistent_id(node_id),
             self.nodes[node_id]['log']
-        )]
+        )
 
         log_print('Start node %s' % node_id, color='blue')
-        self.logger.debug(commands)
-        self.ssh.exec(commands)
+        self.logger.debug(node_start_command)
+        orchestrator = self.get_start_orchestrator(**kwargs)
+        orchestrator.exec_start_commands({node_id: (self.nodes[node_id]['host'], node_start_command)})
 
         if not kwargs.get('skip_topology_check', False):
+            orchestrator.wait_for_nodes([node_id])
             self.wait_for_topology_snapshot(
                 server_num + 1 + kwargs.get('starting_nodes', 0),
                 None,
@@ -465,19 +499,27 @@ class Ignite(IgniteComponents, App):
         self.nodes[idx]['status'] = NodeStatus.STARTING
         return commands
 
+    def get_start_orchestrator(self, **kwargs):
+        """
+        :param kwargs: `wave_size` overrides `ignite.start_wave_size` config option
+        :return: orchestrator of nodes start, see `StartOrchestrator`
+        """
+        return StartOrchestrator(self, wave_size=kwargs.get('wave_size'))
+
     def start_nodes(self, *args, **kwargs):
         """
-        Start Ignite server nodes
+        Start Ignite server nodes.
+        Nodes are started in waves of `wave_size` nodes (`ignite.start_wave_size` config option), all at once by
+        default, see `StartOrchestrator`.
         :return: none
         """
         assert self._setup, "Ignite.setup() should be called before using start_nodes"
 
         already_nodes = int(kwargs.get('already_nodes', 0))
+        orchestrator = self.get_start_orchestrator(**kwargs)
 
         # first start nodes (either all grid or specific ones)
         if len(args) > 0:
-            started_ids = []
-
             if kwargs.get('force', False):
                 for node_id in args:
                     if node_id in self.nodes:
@@ -490,27 +532,9 @@ class Ignite(IgniteComponents, App):
                 if self.nodes[node_id]['status'] in [NodeStatus.NEW, NodeStatus.KILLED, NodeStatus.KILLING]
             ]
             server_num = len(self.get_alive_default_nodes() + self.get_alive_additional_nodes())
-            commands = {}
-            for node_idx in nodes_to_start:
-                node_start_commands = self._get_start_node_commands(node_idx, **kwargs)
-                node_host = self.nodes[node_idx]['host']
-                if node_host not in commands:
-                    commands[node_host] = []
-                commands[node_host].append(node_start_commands[node_host][0])
-
-                server_num += 1
-                started_ids.append(node_idx)
-
-            if commands:
-                log_print("Start grid '%s' node(s): %s" % (self.grid_name, nodes_to_start))
-                self.ssh.exec(commands)
-
-                self.wait_for_topology_snapshot(
-                    server_num + already_nodes,
-                    None,
-                    '',
-                    **kwargs,
-                )
+            started_ids = list(nodes_to_start)
+            if nodes_to_start:
+                orchestrator.start(nodes_to_start, server_num + len(nodes_to_start) + already_nodes, '', **kwargs)
         else:
             assert len(self.get_alive_default_nodes() + self.get_alive_additional_nodes()) == 0, \
                 "Ignite.start_nodes() supposes grid is not started"
@@ -520,16 +544,7 @@ class Ignite(IgniteComponents, App):
             coord_host = self.nodes[coord_node_idx]['host']
             # Start coordinator
             log_print("Start coordinator '%s' on host %s" % (self.get_node_consistent_id(coord_node_idx), coord_host))
-            self.ssh.exec(self._get_start_node_commands(coord_node_idx, **kwargs))
-
-            self.wait_for_topology_snapshot(
-                1 + already_nodes,
-                None,
-                ", host %s" % coord_host,
-                **kwargs,
-            )
-
-            server_num = 1
+            orchestrator.start([coord_node_idx], 1 + already_nodes, ", host %s" % coord_host, **kwargs)
 
             # start all nodes except coordinator
             nodes_to_start = self.get_all_default_nodes()
@@ -545,27 +560,9 @@ class Ignite(IgniteComponents, App):
                         new_nodes_to_start.append(node)
                 nodes_to_start = new_nodes_to_start
 
-            commands = {}
-            for node_idx in nodes_to_start:
-                node_start_commands = self._get_start_node_commands(node_idx, **kwargs)
-                node_host = self.nodes[node_idx]['host']
-                if node_host not in commands:
-                    commands[node_host] = []
-                commands[node_host].append(node_start_commands[node_host][0])
-
-                server_num += 1
-                started_ids.append(node_idx)
-
-            if commands:
-                log_print("Start grid '%s' node(s): %s" % (self.grid_name, nodes_to_start))
-                self.ssh.exec(commands)
-
-                self.wait_for_topology_snapshot(
-                    server_num + already_nodes,
-                    None,
-                    '',
-                    **kwargs,
-                )
+            started_ids.extend(nodes_to_start)
+            if nodes_to_start:
+                orchestrator.start(nodes_to_start, 1 + len(nodes_to_start) + already_nodes, '', **kwargs)
 
         # update attributes for started nodes
         if started_ids:
@@ -656,6 +653,7 @@ class Ignite(IgniteComponents, App):
             log_print('Starting additional node %s' % str(list(range_nodes)[0]), color='blue')
 
         self.ssh.exec(commands)
+        self.invalidate_process_table()
 
         if not kwargs.get('skip_topology_check'):
             if kwargs.get('client_nodes'):
@@ -759,13 +757,7 @@ class Ignite(IgniteComponents, App):
         node_alive = False
 
         if 'PID' in self.nodes[node_id]:
-            pid = self.nodes[node_id]['PID']
-
-            cmd = "jps | grep %s | wc -l" % pid
-
-            results = self.ssh.exec_on_host(host, (cmd,))
-
-            node_alive = '1' in results[host][0]
+            node_alive = self.ssh.get_process_table().is_alive(self.nodes[node_id]['PID'], host)
 
         if not node_alive:
             self.nodes[node_id]['status'] = NodeStatus.KILLED
@@ -807,6 +799,7 @@ class Ignite(IgniteComponents, App):
                         log_print(format_exc(), color='red')
                     else:
                         raise
+                self.invalidate_process_table()
                 self._delete_server_node(node_idx)
             else:
                 log_print('There is no PID for node %s' % node_idx, color='red')
@@ -914,12 +907,13 @@ class Ignite(IgniteComponents, App):
         self.logger.debug(commands)
         self.logger.debug(ignite_pids)
         self.ssh.exec(commands)
+        self.invalidate_process_table()
         started = int(time())
         timeout_counter = 0
         running_num = server_num
         while timeout_counter < self.snapshot_timeout and running_num > 0:
-            java_processes = self.ssh.jps()
-            running_pids = [java_process for java_process in java_processes
+            java_processes = self.ssh.get_process_table().get_processes()
+            running_pids = [int(java_process['pid']) for java_process in java_processes
                             if int(java_process['pid']) in ignite_pids]
             running_num = len(running_pids)
 
@@ -992,8 +986,7 @@ class Ignite(IgniteComponents, App):
         Grep node logs for data, populates self.nodes[node_option_name]
         :return:
         """
-        commands = {}
-        result_order = {}
+        result_order = []
 
         if 'default_value' in kwargs:
             default_value = kwargs['default_value']
@@ -1013,27 +1006,21 @@ class Ignite(IgniteComponents, App):
         else:
             assert False, "Unknown host group!"
 
+        requests = []
         for node_idx in node_idx_filter:
-            node_idx_host = self.nodes[node_idx]['host']
             if 'log' in self.nodes[node_idx]:
-                if commands.get(node_idx_host) is None:
-                    commands[node_idx_host] = []
-                    result_order[node_idx_host] = []
-                commands[node_idx_host].append('grep "%s" %s' % (grep_text, self.nodes[node_idx]['log']))
-                result_order[node_idx_host].append(node_idx)
+                requests.append((self.nodes[node_idx]['host'], self.nodes[node_idx]['log'], 'grep "%s"' % grep_text))
+                result_order.append(node_idx)
             else:
                 print_red('There is no log for node %s' % node_idx)
 
-        results = self.ssh.exec(commands)
-
-        for host in results.keys():
-            for res_node_idx in range(0, len(results[host])):
-                m = search(regex_match, results[host][res_node_idx])
-                if m:
-                    val = m.group(1)
-                    if kwargs.get('force_type') == 'int':
-                        val = int(val)
-                    self.nodes[result_order[host][res_node_idx]][node_option_name] = val
+        for node_idx, lines in zip(result_order, self.log_cursors.grep(requests)):
+            m = search(regex_match, ''.join(lines))
+            if m:
+                val = m.group(1)
+                if kwargs.get('force_type') == 'int':
+                    val = int(val)
+                self.nodes[node_idx][node_option_name] = val
 
     def get_and_inc_client_host(self, client_hosts=None):
         if client_hosts is None:
@@ -1060,19 +1047,9 @@ class Ignite(IgniteComponents, App):
         result = None
         if self.nodes.get(node_id):
             host = self.nodes[node_id]['host']
-            commands = {
-                host: [
-                    'grep -E "%s" %s' % (grep_pattern, self.nodes[node_id]['log'])
-                ]
-            }
-            results = self.ssh.exec(commands)
-            log_print("Log grep output: %s" % results, 2)
-
-            if results.get(host) is not None:
-                if isinstance(results[host], list):
-                    result = results[host][0]
-                else:
-                    result = results[host]
+            lines = self.log_cursors.grep([(host, self.nodes[node_id]['log'], 'grep -E "%s"' % grep_pattern)])[0]
+            result = ''.join(lines)
+            log_print("Log grep output: %s" % {host: [result]}, 2)
         else:
             log_print("Node with id=%s not found" % node_id, 2)
 
@@ -1222,6 +1199,12 @@ class Ignite(IgniteComponents, App):
         if self.nodes.get(node_idx):
             log_file = self.nodes[node_idx].get('log')
             host = self.nodes[node_idx]['host']
+            if pattern.startswith('grep ') and '|' not in pattern:
+                # plain line filter, only new log bytes are scanned
+                lines = self.log_cursors.grep([(host, log_file, pattern)])[0]
+                if lines:
+                    log_print({host: [''.join(lines)]}, color='debug')
+                return len(lines) > 0
             kill_command = {
                 host: ['cat {} | {}'.format(log_file, pattern)]
             }
@@ -1236,15 +1219,18 @@ class Ignite(IgniteComponents, App):
                    files_to_check: list = None,
                    store_files=None,
                    time_pattern=r'\[(\d+:\d+:\d+)(,\d+|)\]|Time.+T(\d+:\d+:\d+)(\.\d+|)',
-                   ignore_node_ids=False):
+                   ignore_node_ids=False,
+                   keep_body=False):
         """
-        Download log files one by one
+        Download log files in parallel
         Find fails in cluster logs and form it as dict
 
         :param node_ids:            custom nodes ids to search (all nodes by default)
         :param files_to_check:      path and host for file which needs to be checked
-        :param store_files          directory where temp log files will be stored
+        :param store_files          directory where downloaded log files will be stored
         :param ignore_node_ids:     ignore all received node_ids parameters
+        :param keep_body:           keep the whole log in result, otherwise logs are scanned line by line
+                                    and only `find_fails_context_lines` lines before every exception are kept
         :return: dict               exception dict
                                     Example:
                                     {
@@ -1258,11 +1244,14 @@ class Ignite(IgniteComponents, App):
                                                   "Bad thin in log line #125\n",
                                                   ....
                                                ],
+                                               "context": [
+                                                  # lines before exception
+                                               ],
                                                "time": datetime.datetime(2020, X, X, X)
                                             }
                                          ],
                                          "body": [
-                                            # all log
+                                            # all log, only if keep_body is set
                                          ],
                                          "file": {
                                             "host": '172.25.1.XX',
@@ -1287,67 +1276,113 @@ class Ignite(IgniteComponents, App):
                 'name': path.basename(node["log"])
             })
 
-        local_files = []
-        try:
-            found_exceptions = {}
-            for file_to_check in files_to_check:
-                local_file_path = path.join(store_files, file_to_check['name'])
-                local_files.append(local_file_path)
+        if not files_to_check:
+            return {}
+
+        local_files = [
+            path.join(store_files, f'{file_idx}.{file_to_check["name"]}')
+            for file_idx, file_to_check in enumerate(files_to_check)
+        ]
+        now_time = datetime.now()
+        format_date_now = f'{now_time.year}.{now_time.month}.{now_time.day}'
+
+        def _find_time(lines):
+            for line in lines:
+                found_time_str = search(time_pattern, line)
+                if found_time_str and (found_time_str.group(1) or found_time_str.group(3)):
+                    found_time_str = found_time_str.group(1) or found_time_str.group(3)
+                    return datetime.strptime(f'{format_date_now} {found_time_str}', '%Y.%m.%d %H:%M:%S')
+            return None
+
+        def _find_fails_in_file(file_to_check, local_file_path):
+            if exists(local_file_path):
+                remove(local_file_path)
+            try:
                 self.ssh.download_from_host(file_to_check['host'], file_to_check['log_path'], local_file_path)
-                with open(local_file_path, 'r') as f:
-                    all_lines = f.readlines()
-                    exception_list = self.find_exceptions_list(all_lines)
-                    if exception_list:
-                        found_exceptions[file_to_check['name']] = {
-                            'file': file_to_check,
-                            'exceptions': exception_list,
-                            'body': all_lines
-                        }
-
-            now_time = datetime.now()
-            format_date_now = f'{now_time.year}.{now_time.month}.{now_time.day}'
-            for file_name, found_exception in deepcopy(found_exceptions).items():
-                for ex_idx, exception_info in enumerate(found_exception['exceptions']):
-                    time_is_found = False
-                    for line in exception_info['exception']:
-                        if found_exceptions[file_name]['exceptions'][ex_idx].get('time'):
-                            break
-                        found_time_str = search(time_pattern, line)
-                        if found_time_str and (found_time_str.group(1) or found_time_str.group(3)):
-                            time_is_found = True
-                            found_time_str = found_time_str.group(1) or found_time_str.group(3)
-                            found_time = datetime.strptime(f'{format_date_now} {found_time_str}', '%Y.%m.%d %H:%M:%S')
-                            found_exceptions[file_name]['exceptions'][ex_idx]['time'] = found_time
-                            break
-                    if not time_is_found:
-                        upper_line = exception_info['line'] - 1
-                        for i in range(100):
-                            if upper_line < 0:
-                                break
-                            upper_line -= 1
-                            line_to_search = found_exception['body'][upper_line]
-                            found_time_str = search(time_pattern, line_to_search)
-                            if found_time_str and (found_time_str.group(1) or found_time_str.group(3)):
-                                found_time_str = found_time_str.group(1) or found_time_str.group(3)
-                                found_time = datetime.strptime(f'{format_date_now} {found_time_str}',
-                                                               '%Y.%m.%d %H:%M:%S')
-                                found_exceptions[file_name]['exceptions'][ex_idx]['time'] = found_time
-                                break
+            except (OSError, TidenException) as e:
+                log_print(f"Download of {file_to_check['log_path']} failed: {e}", color='debug')
+            if not exists(local_file_path):
+                return None, None
+            body = None
+            with open(local_file_path, 'r') as f:
+                if keep_body:
+                    body = f.readlines()
+                exception_list = self.find_exceptions_list(body if keep_body else f,
+                                                           context_lines=self.find_fails_context_lines)
+            for exception_info in exception_list:
+                found_time = _find_time(exception_info['exception']) or \
+                             _find_time(reversed(exception_info['context']))
+                if found_time:
+                    exception_info['time'] = found_time
+            return exception_list, body
+
+        threads_num = min(len(files_to_check), int(getattr(self.ssh, 'threads_num', 1)))
+        pool = ThreadPool(max(threads_num, 1))
+        try:
+            results = pool.starmap(_find_fails_in_file, zip(files_to_check, local_files))
         finally:
-            for file in local_files:
-                if exists(file):
-                    remove(file)
+            pool.close()
+            pool.join()
+        found_exceptions = {}
+        for file_to_check, (exception_list, body) in zip(files_to_check, results):
+            if exception_list is None:
+                log_print(f"WARN: can't download log {file_to_check['log_path']} from host {file_to_check['host']}, "
+                          f"it is not checked for fails", color='red')
+                continue
+            if exception_list:
+                found_exceptions[file_to_check['name']] = {
+                    'file': file_to_check,
+                    'exceptions': exception_list,
+                }
+                if keep_body:
+                    found_exceptions[file_to_check['name']]['body'] = body
         return found_exceptions
 
+    def build_exception_index(self, *node_ids, found_exceptions=None, index_file=None, **kwargs):
+        """
+        Deduplicate exceptions found in node logs by signature and save index next to test results
+
+        :param node_ids:            custom nodes ids to search (all nodes by default)
+        :param found_exceptions:    `find_fails` output, if logs were already analysed
+        :param index_file:          path to save index, <test_dir>/exception_index.yaml of the current test
+                                    (<suite_var_dir>/exception_index.yaml out of test) by default
+        :param kwargs:              `find_fails` arguments, logs are downloaded to temporary directory
+                                    removed after analysis unless `store_files` is set
+        :return:                    ExceptionIndex
+        """
+        if found_exceptions is None:
+            if kwargs.get('store_files') is None:
+                from tempfile import mkdtemp
+                from shutil import rmtree
+
+                store_files = mkdtemp(prefix='logs-', dir=self.config.get('tmp_dir'))
+                try:
+                    found_exceptions = self.find_fails(*node_ids, **dict(kwargs, store_files=store_files))
+                finally:
+                    rmtree(store_files, ignore_errors=True)
+            else:
+                found_exceptions = self.find_fails(*node_ids, **kwargs)
+        index = ExceptionIndex()
+        index.add_fails(found_exceptions)
+        if index_file is None:
+            results_dir = self.config.get('rt', {}).get('test_dir') or self.config.get('suite_var_dir')
+            if results_dir:
+                index_file = path.join(results_dir, ExceptionIndex.file_name)
+        if index_file is not None:
+            index.save(index_file)
+        return index
+
     def find_exceptions_list(self, file_content,
                              start_line_patterns=None,
-                             end_line_patterns=None):
+                             end_line_patterns=None,
+                             context_lines=None):
         """
         Find all exceptions in file content and form it in list
 
-        :param      file_content:           open('filepath').readlines()
+        :param      file_content:           open('filepath').readlines() or any iterable of lines, e.g. open file
         :param      start_line_patterns     re.compile(pattern) defined exception start line
         :param      end_line_patterns       re.compile(pattern) defined exception end line
+        :param      context_lines           if set, up to that number of lines before exception are kept in 'context'
         :return:    Example:
                     [
                        "line": 123,
@@ -1359,48 +1394,42 @@ class Ignite(IgniteComponents, App):
                     ],
         """
         if start_line_patterns is None:
-            start_line_patterns = compile(
-                "^((Caused by:* )*class [a-zA-Z0-9\._]+Exception: "
-                "|java.lang.NullPointerException"
-                "|java.lang.[a-zA-Z0-9\._]+(Exception"
-                "|Error): )"
-                "|\] Fail"
-                "|\] Critical"
-                "|Error: Failed"
-                "|\(err\) Failed"
-                "|: Failed"
-            )
+            start_line_patterns = self.exception_start_line_patterns
+        start_line_patterns = compile(start_line_patterns)
 
         if end_line_patterns is None:
-            end_line_patterns = compile(
-                "\.\.\. \d+ more|"
-                'at java\.lang\.Thread\.run\(Thread\.java:\d+\)|'
-                'at org.apache.ignite.startup.cmdline.CommandLineStartup.main\(CommandLineStartup.java:\d+\)|'
-                'at org\.apache\.ignite.spi.IgniteSpiThread\.run\(IgniteSpiThread\.java:\d+\)|'
-                'at org\.apache\.ignite\.testtools\.SimpleIgniteTestClient\.main\(SimpleIgniteTestClient\.java:\d+\)|'
-                '\[[0-9:,]+\]\[INFO\]'
-            )
+            end_line_patterns = self.exception_end_line_patterns
+        end_line_patterns = compile(end_line_patterns)
 
         exception_lines = []
         exception_list = []
 
         after_exception_end_line = False
         in_exception_section = False
-        lines = file_content
-        lines_count = len(lines)
         max_lines_stack_trace = 100
+        previous_lines = deque(maxlen=context_lines if context_lines else 0)
+        context = []
 
         start_line = 0
 
-        for line_idx, line in enumerate(lines):
+        def _append_exception():
+            exception = {
+                'line': start_line,
+                'exception': exception_lines
+            }
+            if context_lines:
+                exception['context'] = context
+            exception_list.append(exception)
+
+        for line_idx, line in enumerate(file_content):
             if in_exception_section:
-                if search(end_line_patterns, line) or line_idx - start_line > max_lines_stack_trace:
+                if end_line_patterns.search(line) or line_idx - start_line > max_lines_stack_trace:
                     in_exception_section = False
                     after_exception_end_line = True
                     exception_lines.append(line.rstrip())
             else:
                 # is start line
-                if not search('\[WARNING\]', line) and search(start_line_patterns, line):
+                if '[WARNING]' not in line and start_line_patterns.search(line):
                     in_exception_section = True
                     if line.startswith('Caused by') and after_exception_end_line:
                         if len(exception_lines) > 0:
@@ -1408,23 +1437,19 @@ class Ignite(IgniteComponents, App):
                     else:
 
                         if exception_lines:
-                            exception_list.append({
-                                'line': start_line,
-                                'exception': exception_lines
-                            })
+                            _append_exception()
                         start_line = line_idx + 1
                         exception_lines = []
+                        context = list(previous_lines)
 
                 after_exception_end_line = False
             if in_exception_section:
                 exception_lines.append(line.rstrip())
+            if context_lines:
+                previous_lines.append(line)
 
-            if line_idx == lines_count - 1:
-                if exception_lines:
-                    exception_list.append({
-                        'line': start_line,
-                        'exception': exception_lines
-                    })
+        if exception_lines:
+            _append_exception()
 
         return exception_list
 
@@ -1449,7 +1474,8 @@ class Ignite(IgniteComponents, App):
 
     def check_node_is_alive(self, node_index):
         """
-        Check if java process with PID from node is still running on host using jps utility.
+        Check if java process with PID from node is still running using the snapshot of processes
+        of all hosts (`ProcessTable`), so checks of many nodes do not list processes for every node.
         :param node_index:
         :return:
         """
@@ -1464,11 +1490,7 @@ class Ignite(IgniteComponents, App):
                 self.nodes[node_index].get('PID'), self.nodes[node_index])
         assert pid is not None, "Something wrong happened. Cannot get 'PID' from node {}".format(self.nodes[node_index])
 
-        jps = self.ssh.jps()
-        alive_pids = [int(node['pid']) for node in jps]
-        if pid > 0 and pid in alive_pids:
-            return True
-        return False
+        return pid > 0 and self.ssh.get_process_table().is_alive(pid)
 
     def _get_run_info_from_log(self):
         """
@@ -1484,30 +1506,28 @@ class Ignite(IgniteComponents, App):
         try:
             # to handle situation when nodes could be restarted/failed and so on, we need to check all nodes
             for node_idx in self.get_all_default_nodes():
-                command = []
                 node_idx_host = self.nodes[node_idx]['host']
                 if 'log' in self.nodes[node_idx]:
-                    # get caches count
-                    command.append('grep "{}" {} 2>/dev/null | '
-                                   'grep -Eo "name=([^,]*)," 2>/dev/null | '
-                                   'sort | uniq | wc -l'.format('Started cache', self.nodes[node_idx]['log']))
-                    # get heap / offheap / CPU info
-                    command.append('grep -A 1 "Topology snapshot" {} 2>/dev/null | '
-                                   'grep -B 1 "=ACTIVE" 2>/dev/null | '
-                                   'grep "Topology snapshot" 2>/dev/null '.format(self.nodes[node_idx]['log']))
-                    output = self.ssh.exec_on_host(node_idx_host, command)
-                    info = output[node_idx_host]
-
-                    if len(info) != 2:
-                        log_print('Returned info could not be parsed\n{}'.format(info), color='red')
-                        continue
+                    log = self.nodes[node_idx]['log']
+                    cache_lines, snapshot_lines = self.log_cursors.grep([
+                        (node_idx_host, log, 'grep "Started cache"'),
+                        (node_idx_host, log, 'grep -A 1 "Topology snapshot"'),
+                    ])
 
-                    if int(info[0].strip('\n')) == 0:
+                    # get caches count
+                    caches_number = len(set(findall('name=([^,]*),', ''.join(cache_lines))))
+                    if caches_number == 0:
                         continue
 
-                    run_info['caches number'] = int(info[0].strip('\n'))
+                    run_info['caches number'] = caches_number
 
-                    for node_data in info[1].split('\n'):
+                    # get heap / offheap / CPU info of snapshots of active cluster
+                    for line_idx, node_data in enumerate(snapshot_lines):
+                        if 'Topology snapshot' not in node_data:
+                            continue
+                        next_line = snapshot_lines[line_idx + 1] if line_idx + 1 < len(snapshot_lines) else ''
+                        if '=ACTIVE' not in node_data and '=ACTIVE' not in next_line:
+                            continue
                         match = search(re_str, node_data)
                         if match:
                             skip_stat = False
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from re import search
+from time import sleep, time
+
+from ..appexception import AppException
+from ..nodestatus import NodeStatus
+from ...util import log_print
+
+
+class StartOrchestrator:
+    """
+    Starts Ignite server nodes in waves of `wave_size` nodes.
+
+    Start command of every node reports PID of its `ignite.sh` process. After every wave hosts are probed by
+    a single command per host: node processes must be alive and discovery and communication ports of all
+    started nodes must be listened, node which process has exited fails start at once with the tail of its log.
+    Then topology snapshot with all nodes started so far is awaited (by `TopologyWatcher` when available), so
+    the next wave joins only after the previous one, which limits join rate for large topologies.
+
+    By default (`ignite.start_wave_size` is 0) all nodes are started in a single wave.
+    """
+
+    pid_marker = 'TIDEN_START_PID'
+    no_port_tool_marker = 'TIDEN_NO_PORT_TOOL'
+    # seconds between host probes
+    probe_interval = 1
+    # seconds to wait for ports of the wave, on timeout ports are not probed anymore and only topology is awaited
+    probe_timeout = 30
+    log_tail_lines = 30
+
+    def __init__(self, ignite, wave_size=None, probe_ports=None):
+        """
+        :param ignite: Ignite application
+        :param wave_size: number of nodes started at once, `ignite.start_wave_size` config option by default
+        :param probe_ports: whether to probe ports, `ignite.start_probe_ports` config option (True by default)
+        """
+        self.ignite = ignite
+        self.ssh = ignite.ssh
+        ignite_config = ignite.config.get('ignite', {})
+        if wave_size is None:
+            wave_size = ignite_config.get('start_wave_size', 0)
+        self.wave_size = int(wave_size or 0)
+        if probe_ports is None:
+            probe_ports = ignite_config.get('start_probe_ports', True)
+        self.probe_ports = bool(probe_ports)
+        self.pids = {}
+
+    def get_waves(self, node_ids):
+        if self.wave_size <= 0:
+            return [list(node_ids)] if node_ids else []
+        return [list(node_ids[i:i + self.wave_size]) for i in range(0, len(node_ids), self.wave_size)]
+
+    def start(self, node_ids, server_num, comment='', **kwargs):
+        """
+        Start nodes wave by wave
+        :param node_ids: nodes to start, in order
+        :param server_num: number of servers expected in topology when all nodes are started
+        :param comment: the additional text printed out during waiting for topology
+        :param kwargs: passed to `_get_start_node_commands` and `wait_for_topology_snapshot`
+        """
+        waves = self.get_waves(list(node_ids))
+        servers_before = server_num - len(node_ids)
+        started_num = 0
+        for wave_idx, wave in enumerate(waves):
+            if len(waves) > 1:
+                log_print("Start grid '%s' wave %d/%d node(s): %s" % (
+                    self.ignite.grid_name, wave_idx + 1, len(waves), wave))
+            else:
+                log_print("Start grid '%s' node(s): %s" % (self.ignite.grid_name, wave))
+            commands = {}
+            for node_idx in wave:
+                node_host = self.ignite.nodes[node_idx]['host']
+                commands[node_idx] = (node_host, self.ignite._get_start_node_commands(node_idx, **kwargs)[node_host][0])
+            self.exec_start_commands(commands)
+            started_num += len(wave)
+            self.wait_for_nodes(wave)
+            self.ignite.wait_for_topology_snapshot(servers_before + started_num, None, comment, **kwargs)
+
+    def exec_start_commands(self, commands):
+        """
+        Run start commands and remember PIDs of started processes
+        :param commands: dictionary <node id>: (<host>, <start command ending with `&`>)
+        """
+        host_commands = {}
+        for node_idx, (host, command) in commands.items():
+            host_commands.setdefault(host, []).append(
+                '%s echo "%s %s $!"' % (command.rstrip(), self.pid_marker, node_idx)
+            )
+        results = self.ssh.exec(host_commands)
+        self.ignite.invalidate_process_table()
+        for outputs in (results or {}).values():
+            for output in outputs:
+                for line in (output or '').splitlines():
+                    m = search(r'%s (\S+) (\d+)' % self.pid_marker, line)
+                    if m:
+                        node_idx = m.group(1)
+                        self.pids[int(node_idx) if node_idx.isdigit() else node_idx] = int(m.group(2))
+
+    def wait_for_nodes(self, node_ids):
+        """
+        Wait until processes of nodes listen discovery and communication ports, fail if any process exited
+        """
+        started = time()
+        pending = list(node_ids)
+        while pending:
+            probes = self.probe_hosts(pending)
+            failed = [
+                node_idx for node_idx in pending
+                if node_idx in self.pids and self.pids[node_idx] not in probes[self.ignite.nodes[node_idx]['host']][0]
+            ]
+            if failed:
+                raise AppException(self.get_failure_message(failed))
+            if not self.probe_ports:
+                return
+            pending = [node_idx for node_idx in pending if not self.is_node_ready(node_idx, probes)]
+            if not pending:
+                return
+            if time() - started > self.probe_timeout:
+                log_print("WARN: ports of node(s) %s are not listened in %s sec, ports are not probed anymore "
+                          "(set ignite.start_probe_ports: False for configs with custom ports)" %
+                          (pending, self.probe_timeout), color='yellow')
+                self.probe_ports = False
+                return
+            sleep(self.probe_interval)
+
+    def get_probe_command(self, pids):
+        return 'for pid in %s; do kill -0 $pid 2>/dev/null && echo "%s $pid"; done; ' \
+               '(ss -tln 2>/dev/null || netstat -tln 2>/dev/null || echo "%s")' % (
+                   ' '.join([str(pid) for pid in pids]), self.pid_marker, self.no_port_tool_marker)
+
+    def probe_hosts(self, node_ids):
+        """
+        Check processes of nodes and listened ports of their hosts
+        :param node_ids: nodes to check
+        :return: dictionary <host>: (<set of alive PIDs>, <set of listened ports or None if unknown>)
+        """
+        host_pids = {}
+        for node_idx in node_ids:
+            pids = host_pids.setdefault(self.ignite.nodes[node_idx]['host'], [])
+            if node_idx in self.pids:
+                pids.append(self.pids[node_idx])
+        results = self.ssh.exec(dict([(host, [self.get_probe_command(pids)]) for host, pids in host_pids.items()]))
+        results = results or {}
+        probes = {}
+        for host in host_pids.keys():
+            alive, ports = set(), set()
+            for line in ''.join(results.get(host, [''])).splitlines():
+                if line.startswith(self.pid_marker):
+                    alive.add(int(line.split()[1]))
+                elif self.no_port_tool_marker in line:
+                    ports = None
+                elif ports is not None:
+                    for token in line.split():
+                        m = search(r'[:.](\d+)$', token)
+                        if m:
+                            ports.add(int(m.group(1)))
+                            break
+            probes[host] = (alive, ports)
+        return probes
+
+    def is_node_ready(self, node_idx, probes):
+        """
+        Node is ready when the number of listened discovery and communication ports of the host is not less than
+        the number of starting and started server nodes at the host
+        """
+        host = self.ignite.nodes[node_idx]['host']
+        ports = probes[host][1]
+        if ports is None:
+            return True
+        host_nodes = len([
+            idx for idx, node in self.ignite.nodes.items()
+            if node.get('host') == host and node.get('status') in [NodeStatus.STARTING, NodeStatus.STARTED] and
+            (self.ignite.is_default_node(idx) or self.ignite.is_additional_node(idx))
+        ])
+        ports_range = self.ignite.MAX_NODES_PER_HOST
+        for base_port in [self.ignite.get_base_disco_port(), self.ignite.get_base_communication_port()]:
+            if len([port for port in ports if base_port <= port < base_port + ports_range]) < host_nodes:
+                return False
+        return True
+
+    def get_failure_message(self, node_ids):
+        message = ''
+        for node_idx in node_ids:
+            node = self.ignite.nodes[node_idx]
+            node['status'] = NodeStatus.KILLED
+            message += 'Node %s process (PID %s) exited on host %s' % (node_idx, self.pids[node_idx], node['host'])
+            if node.get('log'):
+                output = self.ssh.exec_on_host(node['host'], ['tail -n %d %s' % (self.log_tail_lines, node['log'])])
+                message += ', log %s:\n%s' % (node['log'], ''.join(output[node['host']]))
+            message += '\n'
+        return message
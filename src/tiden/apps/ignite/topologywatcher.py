@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import deque
+from re import search
+from threading import Condition, Lock, Thread
+
+from ...util import get_logger
+
+
+class TopologyWatcher:
+    """
+    Follows node logs with remote `tail -F` and keeps topology snapshot messages and fatal errors
+    found in logs in memory, so waiting for topology does not re-read logs.
+
+    All logs of the host are followed by the single command (single SSH channel), the command is restarted
+    when the set of logs changes, already read logs are resumed from the byte offset of the last matched line.
+    """
+
+    topology_snapshot_text = 'Topology snapshot'
+    snapshots_to_keep = 1000
+
+    def __init__(self, ssh, fatal_errors):
+        """
+        :param ssh: ssh pool
+        :param fatal_errors: dictionary <error name>: {regex: <regex>}, the first group of regex is error text
+        """
+        self.ssh = ssh
+        self.fatal_errors = fatal_errors
+        self.logs = {}
+        self.host_watchers = {}
+        self.events = Condition()
+        self.events_count = 0
+        # remote command of any host failed, logs are not followed anymore
+        self.failed = False
+
+    def watch(self, logs):
+        """
+        Follow given logs, (re)start host watchers if needed.
+        :param logs: dictionary <host>: <list of log paths>
+        """
+        for host, host_logs in logs.items():
+            host_logs = sorted(set(host_logs))
+            host_watcher = self.host_watchers.get(host)
+            if host_watcher is not None:
+                if host_watcher.logs == host_logs and host_watcher.is_alive():
+                    continue
+                host_watcher.stop()
+            with self.events:
+                for log in host_logs:
+                    if log not in self.logs:
+                        self.logs[log] = {
+                            'offset': 0,
+                            'snapshots': deque(maxlen=self.snapshots_to_keep),
+                            'errors': {},
+                        }
+                offsets = [self.logs[log]['offset'] for log in host_logs]
+            self.host_watchers[host] = _HostLogsWatcher(self, host, host_logs, offsets)
+            self.host_watchers[host].start()
+
+    def stop(self):
+        """
+        Terminate all remote watchers.
+        """
+        for host_watcher in self.host_watchers.values():
+            host_watcher.stop()
+        self.host_watchers = {}
+
+    def get_snapshots(self, log):
+        """
+        :return: the list of last topology snapshot messages found in log
+        """
+        with self.events:
+            return list(self.logs[log]['snapshots']) if log in self.logs else []
+
+    def get_errors(self, log):
+        """
+        :return: dictionary <error name>: <error text> of fatal errors found in log
+        """
+        with self.events:
+            return dict(self.logs[log]['errors']) if log in self.logs else {}
+
+    def wait_for_events(self, events_seen, timeout):
+        """
+        Wait until something new is found in logs.
+        :param events_seen: the value of `events_count` when state was read last time
+        :param timeout: timeout, seconds
+        :return: True if new events came
+        """
+        with self.events:
+            return self.events.wait_for(lambda: self.events_count != events_seen, timeout)
+
+    def process_line(self, log, offset, text):
+        """
+        Update the state of log by matched line
+        :param log: log path
+        :param offset: offset of the line in the log, bytes
+        :param text: the line
+        """
+        with self.events:
+            state = self.logs[log]
+            state['offset'] = max(state['offset'], offset + len(text.encode('utf-8')))
+            if self.topology_snapshot_text in text:
+                state['snapshots'].append(text.rstrip('\n'))
+            for error_name, error in self.fatal_errors.items():
+                if error_name in state['errors']:
+                    continue
+                m = search(error['regex'], text)
+                if m:
+                    state['errors'][error_name] = m.group(1)
+            self.events_count += 1
+            self.events.notify_all()
+
+    def set_failed(self, host, error):
+        get_logger('tiden').warning(f'Logs watcher on host {host} failed: {error}')
+        with self.events:
+            self.failed = True
+            self.events_count += 1
+            self.events.notify_all()
+
+    def get_remote_pattern(self):
+        return '|'.join([self.topology_snapshot_text] + [error['regex'] for error in self.fatal_errors.values()])
+
+
+class _HostLogsWatcher(Thread):
+    """
+    Background thread reading output of remote `tail -F` of all followed logs of the host.
+    The first output line is the PID of remote shell, it is used to terminate the remote command.
+    """
+
+    def __init__(self, watcher, host, logs, offsets):
+        super().__init__(daemon=True)
+        self.watcher = watcher
+        self.host = host
+        self.logs = logs
+        self.offsets = offsets
+        self.pid = None
+        self.stopped = False
+        self.lock = Lock()
+
+    def get_command(self):
+        pattern = self.watcher.get_remote_pattern()
+        followers = [
+            f"tail -c +{offset + 1} -F {log} 2>/dev/null "
+            f"| grep --line-buffered -b -H --label={idx} -E '{pattern}' 2>/dev/null &"
+            for idx, (log, offset) in enumerate(zip(self.logs, self.offsets))
+        ]
+        return 'echo $$; ' + ' '.join(followers) + ' wait'
+
+    def run(self):
+        try:
+            for line in self.watcher.ssh.exec_on_host_stream(self.host, self.get_command(), timeout=None):
+                if self.pid is None:
+                    if line.strip().isdigit():
+                        with self.lock:
+                            self.pid = line.strip()
+                            stopped = self.stopped
+                        if stopped:
+                            self.kill()
+                    continue
+                try:
+                    idx, offset, text = line.split(':', 2)
+                    log_idx = int(idx)
+                    log_offset = self.offsets[log_idx] + int(offset)
+                except ValueError:
+                    continue
+                self.watcher.process_line(self.logs[log_idx], log_offset, text)
+        except Exception as e:
+            self.watcher.set_failed(self.host, e)
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            pid = self.pid
+        if pid is not None:
+            self.kill()
+
+    def kill(self):
+        self.watcher.ssh.exec_on_host(self.host, [f'pkill -P {self.pid}; kill {self.pid}'])
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from re import compile, error as RegexError
+from threading import Lock
+
+
+class LogCursors:
+    """
+    Incremental grep of remote logs.
+
+    Cursor is kept for every (host, log, line filter): identity of the log, the end of its last complete line
+    at the last scan and the lines matched so far. Next scan reads only bytes appended after that offset, so the line
+    being written at the scan is matched once it is complete. When the log is replaced (e.g. log recreated for
+    the next node run) or truncated, it is scanned from the start again. Cursor is not moved when the line
+    filter fails.
+    """
+
+    header = 'log-cursor:'
+    # line after filter output with exit status of filter
+    status_header = 'log-cursor-status:'
+    head_size = 256
+    # grep options of patterns that can be scanned together and told apart locally by python regex
+    # ('grep -P' accepts the single pattern only)
+    combinable_grep_options = ('-E',)
+    # POSIX bracket class (e.g. '[[:digit:]]'), python regex reads it as a plain set of characters
+    re_posix_class = compile(r'\[:[a-z]+:\]')
+
+    def __init__(self, ssh):
+        self.ssh = ssh
+        self.cursors = {}
+        self.lock = Lock()
+
+    def grep(self, requests):
+        """
+        Find log lines matched by filters
+        :param requests: the list of tuples (host, log path, line filter command), e.g.
+                (host, '/path/to/grid.log', 'grep -E "Exception"')
+        :return: the list of matched lines (with line ends) for every request, from the beginning of log
+        """
+        if not requests:
+            return []
+        commands = {}
+        scans = []
+        with self.lock:
+            for request_idx, request in enumerate(requests):
+                host, log, line_filter = request
+                cursor = self.cursors.setdefault(tuple(request), {'file_id': '', 'offset': 0, 'lines': []})
+                scans.append((cursor['file_id'], cursor['offset']))
+                if host not in commands:
+                    commands[host] = []
+                commands[host].append(
+                    self._get_command(request_idx, log, line_filter, cursor['file_id'], cursor['offset'])
+                )
+
+        results = self.ssh.exec(commands)
+
+        for host_results in results.values():
+            for output in host_results:
+                self._update(requests, scans, output)
+
+        with self.lock:
+            return [list(self.cursors[tuple(request)]['lines']) for request in requests]
+
+    def grep_patterns(self, requests):
+        """
+        Find log lines matched by several patterns, every log is read once for all patterns:
+        patterns with the same grep options are joined into single `grep -e <pattern1> -e <pattern2> ...`
+        and matched lines are split between patterns locally. Patterns which python regex reads differently
+        (e.g. with POSIX bracket classes) are scanned by separate greps.
+        :param requests: the list of tuples (host, log path, patterns), patterns is the list of tuples
+                (grep options, regex)
+        :return: for every request the list of matched lines for every pattern
+        """
+        filters = []
+        plans = []
+        for host, log, patterns in requests:
+            groups = {}
+            plan = []
+            for options, regex in patterns:
+                options = ' '.join(options.split())
+                matcher = None
+                if options in self.combinable_grep_options and not self.re_posix_class.search(regex):
+                    try:
+                        matcher = compile(regex)
+                    except RegexError:
+                        pass
+                if matcher is None:
+                    plan.append((len(filters), None))
+                    filters.append((host, log, f"grep {options} '{regex}'"))
+                    continue
+                if options not in groups:
+                    groups[options] = (len(filters), [])
+                    filters.append(None)
+                groups[options][1].append(regex)
+                plan.append((groups[options][0], matcher))
+            for options, (filter_idx, regexes) in groups.items():
+                conditions = ' '.join([f"-e '{regex}'" for regex in regexes])
+                filters[filter_idx] = (host, log, f"grep {options} {conditions}")
+            plans.append(plan)
+
+        found_lines = self.grep(filters)
+
+        results = []
+        for plan in plans:
+            results.append([
+                [line for line in found_lines[filter_idx] if matcher is None or matcher.search(line)]
+                for filter_idx, matcher in plan
+            ])
+        return results
+
+    def reset(self):
+        with self.lock:
+            self.cursors = {}
+
+    def _get_command(self, request_idx, log, line_filter, file_id, offset):
+        # file is identified by inode and checksum of its head, as inode of removed file is often reused at once;
+        # n - bytes to scan, the last line is left for the next scan unless it is terminated
+        return f"set -- $(stat -L -c '%i %s' {log} 2>/dev/null || echo 0 0) " \
+               f"$(head -c {self.head_size} {log} 2>/dev/null | cksum); o={offset}; " \
+               f"[ \"$1-$3\" = \"{file_id}\" ] && [ \"$2\" -ge $o ] || o=0; n=$(($2 - o)); " \
+               f"[ $n -gt 0 ] && [ -n \"$(tail -c +$((o + n)) {log} 2>/dev/null | head -c 1 | tr -d '\\n')\" ] && " \
+               f"n=$((n - $(tail -c +$((o + 1)) {log} 2>/dev/null | head -c $n | tail -n 1 | wc -c))); " \
+               f"echo \"{self.header}{request_idx} $1-$3 $((o + n)) $o\"; " \
+               f"tail -c +$((o + 1)) {log} 2>/dev/null | head -c $n | {line_filter}; " \
+               f"echo \"{self.status_header}$?\""
+
+    def _update(self, requests, scans, output):
+        lines = output.splitlines(keepends=True)
+        if not lines or not lines[0].startswith(self.header):
+            return
+        try:
+            request_idx, file_id, end, offset = lines[0][len(self.header):].split()
+            request_idx, end, offset = int(request_idx), int(end), int(offset)
+        except ValueError:
+            return
+        # filter failed (e.g. grep exit status 2) or its output is cut: cursor is kept to scan the same bytes again
+        if not lines[-1].startswith(self.status_header):
+            return
+        try:
+            if int(lines[-1][len(self.status_header):]) > 1:
+                return
+        except ValueError:
+            return
+        with self.lock:
+            cursor = self.cursors[tuple(requests[request_idx])]
+            if (cursor['file_id'], cursor['offset']) != scans[request_idx]:
+                # concurrent scan has already advanced the cursor
+                return
+            if offset != cursor['offset']:
+                cursor['lines'] = []
+            cursor['lines'].extend(lines[1:-1])
+            cursor['file_id'] = file_id
+            cursor['offset'] = end
@@ -17,7 +17,9 @@
 import hashlib
 import os.path
 import tarfile
+from concurrent.futures import ProcessPoolExecutor
 from glob import glob
+from io import BytesIO, TextIOWrapper
 from os import path, mkdir, listdir, remove, walk
 from os.path import join, exists, basename
 from re import search, sub
@@ -27,10 +29,18 @@ from zipfile import BadZipfile, ZipFile
 
 import yaml
 
+from .hashcache import HashCache
+from .repacktree import RepackTree, RepackTreeError
 from .util import log_print, print_red, print_green, calculate_sha256, load_yaml
 
 TIDEN_ARTIFACTS_CONFIG = 'local_artifacts_config.yaml'
 TIDEN_REPACK_CHECKSUM_FILE_NAME = 'tiden_repack_original.checksum.sha256'
+TIDEN_HASH_CACHE = 'local_hash_cache.yaml'
+TIDEN_EXTRACTED_MARKER = '.tiden_extracted'
+# directory of extracted artifacts under remote artifacts dir, kept between runs
+TIDEN_EXTRACTED_DIR = 'extracted'
+# max number of parallel unzip processes on remote host
+REMOTE_UNZIP_THREADS = 8
 
 archive_types = {
     "zip": {
@@ -67,17 +77,22 @@ def prepare(config):
     artifacts_backup_hashes_path = join(config['var_dir'], 'local_hash_artifacts.yaml')
     artifacts_hashes = load_yaml(artifacts_backup_hashes_path)
 
+    # sha256 of files are reused between runs while files are not changed
+    hash_cache = HashCache(join(config['var_dir'], TIDEN_HASH_CACHE))
+
     changed_artifacts, current_artifacts = get_changed_artifacts(artifacts_hashes, config)
 
     if len(changed_artifacts) > 0 or not len(previous_artifacts_config) > 0:
         # dump hashes if artifacts has changed
         yaml.dump(current_artifacts, open(artifacts_backup_hashes_path, 'w'))
 
-    copied_artifacts = copy_artifacts(changed_artifacts, config)
+    copied_artifacts = copy_artifacts(changed_artifacts, config, hash_cache=hash_cache)
 
     command, config_changes, artifacts_to_delete = repack_and_get_command_to_unzip(previous_artifacts_config,
                                                                                    copied_artifacts,
-                                                                                   config)
+                                                                                   config,
+                                                                                   hash_cache=hash_cache)
+    hash_cache.save()
     config = apply_changes(config_changes, config)
 
     backup(previous_artifacts_config,
@@ -134,17 +149,20 @@ def get_changed_artifacts(previous_hashes, config):
     return changed_artifacts, curr_artifacts
 
 
-def copy_artifacts(changed_artifacts, config):
+def copy_artifacts(changed_artifacts, config, hash_cache=None):
     """
     Copy changed artifacts to artifacts directory
 
     :param changed_artifacts:
     :param config
+    :param hash_cache:          HashCache to reuse file hashes
     :return:                    list(copied artifacts)
     """
-    copied_artifacts = []
+    if hash_cache is None:
+        hash_cache = HashCache()
+
+    artifact_files = {}
     for artifact_name in config.get('artifacts', {}).keys():
-        # copy artifacts
         pattern = config['artifacts'][artifact_name]['glob_path']
 
         if pattern.startswith('ftp'):
@@ -153,25 +171,43 @@ def copy_artifacts(changed_artifacts, config):
         found_files = glob(pattern)
         assert len(found_files) == 1, \
             "Found {} artifacts by pattern {}. Expected: 1".format(len(found_files), pattern)
-        file = found_files[0]
+        artifact_files[artifact_name] = (found_files[0], join(config['artifacts_dir'], basename(found_files[0])))
 
-        new_file = join(config['artifacts_dir'], basename(file))
+    # hash all source files and previously copied files at once
+    files_to_hash = [file for file, new_file in artifact_files.values()]
+    files_to_hash += [new_file for artifact_name, (file, new_file) in artifact_files.items()
+                      if not config['artifacts'][artifact_name].get('repack', False) and path.exists(new_file)]
+    hashes = hash_cache.get_many(files_to_hash)
 
+    copied_artifacts = []
+    files_to_copy = []
+    for artifact_name, (file, new_file) in artifact_files.items():
         checksum_equals = artifacts_equals(artifact_name,
-                                           calculate_sha256(file),
+                                           hashes[file],
                                            new_file,
-                                           config)
+                                           config,
+                                           hash_cache=hash_cache)
 
         # copy file if it not exists in local var directory
         # or sha256 by file doesn't match with original:
         if artifact_name in changed_artifacts or not checksum_equals:
-            print_green("Copied %s" % artifact_name)
             copied_artifacts.append(artifact_name)
-            copyfile(file, new_file)
+            files_to_copy.append((artifact_name, file, new_file))
+
+    if len(files_to_copy) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(files_to_copy), os.cpu_count() or 1)) as executor:
+            list(executor.map(copyfile, [file for _, file, _ in files_to_copy], [new for _, _, new in files_to_copy]))
+    elif files_to_copy:
+        copyfile(files_to_copy[0][1], files_to_copy[0][2])
+
+    for artifact_name, file, new_file in files_to_copy:
+        print_green("Copied %s" % artifact_name)
+        # copy has the same content
+        hash_cache.put(new_file, hashes[file])
     return copied_artifacts
 
 
-def artifacts_equals(artifact_name, orig_hash, file, config):
+def artifacts_equals(artifact_name, orig_hash, file, config, hash_cache=None):
     """
     Compare artifacts with hash from previous
 
@@ -179,6 +215,7 @@ def artifacts_equals(artifact_name, orig_hash, file, config):
     :param orig_hash:       current artifact hash
     :param file:            copied artifact path
     :param config
+    :param hash_cache:      HashCache to reuse file hashes
     :return:                True - artifacts are equals
                             False - artifacts are different
     """
@@ -206,11 +243,11 @@ def artifacts_equals(artifact_name, orig_hash, file, config):
 
     elif path.exists(file):
         # calculate checksum based on sha256 of file
-        checksum_equals = orig_hash == calculate_sha256(file)
+        checksum_equals = orig_hash == (hash_cache.get(file) if hash_cache else calculate_sha256(file))
     return checksum_equals
 
 
-def repack_and_get_command_to_unzip(previous_artifacts_config, copied_artifacts, config):
+def repack_and_get_command_to_unzip(previous_artifacts_config, copied_artifacts, config, hash_cache=None):
     """
     Repack zip artifacts
     Execute declared rules (move, copy, remove)
@@ -221,6 +258,7 @@ def repack_and_get_command_to_unzip(previous_artifacts_config, copied_artifacts,
     :param previous_artifacts_config:   previous configuration
     :param copied_artifacts:            list of copied artifacts
     :param config:                      current configuration
+    :param hash_cache:                  HashCache to reuse file hashes
     :return:                            tuple(command to unzip, config changes, artifacts ot delete)
     """
     artifacts_to_delete = []
@@ -248,7 +286,8 @@ def repack_and_get_command_to_unzip(previous_artifacts_config, copied_artifacts,
                     new_file, artifacts_changes = repack_artifact(artifact_name,
                                                                   new_file,
                                                                   source_file,
-                                                                  config)
+                                                                  config,
+                                                                  hash_cache=hash_cache)
                     config_changes[artifact_name]["changes"] = artifacts_changes
                 else:
                     # artifact copied previously
@@ -272,7 +311,8 @@ def repack_and_get_command_to_unzip(previous_artifacts_config, copied_artifacts,
             if config['artifacts'][artifact_name].get('remote_unzip') is True:
                 artifact_command, remote_path = _get_command(config, artifact_name,
                                                              config_changes[artifact_name]['remote_path'],
-                                                             new_file)
+                                                             new_file,
+                                                             hash_cache=hash_cache)
                 command.append(artifact_command)
 
                 config_changes[artifact_name]['remote_path'] = remote_path
@@ -283,13 +323,15 @@ def repack_and_get_command_to_unzip(previous_artifacts_config, copied_artifacts,
     return command, config_changes, artifacts_to_delete
 
 
-def repack_artifact(artifact_name, repack_path, source_file, config):
+def repack_artifact(artifact_name, repack_path, source_file, config, hash_cache=None):
     """
     Repack artifacts and execute rules
     """
+    if hash_cache is None:
+        hash_cache = HashCache()
     log_print("Repacking '{}'".format(artifact_name))
     repack_data = repack(artifact_name, repack_path,
-                         calculate_sha256(source_file),
+                         hash_cache.get(source_file),
                          config['tmp_dir'],
                          config['artifacts'][artifact_name]['repack'],
                          config['artifacts_dir'],
@@ -298,7 +340,8 @@ def repack_artifact(artifact_name, repack_path, source_file, config):
     # move repack
     artifact_repack_path = join(config['artifacts_dir'], basename(repack_data['new_file']))
     if exists(artifact_repack_path):
-        if calculate_sha256(artifact_repack_path) != calculate_sha256(repack_data["new_file"]):
+        hashes = hash_cache.get_many([artifact_repack_path, repack_data["new_file"]])
+        if hashes[artifact_repack_path] != hashes[repack_data["new_file"]]:
             remove(artifact_repack_path)
             move(repack_data["new_file"], config['artifacts_dir'])
     else:
@@ -315,7 +358,7 @@ def repack_artifact(artifact_name, repack_path, source_file, config):
     return repack_path, artifact_info
 
 
-def _get_command(config, artifact_name, remote_path, local_path):
+def _get_command(config, artifact_name, remote_path, local_path, hash_cache=None):
     """
     Compile command to unzip
 
@@ -323,22 +366,98 @@ def _get_command(config, artifact_name, remote_path, local_path):
     :param artifact_name:
     :param remote_path:     artifact remote host path
     :param local_path:      artifact client path
+    :param hash_cache:      HashCache to get artifact hash for extraction marker
     :return:                tuple(unzip command, new configuration)
     """
     var_dir = config['remote']['suite_var_dir']
     end_path = "{}/{}".format(var_dir, artifact_name)
-    unzip_cmd = "unzip -u -q {} -d {}".format(remote_path, end_path)
+    key = None
+    if exists(local_path):
+        key = (hash_cache if hash_cache is not None else HashCache()).get(local_path)
 
     tar_formats = [".tar", '.tar.gz', '.tgz']
     found_formats = [fmt for fmt in tar_formats if local_path.endswith(fmt)]
-    if found_formats:
-        unzip_cmd = "cd {var}; mkdir {dir_name}; tar -xf {artifact_path} -C {dir_name} --strip-components 1".format(
-            var=var_dir,
-            dir_name=artifact_name,
-            artifact_path=remote_path,
-        )
+    strip_components = 1 if found_formats else 0
+    if key is None:
+        return get_remote_extract_command(remote_path, end_path, strip_components=strip_components), end_path
+
+    # suite var dir is new for every run, so archive is extracted to the directory kept between runs
+    extracted_path = get_remote_extracted_dir(config, artifact_name, key)
+    unzip_cmd = get_remote_extract_command(remote_path, extracted_path, key=key, strip_components=strip_components)
+    return "{}; {}".format(unzip_cmd, get_remote_link_command(extracted_path, end_path)), end_path
 
-    return unzip_cmd, end_path
+
+def get_remote_extracted_dir(config, artifact_name, key):
+    """
+    :param config:          tiden config
+    :param artifact_name:   artifact name
+    :param key:             archive hash or other string identifying archive content
+    :return:                remote directory to extract archive to, the same for the same archive in all runs
+    """
+    return "{}/{}/{}-{}".format(config['remote']['artifacts_dir'], TIDEN_EXTRACTED_DIR, artifact_name,
+                                hashlib.md5(str(key).encode('utf-8')).hexdigest()[:12])
+
+
+def get_remote_link_command(target_dir, link_path):
+    """
+    :return: command to make (or replace) symlink to the directory, e.g. to extracted artifact from suite var dir
+    """
+    return "mkdir -p $(dirname {link}) && rm -rf {link} && ln -s {target} {link}".format(
+        target=target_dir, link=link_path
+    )
+
+
+def get_remote_extract_command(archive_path, target_dir, key=None, strip_components=0):
+    """
+    Compile command to extract archive on remote host.
+
+    Archive is extracted to staging directory which is renamed to the target directory when extraction
+    is complete. Extraction marker with archive hash is written into extracted directory,
+    extraction is skipped while the marker is the same.
+
+    :param archive_path:        archive remote path (.zip, .tar, .tar.gz, .tgz)
+    :param target_dir:          remote directory to extract to
+    :param key:                 archive hash, md5 of remote archive is used if None
+    :param strip_components:    number of leading path components to strip from tar archive members
+    :return:                    extract command
+    """
+    staging_dir = "{}/.{}.staging".format(*target_dir.rsplit('/', 1)) if '/' in target_dir \
+        else ".{}.staging".format(target_dir)
+    if archive_path.endswith('.tar.gz') or archive_path.endswith('.tgz'):
+        extract_cmd = "if command -v pigz >/dev/null; then " \
+                      "tar -I pigz -xf {archive} -C \"$s\" --strip-components {strip}; " \
+                      "else tar -xzf {archive} -C \"$s\" --strip-components {strip}; fi"
+    elif archive_path.endswith('.tar'):
+        extract_cmd = "tar -xf {archive} -C \"$s\" --strip-components {strip}"
+    else:
+        # zip members are split between parallel unzip processes, directories are created beforehand
+        extract_cmd = "t=$(nproc 2>/dev/null || echo 1); [ $t -gt {threads} ] && t={threads}; " \
+                      "if [ $t -gt 1 ]; then " \
+                      "unzip -Z1 {archive} | sed -n 's|/[^/]*$||p' | sort -u | tr '\\n' '\\0' " \
+                      "| (cd \"$s\" && xargs -0 -r mkdir -p) && " \
+                      "unzip -Z1 {archive} | grep -v '/$' | sed 's/[][*?\\]/\\\\&/g' | tr '\\n' '\\0' " \
+                      "| xargs -0 -r -P $t -n 256 unzip -q -o {archive} -d \"$s\"; " \
+                      "else unzip -q -o {archive} -d \"$s\"; fi"
+    extract_cmd = extract_cmd.format(archive=archive_path, strip=strip_components, threads=REMOTE_UNZIP_THREADS)
+
+    # marker depends on extraction command too, so changed extraction is applied to the same archive
+    command_hash = hashlib.md5(extract_cmd.encode('utf-8')).hexdigest()[:8]
+    if key is not None:
+        key_expr = "'{}-{}'".format(hashlib.md5(str(key).encode('utf-8')).hexdigest(), command_hash)
+    else:
+        key_expr = "\"$(md5sum < {} | cut -c1-32)-{}\"".format(archive_path, command_hash)
+
+    return "k={key}; s='{staging}'; " \
+           "if [ \"$(cat {target}/{marker} 2>/dev/null)\" != \"$k\" ]; then " \
+           "rm -rf \"$s\" \"$s.old\"; mkdir -p \"$s\" && {{ {extract}; }} && echo \"$k\" > \"$s/{marker}\" && " \
+           "{{ [ ! -e {target} ] || mv {target} \"$s.old\"; }} && mv \"$s\" {target}; " \
+           "rm -rf \"$s\" \"$s.old\"; fi".format(
+                key=key_expr,
+                staging=staging_dir,
+                target=target_dir,
+                marker=TIDEN_EXTRACTED_MARKER,
+                extract=extract_cmd,
+            )
 
 
 def backup(previous_artifacts_config, copied_artifacts, config_backup_path, config):
@@ -372,6 +491,10 @@ def repack(artifact_name, src_path, checksum, work_dir, rules, artifacts_dir, ar
     """
     Repack artifacts and execute rules
 
+    Rules are applied to the list of archive members (see `RepackTree`) and members are streamed
+    from the source archive to the repacked one without extraction. Artifact is extracted to work_dir
+    only when rules move or copy files out of the artifact.
+
     :param src_path:        artifact path
     :param checksum:        artifact checksum
     :param work_dir:        path for artifact extraction
@@ -380,6 +503,160 @@ def repack(artifact_name, src_path, checksum, work_dir, rules, artifacts_dir, ar
     :param artifacts:       artifacts dict
     :return:                dict(artifacts information)
     """
+    try:
+        return _repack_streaming(artifact_name, src_path, checksum, work_dir, rules, artifacts_dir, artifacts)
+    except RepackTreeError as e:
+        log_print("Repack '{}' with extraction: {}".format(artifact_name, str(e)))
+    except (FileNotFoundError, BadZipfile) as e:
+        print("Error repacking %s : %s" % (src_path, str(e)))
+        raise e
+    return _repack_extracted(artifact_name, src_path, checksum, work_dir, rules, artifacts_dir, artifacts)
+
+
+def _get_repack_file_name(artifact_name, src_path, archive_type, artifacts):
+    custom_name = artifacts[artifact_name].get('name')
+    new_zip_file_name = f'{custom_name}{archive_type["pattern"]}' if custom_name else basename(src_path)
+    return new_zip_file_name.replace(archive_type["pattern"], f'.repack{archive_type["pattern"]}')
+
+
+def _read_properties(core_data, properties_name, results):
+    """
+    Read `<product>.<key>` properties of `<product>-core.jar` to results as `<product>_<key>`
+    :return: content of the properties file
+    """
+    with ZipFile(BytesIO(core_data), "r") as core:
+        data = core.read(properties_name)
+    for line in TextIOWrapper(BytesIO(data)):
+        m = search('^({}\\.[a-z\\.]+)=(.+)'.format(properties_name.split('.')[0]), line)
+        if m:
+            key = sub('\\.', '_', m.group(1))
+            results[key] = m.group(2)
+    return data
+
+
+def _repack_streaming(artifact_name, src_path, checksum, work_dir, rules, artifacts_dir, artifacts):
+    archive_type = None
+    for _, data in archive_types.items():
+        if src_path.endswith(data["pattern"]):
+            archive_type = data
+    assert archive_type is not None, "Can't find unzip operation for {} file".format(basename(src_path))
+    new_zip_file = join(work_dir, _get_repack_file_name(artifact_name, src_path, archive_type, artifacts))
+    extract_dir = join(work_dir, basename(src_path).replace(archive_type["pattern"], '_in'))
+    is_zip = archive_type["open"] == ZipFile
+
+    if is_zip:
+        source = ZipFile(src_path, "r")
+        members = [(info.filename, info.is_dir(), None, None) for info in source.infolist()]
+    else:
+        source = None
+        with archive_type["open"](src_path, archive_type["mode"]) as arch:
+            members = [(info.name, info.isdir(), info.mtime, info.mode) for info in arch]
+
+    try:
+        prefix = RepackTree.get_prefix([member[0] for member in members])
+        self_entry = join(extract_dir, prefix) if prefix else extract_dir
+        tree = RepackTree(self_entry)
+        for name, is_dir, mtime, mode in members:
+            tree.add_member(name, is_dir, mtime, mode, prefix)
+
+        # check that rules don't change anything outside of artifact before any rule is applied
+        for rule in rules:
+            args, _ = _parse_args(rule.split(' '), work_dir, artifacts_dir, artifact_name, artifacts, self_entry,
+                                  expand_globs=lambda pattern: [pattern])
+            if args[0] == 'move' and tree.is_inside(args[1]) != tree.is_inside(args[2]) or \
+                    args[0] == 'copy' and not tree.is_inside(args[2]):
+                raise RepackTreeError("rule '{}' changes files outside of artifact".format(rule))
+
+        def _expand_tree_globs(pattern):
+            return tree.glob(pattern) if tree.is_inside(pattern) else _expand_globs(pattern)
+
+        def _read_member(name):
+            if is_zip:
+                return source.read(name)
+            with archive_type["open"](src_path, archive_type["mode"]) as arch:
+                for info in arch:
+                    if info.name == name:
+                        return arch.extractfile(info).read()
+
+        # execute rules
+        dirs_to_delete = []
+        for rule in rules:
+            args, additional_dirs_to_delete = _parse_args(rule.split(' '),
+                                                          work_dir,
+                                                          artifacts_dir,
+                                                          artifact_name,
+                                                          artifacts,
+                                                          self_entry,
+                                                          expand_globs=_expand_tree_globs)
+            dirs_to_delete = dirs_to_delete + additional_dirs_to_delete
+            sources = args[1] if type(args[1]) == type([]) else [args[1]]
+            if args[0] == 'delete':
+                for src_arg in sources:
+                    if tree.is_inside(src_arg):
+                        tree.delete(src_arg)
+                    elif path.isdir(src_arg):
+                        rmtree(src_arg)
+                    elif path.isfile(src_arg):
+                        remove(src_arg)
+            elif args[0] == 'move':
+                for src_arg in sources:
+                    if tree.is_inside(src_arg):
+                        if tree.get(src_arg) is not None:
+                            tree.move(src_arg, args[2])
+                    elif path.isdir(src_arg) or path.isfile(src_arg):
+                        move(src_arg, args[2])
+            elif args[0] == 'copy':
+                for src_arg in sources:
+                    if tree.isdir(src_arg) if tree.is_inside(src_arg) else path.isdir(src_arg):
+                        tree.copy_tree(src_arg, args[2])
+                    elif tree.isfile(src_arg) if tree.is_inside(src_arg) else path.isfile(src_arg):
+                        tree.copy_file(src_arg, args[2])
+                    else:
+                        raise FileNotFoundError(f"can't find {src_arg} referenced in {artifact_name} repack rules")
+            elif args[0] == 'mkdir':
+                if tree.is_inside(args[1]):
+                    tree.mkdir(args[1])
+                else:
+                    mkdir(args[1])
+
+        results = {
+            'new_file': new_zip_file
+        }
+
+        # Ignite and Gridgain revision, properties file is added to artifact root
+        for core_pattern, properties_name in [("ignite-core*.jar", 'ignite.properties'),
+                                              ('gridgain-core*.jar', 'gridgain.properties')]:
+            for file in tree.glob(join(self_entry, "libs", core_pattern)):
+                data = _read_properties(tree.read(file, _read_member), properties_name, results)
+                tree.add_data(join(self_entry, properties_name), data)
+                break
+
+        # put checksum in archive
+        checksum_file_path = path.join(work_dir, TIDEN_REPACK_CHECKSUM_FILE_NAME)
+        with open(checksum_file_path, 'w') as checksum_file:
+            checksum_file.write(checksum)
+        extra_files = [(checksum_file_path, TIDEN_REPACK_CHECKSUM_FILE_NAME)]
+        if is_zip:
+            with ZipFile(new_zip_file, "w") as w:
+                tree.write_zip(w, source, extra_files)
+        else:
+            output_mode = archive_type["mode"].replace('r', 'w', 1)
+            with tarfile.open(new_zip_file, output_mode) as w:
+                tree.write_tar(w, src_path, archive_type["mode"], prefix, extra_files)
+
+        if path.exists(checksum_file_path):
+            remove(checksum_file_path)
+
+        # clean up after
+        for dir_to_delete in dirs_to_delete:
+            rmtree(dir_to_delete)
+    finally:
+        if source is not None:
+            source.close()
+    return results
+
+
+def _repack_extracted(artifact_name, src_path, checksum, work_dir, rules, artifacts_dir, artifacts):
     dirs_to_delete = []
     try:
         new_zip_file = None
@@ -391,10 +668,7 @@ def repack(artifact_name, src_path, checksum, work_dir, rules, artifacts_dir, ar
                 with data["open"](src_path, data["mode"]) as arch:
                     arch.extractall(extract_dir)
 
-                custom_name = artifacts[artifact_name].get('name')
-                new_zip_file_name = f'{custom_name}{data["pattern"]}' if custom_name else basename(src_path)
-                new_zip_file_name = new_zip_file_name.replace(data["pattern"], f'.repack{data["pattern"]}')
-                new_zip_file = join(work_dir, new_zip_file_name)
+                new_zip_file = join(work_dir, _get_repack_file_name(artifact_name, src_path, data, artifacts))
 
         assert new_zip_file is not None, "Can't find unzip operation for {} file".format(basename(src_path))
 
@@ -510,7 +784,8 @@ def _expand_globs(pattern):
     return glob(pattern)
 
 
-def _parse_args(args, extract_dir, artifacts_dir, current_artifact_name, artifacts, self_entry):
+def _parse_args(args, extract_dir, artifacts_dir, current_artifact_name, artifacts, self_entry,
+                expand_globs=_expand_globs):
     """
     Going through repack args and replace special syntax
     Special syntax:
@@ -523,6 +798,7 @@ def _parse_args(args, extract_dir, artifacts_dir, current_artifact_name, artifac
     :param current_artifact_name:  artifact currently been repacked
     :param artifacts:              list of artifacts where need to find searched $artifact_name$
     :param self_entry:             directory with unpacked artifact which is repacked
+    :param expand_globs:           function to expand glob patterns
     :return:                       processed repack arguments
     """
     new_args = [args[0]]
@@ -578,7 +854,7 @@ def _parse_args(args, extract_dir, artifacts_dir, current_artifact_name, artifac
                         other_path = other_path[1:]
                     new_path = path.join(temp_extract_dir, other_path)
             if '*' in new_path:
-                new_path = _expand_globs(new_path)
+                new_path = expand_globs(new_path)
 
         new_args.append(new_path)
     return new_args, dirs_to_delete
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from os import path
+from os.path import basename
+from threading import Thread, get_ident
+
+import asyncssh
+
+from .sshpool import SshPool
+from .tidenexception import RemoteOperationTimeout, TidenException
+from .util import log_print, log_put, log_add, get_logger
+
+debug_async_ssh_pool = False
+
+
+class AsyncSshPool(SshPool):
+    """
+    SSH pool built on asyncio event loop and asyncssh.
+
+    All hosts are served by a single event loop running in a background thread, so fan-out to hundreds of hosts
+    does not need hundreds of threads. Blocking methods of AbstractSshPool contract are thin wrappers around
+    awaitable `*_async` methods, which could be awaited directly by coroutines running at pool event loop
+    (see `run_async`).
+    """
+
+    # max number of output chunks buffered for a streamed command before remote side is throttled
+    stream_queue_size = 16
+    stream_chunk_size = 65536
+    # seconds to wait for cancelled tasks on close
+    close_timeout = 10
+
+    def __init__(self, ssh_config, **kwargs):
+        super(AsyncSshPool, self).__init__(ssh_config, **kwargs)
+        self.connections = {}
+        self._loop = None
+        self._loop_thread = None
+        self._host_semaphores = {}
+        # coroutine functions stopping producers of active streams
+        self._stream_stoppers = set()
+
+    def trace_info(self):
+        log_print('Async SSH Pool, channels per host: %s' % self.channels_per_host)
+
+    def _get_loop(self):
+        with self._pool_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = Thread(target=self._loop.run_forever, name='async-ssh-pool', daemon=True)
+                self._loop_thread.start()
+            return self._loop
+
+    def run_async(self, coro):
+        """
+        Run coroutine at pool event loop and wait for result.
+        :param coro: coroutine
+        :return: coroutine result
+        """
+        loop = self._get_loop()
+        if self._loop_thread.ident is not None and self._loop_thread.ident == get_ident():
+            raise TidenException('Blocking AsyncSshPool call from the pool event loop, await *_async method instead')
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def _get_host_semaphore(self, host):
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.channels_per_host)
+        return self._host_semaphores[host]
+
+    def close(self):
+        if self._loop is not None:
+            self.run_async(self._close_async())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+            self._loop = None
+            self._loop_thread = None
+        super(AsyncSshPool, self).close()
+
+    async def _close_async(self):
+        # stop producers of abandoned streams, cancel and drain other tasks before the loop is stopped
+        await asyncio.gather(*[stop() for stop in list(self._stream_stoppers)], return_exceptions=True)
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=self.close_timeout)
+        for connection in self.connections.values():
+            connection.close()
+        await asyncio.gather(*[connection.wait_closed() for connection in self.connections.values()],
+                             return_exceptions=True)
+        self.connections = {}
+        self._host_semaphores = {}
+
+    # === connection
+
+    def connect(self):
+        if self.private_key_path:
+            if not path.exists(self.private_key_path):
+                raise TidenException("Private key %s not found" % self.private_key_path)
+        elif not self.use_ssh_agent:
+            raise TidenException("Either private_key_path or use_ssh_agent must be configured in the environment")
+        log_put("Checking connection to %s host(s) ... " % len(self.hosts), 2)
+        errors = self.run_async(self.connect_async())
+        if errors:
+            log_print('', 2)
+            for host, error in errors.items():
+                log_print("ERROR: SSH error for host=%s, username=%s, key=%s" %
+                          (host, str(self.username), str(self.private_key_path)), 2, color='red')
+                log_print(str(error), 2)
+            exit(1)
+        log_print('ok', 3)
+
+    async def connect_async(self):
+        """
+        Connect to all hosts concurrently.
+        :return: dictionary of connection errors indexed by host
+        """
+        results = await asyncio.gather(*[self._connect_host(host) for host in self.hosts])
+        return {host: error for host, error in zip(self.hosts, results) if error is not None}
+
+    async def _connect_host(self, host):
+        error = None
+        for attempt in range(self.retries):
+            try:
+                options = {
+                    'username': self.username,
+                    'known_hosts': None,
+                }
+                if not self.use_ssh_agent:
+                    options['client_keys'] = [self.private_key_path]
+                    options['agent_path'] = None
+                connection = await asyncssh.connect(host, **options)
+                self.connections[host] = connection
+                # Check whether host is a Docker container
+                result = await connection.run('cat /proc/1/cgroup', check=False)
+                if 'docker' in str(result.stdout):
+                    log_print(f'{host} is a Docker container')
+                    self.docker_hosts.add(host)
+                return None
+            except (OSError, asyncssh.Error) as e:
+                log_add('E ', 3)
+                error = e
+        return error
+
+    # === commands execution
+
+    def exec(self, commands, **kwargs):
+        return self.run_async(self.exec_async(commands, **kwargs))
+
+    def exec_on_host(self, host, commands, **kwargs):
+        return self.run_async(self.exec_on_host_async(host, commands, **kwargs))
+
+    async def exec_async(self, commands, **kwargs):
+        """
+        Awaitable version of `exec`
+        :param commands: the list of commands to execute for hosts or dict of list of commands indexed by host
+        :return: dictionary: <host>: [ <output of executed commands>, ... ]
+        """
+        raw_results = await asyncio.gather(*[
+            self.exec_on_host_async(host, host_commands, **kwargs)
+            for host, host_commands in self._get_commands_for_hosts(commands)
+        ])
+        results = {}
+        for raw_result in raw_results:
+            results.update(raw_result)
+        return results
+
+    async def exec_on_host_async(self, host, commands, **kwargs):
+        """
+        Awaitable version of `exec_on_host`
+        :param host:        host or ip address
+        :param commands:    the list of commands
+        :param kwargs:
+            timeout - command timeout, seconds
+            parallel - commands are independent and may be run in parallel channels of host connection
+        :return:            dictionary:
+            <host>: [ <string containing the output of executed commands>, ... ]
+        """
+        timeout = kwargs.get('timeout', int(self.config['default_timeout']))
+        env_vars = self._get_env_vars_prefix()
+        if kwargs.get('parallel'):
+            raw_results = await asyncio.gather(*[
+                self._exec_command_on_host_async(host, command, env_vars, timeout) for command in commands
+            ])
+        else:
+            raw_results = []
+            for command in commands:
+                raw_results.append(await self._exec_command_on_host_async(host, command, env_vars, timeout))
+
+        output = []
+        for command_output, error in raw_results:
+            if error is None:
+                output.append(command_output)
+                continue
+            if not kwargs.get('repeat'):
+                log_print('ssh reconnect')
+                error = await self._connect_host(host)
+                if error is None:
+                    kwargs['repeat'] = True
+                    return await self.exec_on_host_async(host, commands, **kwargs)
+            print(str(error))
+        return {host: output}
+
+    async def _exec_command_on_host_async(self, host, command, env_vars, timeout):
+        """
+        Execute single command at host in its own channel.
+        :return: tuple (command output, error or None)
+        """
+        command = self._prepare_command(host, command, env_vars)
+        try:
+            async with self._get_host_semaphore(host):
+                get_logger('ssh_pool').debug(f'{host} >> {command}')
+                result = await self.connections[host].run(command, check=False, timeout=timeout)
+        except asyncssh.TimeoutError:
+            raise RemoteOperationTimeout(f'Timeout {timeout} reached while executing command:\n'
+                                         f'Host: {host}\n'
+                                         f'{command}')
+        except (OSError, asyncssh.Error) as e:
+            return None, e
+        command_output = ''.join([
+            line for line in (str(result.stdout or '') + str(result.stderr or '')).splitlines(keepends=True)
+            if line.strip() != ''
+        ])
+        get_logger('ssh_pool').debug(f'{host} << {command_output.encode("utf-8")}')
+        return command_output, None
+
+    # === streaming
+
+    def exec_on_host_stream(self, host, command, **kwargs):
+        timeout = kwargs.get('timeout', int(self.config['default_timeout']))
+        until = kwargs.get('until')
+        loop = self._get_loop()
+        chunks = self.run_async(_create_queue(self.stream_queue_size))
+        # set when consumer has gone
+        stopped = asyncio.Event()
+
+        async def _put_lines(lines):
+            if stopped.is_set():
+                return True
+            await chunks.put(lines)
+            return False
+
+        async def _produce():
+            try:
+                await self._stream_command_async(host, command, self._get_env_vars_prefix(), timeout, _put_lines)
+            except asyncio.CancelledError:
+                # consumer has gone
+                raise
+            except BaseException:
+                if not stopped.is_set():
+                    await chunks.put(None)
+                raise
+            if not stopped.is_set():
+                await chunks.put(None)
+
+        async def _stop_producer():
+            stopped.set()
+            producer.cancel()
+            # cancellation is lost by `wait_for` when the read is completed at the same time,
+            # so producer blocked by the full queue is released and stops at the next chunk
+            while not chunks.empty():
+                chunks.get_nowait()
+            await asyncio.gather(producer, return_exceptions=True)
+
+        producer = self.run_async(_create_task(_produce()))
+        self._stream_stoppers.add(_stop_producer)
+        try:
+            while True:
+                lines = self.run_async(chunks.get())
+                if lines is None:
+                    break
+                for line in lines:
+                    yield line
+                    if until is not None and until(line):
+                        return
+            self.run_async(_wait_for(producer))
+        finally:
+            self._stream_stoppers.discard(_stop_producer)
+            # loop is gone if pool was closed before the stream
+            if self._loop is loop and not producer.done():
+                self.run_async(_stop_producer())
+
+    def exec_stream(self, commands, on_line, **kwargs):
+        self.run_async(self.exec_stream_async(commands, on_line, **kwargs))
+
+    async def exec_stream_async(self, commands, on_line, **kwargs):
+        """
+        Awaitable version of `exec_stream`, callback is called at pool event loop.
+        """
+        timeout = kwargs.get('timeout', int(self.config['default_timeout']))
+        env_vars = self._get_env_vars_prefix()
+
+        async def _stream_on_host(host, host_commands):
+            for command_idx, command in enumerate(host_commands):
+                async def _on_lines(lines):
+                    return any(on_line(host, command_idx, line) for line in lines)
+
+                await self._stream_command_async(host, command, env_vars, timeout, _on_lines)
+
+        await asyncio.gather(*[
+            _stream_on_host(host, host_commands) for host, host_commands in self._get_commands_for_hosts(commands)
+        ])
+
+    async def _stream_command_async(self, host, command, env_vars, timeout, on_lines):
+        """
+        Run command at host and pass non-empty output lines to `on_lines` coroutine chunk by chunk.
+        Remote process is closed as soon as `on_lines` returns True.
+        """
+        command = self._prepare_command(host, command, env_vars)
+        async with self._get_host_semaphore(host):
+            get_logger('ssh_pool').debug(f'{host} >> {command}')
+            async with self.connections[host].create_process(command) as process:
+                tail = ''
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(process.stdout.read(self.stream_chunk_size), timeout)
+                    except asyncio.TimeoutError:
+                        raise RemoteOperationTimeout(f'Timeout {timeout} reached while executing command:\n'
+                                                     f'Host: {host}\n'
+                                                     f'{command}')
+                    if not chunk:
+                        break
+                    lines = (tail + chunk).splitlines(keepends=True)
+                    tail = lines.pop() if not lines[-1].endswith('\n') else ''
+                    if await on_lines([line for line in lines if line.strip() != '']):
+                        return
+                if tail.strip() != '':
+                    await on_lines([tail])
+
+    # === files transfer
+
+    def download(self, remote_paths, local_path, prepend_host=True):
+        return self.run_async(self.download_async(remote_paths, local_path, prepend_host=prepend_host))
+
+    def download_from_host(self, host, remote_paths, local_paths):
+        return self.run_async(self.download_from_host_async(host, remote_paths, local_paths))
+
+    async def download_async(self, remote_paths, local_path, prepend_host=True):
+        raw_results = await asyncio.gather(*[
+            self.download_from_host_async(host, host_remote_paths, host_local_paths)
+            for host, host_remote_paths, host_local_paths
+            in self._get_files_for_hosts(remote_paths, local_path, prepend_host)
+        ])
+        results = []
+        for raw_result in raw_results:
+            results.extend(raw_result)
+        return results
+
+    async def download_from_host_async(self, host, remote_paths, local_paths):
+        if debug_async_ssh_pool:
+            log_print('download_from_host: \nhost: ' + repr(host) +
+                      '\nremote_paths:' + repr(remote_paths) + '\nlocal_paths: ' + repr(local_paths))
+        if type(remote_paths) != type([]):
+            remote_paths = [remote_paths]
+            local_paths = [local_paths]
+        result = []
+        try:
+            async with self._get_host_semaphore(host):
+                async with self.connections[host].start_sftp_client() as sftp:
+                    for remote_path, local_path in zip(remote_paths, local_paths):
+                        await sftp.get(remote_path, local_path)
+                        result.append(local_path)
+        except (OSError, asyncssh.Error) as e:
+            log_print('WARN: can\'t download file(s) from host ' + str(repr(remote_paths)) + ', ' + str(e), color='red')
+        return result
+
+    def upload_for_hosts(self, hosts, files, remote_path, internal_download=False):
+        if internal_download:
+            super(AsyncSshPool, self).upload_for_hosts(hosts, files, remote_path, internal_download=True)
+        else:
+            self.run_async(self.upload_for_hosts_async(hosts, files, remote_path))
+
+    def upload_on_host(self, host, files, remote_dir):
+        self.run_async(self.upload_on_host_async(host, files, remote_dir))
+
+    async def upload_async(self, files, remote_path):
+        await self.upload_for_hosts_async(self.hosts, files, remote_path)
+
+    async def upload_for_hosts_async(self, hosts, files, remote_path):
+        await asyncio.gather(*[self.upload_on_host_async(host, files, remote_path) for host in hosts])
+
+    async def upload_on_host_async(self, host, files, remote_dir):
+        try:
+            async with self._get_host_semaphore(host):
+                async with self.connections[host].start_sftp_client() as sftp:
+                    for local_file in files:
+                        remote_path = f'{remote_dir}/{basename(local_file)}'
+                        get_logger('ssh_pool').debug(f'sftp_put on host {host}: {local_file} -> {remote_path}')
+                        await sftp.put(local_file, remote_path)
+        except (OSError, asyncssh.Error) as e:
+            print(str(e))
+
+
+async def _create_queue(maxsize):
+    return asyncio.Queue(maxsize)
+
+
+async def _create_task(coro):
+    return asyncio.ensure_future(coro)
+
+
+async def _wait_for(task):
+    return await task
@@ -27,6 +27,7 @@ from tiden import *
 from tiden.artifacts import prepare
 from tiden.logger import *
 from tiden.runner import setup_test_environment, init_remote_hosts, upload_artifacts
+from tiden.shardedrunner import ShardedRunner
 from tiden.tidenfabric import TidenFabric
 from tiden.tidenrunner import TidenRunner
 
@@ -41,6 +42,7 @@ class ConnectionMode(Enum):
     SSH = 'paramiko'
     LOCAL = 'local'
     ANSIBLE = 'ansible'
+    ASYNC = 'asyncssh'
 
 
 def create_parser():
@@ -256,6 +258,13 @@ def init_ssh_pool(config):
             exit(1)
     elif 'paramiko' == config['connection_mode']:
         ssh_pool = SshPool(config['ssh'])
+    elif 'asyncssh' == config['connection_mode']:
+        try:
+            from tiden.asyncsshpool import AsyncSshPool
+            ssh_pool = AsyncSshPool(config['ssh'])
+        except ImportError as e:
+            log_put('ERROR: unable to import AsyncSshPool: %s' % e)
+            exit(1)
     elif 'local' == config['connection_mode']:
         config['ignite']['bind_to_host'] = True
         config['ignite']['unique_node_ports'] = True
@@ -337,18 +346,28 @@ def main():
         upload_artifacts(ssh_pool, config, remote_unzip_files)
 
         if pm.do_check('before_tests_run'):
-            tr.process_tests()
+            try:
+                if ShardedRunner.get_shards_num(config) > 1:
+                    ShardedRunner(config, tr.modules, init_ssh_pool).process_tests(tr.get_tests_results())
+                else:
+                    tr.process_tests()
+            finally:
+                # report is complete even if run is stopped by failed setup
+                tr.get_tests_results().close_xunit()
         else:
             exit_code = -1
         pm.do('after_tests_run')
 
     result = tr.get_tests_results()
-    result.flush_xunit()
+    result.close_xunit()
     result.print_summary()
     result.create_testrail_report(config, report_file=config.get('testrail_report'))
 
     print_blue("Execution time %d:%02d:%02d " % hms(int(time()) - result.get_started()))
 
+    if ssh_pool:
+        ssh_pool.close()
+
     if exit_code:
         exit(exit_code)
 
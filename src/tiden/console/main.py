@@ -17,7 +17,6 @@
 
 import sys
 from os.path import basename
-from unittest.mock import patch
 from importlib import import_module
 
 from ..tidenfabric import TidenFabric
@@ -66,6 +65,8 @@ def main():
         usage(basename(sys.argv[0]), allowed_commands)
         sys.exit(1)
 
+    from unittest.mock import patch
+
     args = sys.argv[1:]
     module = import_module(allowed_commands[cmd])
     if not module or not hasattr(module, 'main'):
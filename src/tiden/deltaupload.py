@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from hashlib import md5
+from mmap import mmap, ACCESS_READ
+from os import stat
+from os.path import realpath
+from threading import Lock
+
+
+class DeltaUpload:
+    """
+    Block level delta transfer of files to remote hosts.
+
+    Remote host reports md5 and head bytes (anchor) of every fixed size block of the old copy of file and
+    of partially uploaded `<file>.part` left by interrupted upload. Local file is matched against these blocks,
+    blocks shifted by inserted or removed bytes are found by their anchors. Matched blocks are copied by remote
+    `dd` from old files, only unmatched bytes are sent. New file is assembled in `<file>.part` and renamed
+    when complete, so failed upload resumes from what was already sent.
+    """
+
+    block_size = 4 * 1024 * 1024
+    anchor_size = 32
+    # number of old blocks near expected offset looked up after mismatch
+    search_anchors = 4
+    # bytes of local file looked through for the next matched block after mismatch
+    search_window = 64 * 1024 * 1024
+    # max number of anchor matches validated by block md5 per lookup
+    search_validations = 64
+    read_size = 1024 * 1024
+
+    md5_header = 'md5:'
+    file_header = 'file:'
+    block_header = 'block:'
+
+    def __init__(self, block_size=None, anchor_size=None):
+        if block_size is not None:
+            self.block_size = block_size
+        if anchor_size is not None:
+            self.anchor_size = anchor_size
+        self.lock = Lock()
+        self.md5_cache = {}
+        self.plan_cache = {}
+
+    def get_md5(self, file):
+        """
+        Streamed md5 of local file, cached while file size and modification time are the same
+        """
+        file_stat = stat(file)
+        key = (realpath(file), file_stat.st_size, file_stat.st_mtime_ns)
+        with self.lock:
+            if key in self.md5_cache:
+                return self.md5_cache[key]
+        hasher = md5()
+        with open(file, 'rb') as f:
+            for data in iter(lambda: f.read(self.read_size), b''):
+                hasher.update(data)
+        with self.lock:
+            self.md5_cache[key] = hasher.hexdigest()
+        return self.md5_cache[key]
+
+    def get_md5_command(self, remote_files):
+        """
+        Single command to get md5 of all remote files, see `parse_md5`
+        """
+        files = ' '.join([f"'{remote_file}'" for remote_file in remote_files])
+        return f'i=0; for f in {files}; do ' \
+               f'echo "{self.md5_header}$i $(md5sum 2>/dev/null < "$f" | cut -c1-32)"; i=$((i + 1)); done'
+
+    def parse_md5(self, output):
+        """
+        :return: dictionary <index of remote file>: <md5>, missing files are skipped
+        """
+        result = {}
+        for line in output.splitlines():
+            if not line.startswith(self.md5_header):
+                continue
+            values = line[len(self.md5_header):].split()
+            if len(values) == 2:
+                result[int(values[0])] = values[1]
+        return result
+
+    def get_signature_command(self, remote_files):
+        """
+        Single command to get block signatures of remote files and their partial uploads, see `parse_signatures`.
+        Partial upload `<file>.part` is moved to `<file>.part.prev` to keep it as source for the next upload.
+        """
+        files = ' '.join([f"'{remote_file}'" for remote_file in remote_files])
+        blocks_per_anchor = self.block_size // self.anchor_size
+        return f'for t in {files}; do ' \
+               f'[ -f "$t.part" ] && mv -f "$t.part" "$t.part.prev"; ' \
+               f'for f in "$t" "$t.part.prev"; do ' \
+               f'[ -f "$f" ] || continue; s=$(stat -L -c %s "$f"); echo "{self.file_header}$s $f"; i=0; ' \
+               f'while [ $((i * {self.block_size})) -lt $s ]; do ' \
+               f'h=$(dd if="$f" bs={self.block_size} skip=$i count=1 2>/dev/null | md5sum | cut -c1-32); ' \
+               f'a=$(dd if="$f" bs={self.anchor_size} skip=$((i * {blocks_per_anchor})) count=1 2>/dev/null ' \
+               f'| od -An -v -tx1 | tr -d \' \\n\'); ' \
+               f'echo "{self.block_header}$i $h $a"; i=$((i + 1)); ' \
+               f'done; done; done'
+
+    def parse_signatures(self, output):
+        """
+        :return: dictionary <remote file>: {size: <file size>, blocks: [(offset, length, md5, anchor bytes), ...]}
+        """
+        signatures = {}
+        signature = None
+        for line in output.splitlines():
+            if line.startswith(self.file_header):
+                size, remote_file = line[len(self.file_header):].split(' ', 1)
+                signature = signatures[remote_file] = {'size': int(size), 'blocks': []}
+            elif line.startswith(self.block_header) and signature is not None:
+                values = line[len(self.block_header):].split()
+                if len(values) != 3:
+                    continue
+                offset = int(values[0]) * self.block_size
+                signature['blocks'].append((
+                    offset,
+                    min(self.block_size, signature['size'] - offset),
+                    values[1],
+                    bytes.fromhex(values[2]),
+                ))
+        return signatures
+
+    def get_plan(self, local_file, signatures):
+        """
+        Match local file against blocks of remote files.
+        :param local_file: local file
+        :param signatures: remote block signatures as returned by `parse_signatures`
+        :return: the list of segments of local file, in order:
+            ('copy', <remote file>, <offset in remote file>, <offset>, <length>) - bytes are in remote file,
+            ('send', <offset>, <length>) - bytes are to be sent
+        """
+        file_stat = stat(local_file)
+        key = (
+            realpath(local_file), file_stat.st_size, file_stat.st_mtime_ns,
+            tuple(sorted((remote_file, signature['size'], tuple(block[2] for block in signature['blocks']))
+                         for remote_file, signature in signatures.items()))
+        )
+        with self.lock:
+            if key not in self.plan_cache:
+                self.plan_cache[key] = self._make_plan(local_file, file_stat.st_size, signatures)
+            return self.plan_cache[key]
+
+    def _make_plan(self, local_file, size, signatures):
+        anchors = {}
+        blocks = []
+        for remote_file, signature in signatures.items():
+            for offset, length, block_md5, anchor in signature['blocks']:
+                if len(anchor) < self.anchor_size:
+                    continue
+                block = (remote_file, offset, length, block_md5, anchor)
+                anchors.setdefault(anchor, []).append(block)
+                blocks.append(block)
+        if not blocks or size == 0:
+            return [('send', 0, size)] if size else []
+        blocks.sort(key=lambda block: block[1])
+
+        segments = []
+        with open(local_file, 'rb') as f, mmap(f.fileno(), 0, access=ACCESS_READ) as mm:
+            pos = 0
+            send_from = 0
+            shift = 0
+            while pos < size:
+                block = self._match(mm, pos, anchors.get(mm[pos:pos + self.anchor_size], []))
+                if block is None:
+                    next_pos = self._search(mm, pos + 1, pos - shift, blocks)
+                    pos = size if next_pos is None else next_pos
+                    continue
+                remote_file, offset, length = block[:3]
+                if send_from < pos:
+                    segments.append(('send', send_from, pos - send_from))
+                last = segments[-1] if segments else None
+                if last and last[0] == 'copy' and last[1] == remote_file and last[2] + last[4] == offset \
+                        and last[3] + last[4] == pos:
+                    segments[-1] = ('copy', remote_file, last[2], last[3], last[4] + length)
+                else:
+                    segments.append(('copy', remote_file, offset, pos, length))
+                shift = pos - offset
+                pos += length
+                send_from = pos
+            if send_from < size:
+                segments.append(('send', send_from, size - send_from))
+        return segments
+
+    @staticmethod
+    def _match(mm, pos, blocks):
+        for block in blocks:
+            length, block_md5 = block[2], block[3]
+            if pos + length <= len(mm) and md5(mm[pos:pos + length]).hexdigest() == block_md5:
+                return block
+        return None
+
+    def _search(self, mm, start, expected_offset, blocks):
+        """
+        Find the nearest position of local file where one of old blocks near expected offset begins
+        """
+        candidates = sorted(
+            [block for block in blocks if block[1] >= expected_offset - self.block_size],
+            key=lambda block: abs(block[1] - expected_offset)
+        )[:self.search_anchors]
+        end = min(len(mm), start + self.search_window)
+        found = None
+        validations = 0
+        for block in candidates:
+            pos = mm.find(block[4], start, end if found is None else found)
+            while pos != -1 and validations < self.search_validations:
+                validations += 1
+                if self._match(mm, pos, [block]):
+                    found = pos
+                    break
+                pos = mm.find(block[4], pos + 1, end if found is None else found)
+        if found is None and end < len(mm):
+            # nothing matched within window, send the window and look further
+            return end
+        return found
+
+    @staticmethod
+    def get_copy_commands(segments, target):
+        """
+        :return: the list of remote commands to copy matched blocks to the target file
+        """
+        return [
+            f"dd if='{remote_file}' of='{target}' bs=1M iflag=skip_bytes,count_bytes oflag=seek_bytes "
+            f"skip={offset} seek={pos} count={length} conv=notrunc status=none"
+            for kind, remote_file, offset, pos, length in [s for s in segments if s[0] == 'copy']
+        ]
+
+    @staticmethod
+    def get_sent_bytes(segments):
+        return sum([segment[2] for segment in segments if segment[0] == 'send'])
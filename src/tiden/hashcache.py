@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ProcessPoolExecutor
+from os import stat, cpu_count
+from os.path import realpath, exists
+
+import yaml
+
+from .util import calculate_sha256, load_yaml
+
+
+class HashCache:
+    """
+    Persistent cache of `calculate_sha256` results.
+    File hash is reused while file path, size, modification time and inode are the same.
+    """
+
+    def __init__(self, cache_path=None):
+        """
+        :param cache_path: YAML file to keep hashes between runs, cache is not persisted if None
+        """
+        self.cache_path = cache_path
+        self.hashes = {}
+        if cache_path is not None and exists(cache_path):
+            self.hashes = load_yaml(cache_path) or {}
+
+    @staticmethod
+    def _get_key(file):
+        file_stat = stat(file)
+        return [file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino]
+
+    def _get_cached(self, file):
+        cached = self.hashes.get(realpath(file))
+        if cached and cached['key'] == self._get_key(file):
+            return cached['sha256']
+        return None
+
+    def put(self, file, sha256, key=None):
+        """
+        Remember hash of the file, e.g. of just copied file
+        """
+        self.hashes[realpath(file)] = {'key': key if key is not None else self._get_key(file), 'sha256': sha256}
+
+    def get(self, file):
+        return self.get_many([file])[file]
+
+    def get_many(self, files, workers=None):
+        """
+        Calculate hashes of files, not cached files are hashed in parallel processes
+        :param files: the list of files
+        :param workers: number of processes, cpu count by default
+        :return: dictionary <file>: <hash>
+        """
+        result = {}
+        not_cached = []
+        for file in files:
+            sha256 = self._get_cached(file)
+            if sha256 is None:
+                if file not in not_cached:
+                    not_cached.append(file)
+            else:
+                result[file] = sha256
+        # take file keys before hashing, so file changed during hashing is not cached with stale hash
+        keys = [self._get_key(file) for file in not_cached]
+        if len(not_cached) == 1:
+            hashes = [calculate_sha256(not_cached[0])]
+        elif not_cached:
+            with ProcessPoolExecutor(max_workers=min(len(not_cached), workers or cpu_count() or 1)) as executor:
+                hashes = list(executor.map(calculate_sha256, not_cached))
+        else:
+            hashes = []
+        for file, key, sha256 in zip(not_cached, keys, hashes):
+            self.put(file, sha256, key)
+            result[file] = sha256
+        return result
+
+    def save(self):
+        if self.cache_path is None:
+            return
+        hashes = {file: cached for file, cached in self.hashes.items() if exists(file)}
+        with open(self.cache_path, 'w') as cache_file:
+            yaml.dump(hashes, cache_file)
@@ -135,6 +135,44 @@ class LocalPool(SshPool):
 
         return {host: output}
 
+    def exec_on_host_stream(self, host, command, **kwargs):
+        if debug_local_pool:
+            print("%s: exec_on_host_stream(%s, %s)" % (
+                LocalPool._now(),
+                host,
+                command,
+            ))
+        until = kwargs.get('until')
+        host_home = path.join(self.home, host)
+        env = environ.copy()
+        if self.config.get('env_vars'):
+            env.update(self.config['env_vars'])
+        if command.endswith('2>&1'):
+            command = command[:-(len('2>&1'))]
+        if self.home in command:
+            command = command.replace(self.home, host_home)
+        get_logger('tiden').debug('%s >> %s' % (host, command))
+
+        proc = subprocess.Popen(
+            command,
+            shell=True,
+            env=env,
+            cwd=host_home,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True
+        )
+        try:
+            for line in proc.stdout:
+                yield line
+                if until is not None and until(line):
+                    break
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+            proc.stdout.close()
+            proc.wait()
+
     def get_process_and_owners(self):
         return self.jps()
 
@@ -179,6 +217,15 @@ class LocalPool(SshPool):
             results.append({'host': bound_to_host, 'pid': result['pid'], 'name': result['name']})
         return results
 
+    def get_java_processes(self, hosts=None):
+        """
+        Processes are listed by hacked `jps`, see above
+        """
+        return [
+            dict(process, owner=None, args=process['name']) for process in self.jps()
+            if hosts is None or process['host'] in hosts
+        ]
+
     def killall(self, name, sig=-9):
         """
         killall is also hacked to be executed on first host only
@@ -17,8 +17,11 @@
 from datetime import datetime
 from sys import stdout
 from threading import Thread, current_thread
-from copy import deepcopy
 from logging import Formatter, Logger, Filter, NOTSET
+from logging.handlers import QueueHandler, QueueListener
+from os import register_at_fork
+from queue import Queue
+import atexit
 import logging
 import sys
 
@@ -60,15 +63,74 @@ class TidenLoggerFilter(Filter):
         return True
 
 
+class TidenFormatter(Formatter):
+    """
+    Formatter which applies `skip_prefix` and `rewrite` options of `TidenLogger.info` passed with the record
+    """
+
+    def __init__(self, fmt=None, datefmt=None):
+        super().__init__(fmt, datefmt)
+        self.skip_prefix_formatter = Formatter('%(message)s')
+        self.rewrite_formatter = Formatter('\r{}'.format(self._fmt), datefmt)
+        self.rewrite_skip_prefix_formatter = Formatter('\r%(message)s')
+
+    def format(self, record):
+        rewrite = getattr(record, 'tiden_rewrite', False)
+        skip_prefix = getattr(record, 'tiden_skip_prefix', False)
+        if rewrite and skip_prefix:
+            return self.rewrite_skip_prefix_formatter.format(record)
+        if rewrite:
+            return self.rewrite_formatter.format(record)
+        if skip_prefix:
+            return self.skip_prefix_formatter.format(record)
+        return super().format(record)
+
+
+def _emit(handler, record):
+    """
+    `StreamHandler.emit` without terminator for records logged with `skip_newline`
+    """
+    try:
+        msg = handler.format(record)
+        handler.stream.write(msg if getattr(record, 'tiden_skip_newline', False) else msg + handler.terminator)
+        handler.flush()
+    except RecursionError:
+        raise
+    except Exception:
+        handler.handleError(record)
+
+
+class TidenStreamHandler(logging.StreamHandler):
+
+    def emit(self, record):
+        _emit(self, record)
+
+
+class TidenFileHandler(logging.FileHandler):
+
+    def emit(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        _emit(self, record)
+
+
 class TidenLogger(Logger):
-    """Tiden logging implementation"""
+    """
+    Tiden logging implementation.
+
+    Records are formatted and written by handlers in the background thread (`QueueHandler` and `QueueListener`),
+    so logging in polling loops does not wait for console and file. Forked processes write records synchronously.
+    """
 
     env_config = None
-    default_formatter = logging.Formatter('%(asctime)s - %(levelname)-8s - %(suite_name)s%(test_name)s %(message)s')
+    default_formatter = TidenFormatter('%(asctime)s - %(levelname)-8s - %(suite_name)s%(test_name)s %(message)s')
+    # write records in the background thread
+    async_writer = True
 
     def __init__(self, name, level=NOTSET):
         super().__init__(name, level=level)
 
+        self.writer = None
         self.addFilter(TidenLoggerFilter())
         self.add_handlers()
 
@@ -79,40 +141,58 @@ class TidenLogger(Logger):
 
         if TidenLogger.env_config and not self.handlers:
             config = TidenLogger.env_config
+            handlers = []
             for handler in config.keys():
                 if handler == 'console':
-                    _hdr = logging.StreamHandler(sys.stdout)
-                    _hdr.setFormatter(logging.Formatter('%(message)s', '%H:%M:%S'))
+                    _hdr = TidenStreamHandler(sys.stdout)
+                    _hdr.setFormatter(TidenFormatter('%(message)s', '%H:%M:%S'))
                 if handler == 'file_handler':
-                    _hdr = logging.FileHandler(config.get('file_handler').get('log_file'))
+                    _hdr = TidenFileHandler(config.get('file_handler').get('log_file'))
                     _hdr.setFormatter(self.default_formatter)
 
                 _hdr.setLevel(logging._nameToLevel.get(config[handler].get('log_level', 'INFO')))
-                self.addHandler(_hdr)
+                handlers.append(_hdr)
+
+            if self.async_writer:
+                self.writer = QueueListener(Queue(), *handlers, respect_handler_level=True)
+                self.addHandler(QueueHandler(self.writer.queue))
+                self.writer.start()
+            else:
+                for _hdr in handlers:
+                    self.addHandler(_hdr)
+
+    def stop_writer(self):
+        """
+        Write all queued records and stop the background writer, handlers are called directly after that
+        """
+        if self.writer is None:
+            return
+        writer, self.writer = self.writer, None
+        for hdlr in list(self.handlers):
+            if isinstance(hdlr, QueueHandler):
+                self.removeHandler(hdlr)
+        writer.stop()
+        for hdlr in writer.handlers:
+            self.addHandler(hdlr)
+
+    def _detach_writer(self):
+        """
+        Writer thread does not exist in forked process, records are written by handlers directly
+        """
+        if self.writer is None:
+            return
+        writer, self.writer = self.writer, None
+        for hdlr in list(self.handlers):
+            if isinstance(hdlr, QueueHandler):
+                self.removeHandler(hdlr)
+        for hdlr in writer.handlers:
+            self.addHandler(hdlr)
 
     def info(self, msg, *args, **kwargs):
-        skip_newline = kwargs.pop('skip_newline', False)
-        skip_prefix = kwargs.pop('skip_prefix', False)
-        rewrite = kwargs.pop('rewrite', False)
-
-        if skip_newline:
-            hdlrs_terminators = [deepcopy(hdlr.terminator) for hdlr in self.handlers]
-
-            for hdlr in self.handlers:
-                hdlr.terminator = ""
-
-        if skip_prefix or rewrite:
-            hdlrs_formatters = [deepcopy(hdlr.formatter) for hdlr in self.handlers]
-
-            for hdlr in self.handlers:
-                if rewrite and skip_prefix:
-                    hdlr.setFormatter(Formatter('\r%(message)s'))
-                    continue
-                if rewrite and not skip_prefix:
-                    hdlr.setFormatter(Formatter('\r{}'.format(hdlr.formatter._fmt)))
-                    continue
-                if not rewrite and skip_prefix:
-                    hdlr.setFormatter(Formatter('%(message)s'))
+        extra = dict(kwargs.pop('extra', None) or {})
+        extra['tiden_skip_newline'] = kwargs.pop('skip_newline', False)
+        extra['tiden_skip_prefix'] = kwargs.pop('skip_prefix', False)
+        extra['tiden_rewrite'] = kwargs.pop('rewrite', False)
 
         _colors = dict(black=30, red=31, green=32, yellow=33,
                        blue=34, magenta=35, cyan=36, white=37)
@@ -121,16 +201,7 @@ class TidenLogger(Logger):
         if color:
             msg = color_fmt_str % (_colors.get(color), msg)
 
-        super(TidenLogger, self).info(msg, *args, **kwargs)
-
-        if skip_newline:
-            for i in range(len(hdlrs_terminators)):
-                self.handlers[i].terminator = hdlrs_terminators[i]
-
-        if skip_prefix or rewrite:
-            for i in range(len(hdlrs_formatters)):
-
-                self.handlers[i].setFormatter(hdlrs_formatters[i])
+        super(TidenLogger, self).info(msg, *args, extra=extra, **kwargs)
 
     def set_suite(self, name):
         """Set logger suite name"""
@@ -160,3 +231,17 @@ class TidenLogger(Logger):
     def get_logger_env_config(self):
         return self.env_config
 
+
+
+def _stop_writers():
+    for logger in list(_loggers.values()):
+        logger.stop_writer()
+
+
+def _detach_writers():
+    for logger in list(_loggers.values()):
+        logger._detach_writer()
+
+
+atexit.register(_stop_writers)
+register_at_fork(after_in_child=_detach_writers)
@@ -86,6 +86,14 @@ class NasManager:
                 exit(1)
         elif 'paramiko' == connection_mode:
             self.ssh = SshPool(config['ssh'])
+        elif 'asyncssh' == connection_mode:
+            try:
+                from tiden.asyncsshpool import AsyncSshPool
+
+                self.ssh = AsyncSshPool(config['ssh'])
+            except ImportError as e:
+                log_put('Error: unable to import AsyncSshPool: %s' % e)
+                exit(1)
         elif 'local' == connection_mode:
             try:
                 from tiden.localpool import LocalPool
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from traceback import format_exc
+
+from tiden.tidenplugin import TidenPlugin
+
+TIDEN_PLUGIN_VERSION = '1.0.0'
+
+
+class ExceptionIndexer(TidenPlugin):
+    """
+    Build exception index of node logs (`Ignite.build_exception_index`) before every test teardown,
+    while logs of the test nodes are still in place. Index is saved to the test results directory.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.print_top = int(self.options.get('print_top', 3))
+
+    def before_test_method_teardown(self, test_module, test_class, *args, **kwargs):
+        tiden = getattr(test_class, 'tiden', None)
+        if tiden is None:
+            return
+        for app_name in tiden.apps.get_running_apps():
+            app = tiden.apps.get_app(app_name)
+            if not hasattr(app, 'build_exception_index') or not getattr(app, 'nodes', None):
+                continue
+            try:
+                index = app.build_exception_index()
+            except Exception:
+                self.log_print(f'Failed to build exception index of {app_name}:\n{format_exc()}', color='red')
+                continue
+            signatures = index.get_signatures()
+            if not signatures:
+                continue
+            self.log_print(f'{app_name}: {len(signatures)} exception signature(s) found in node logs', color='red')
+            for entry in signatures[:self.print_top]:
+                self.log_print(f"  {entry['count']} x {entry['exception']} on {len(entry['nodes'])} node(s)")
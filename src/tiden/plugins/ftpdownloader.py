@@ -14,7 +14,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from tiden.artifacts import get_remote_extract_command, get_remote_extracted_dir, get_remote_link_command
 from tiden.tidenplugin import TidenPlugin, TidenPluginException
+from tiden.treedistribution import TreeDistribution
 from tiden.util import log_print, get_host_list
 
 from re import search
@@ -50,6 +52,8 @@ class FtpDownloader(TidenPlugin):
                 self.artifacts[artifact_name] = {
                     'file_name': artifact['glob_path'].split('/')[-1],
                     'path_on_host': '{}/{}'.format(self.config['remote']['suite_var_dir'], artifact_name),
+                    # archive content is checked by md5 of downloaded file, directory is kept between runs
+                    'extracted_on_host': get_remote_extracted_dir(self.config, artifact_name, artifact['glob_path']),
                     'ftp_url': '{}/{}'.format(self.download_url, artifact['glob_path'][4:]),
                     'artifact_on_host': '{}/{}'.format(
                         self.config['remote']['artifacts_dir'],
@@ -126,8 +130,9 @@ class FtpDownloader(TidenPlugin):
         """
         1. Download file from FTP to one host.
         2. Download from this host to others hosts over scp.
-        2. Unzip file to dir = self.config['remote']['suite_var_dir'] + artifact_name
-        3. Remove top level dir if needed.
+        3. Unzip file to dir kept between runs (see `get_remote_extracted_dir`), symlink it as
+           self.config['remote']['suite_var_dir'] + artifact_name
+        4. Remove top level dir if needed.
         :return: remote_path
         """
         hosts = get_host_list(
@@ -146,14 +151,16 @@ class FtpDownloader(TidenPlugin):
             artifact_file_name = self._get_art_info('file_name')
             unzip_dir_name = '.'.join(artifact_file_name.split('.')[:-1])
             remote_path = self._get_art_info('path_on_host')
+            extracted_path = self._get_art_info('extracted_on_host')
             artifact_full_path = '{}/{}'.format(self.config['remote']['artifacts_dir'], artifact_file_name)
 
-            unzip_cmd = self._unzip_command(artifact_full_path, remote_path)
-            self.ssh.exec(unzip_cmd)
+            unzip_cmd = self._unzip_command(artifact_full_path, extracted_path)
+            self.ssh.exec([unzip_cmd, get_remote_link_command(extracted_path, remote_path)])
 
             # This hack need to remove top level directory
-            self.ssh.exec(['mv {r_path}/{unzip_dir}/* {r_path}; rm -rf {r_path}/{unzip_dir}'.format(
-                r_path=remote_path,
+            self.ssh.exec(['[ ! -d {r_path}/{unzip_dir} ] || '
+                           '{{ mv {r_path}/{unzip_dir}/* {r_path}; rm -rf {r_path}/{unzip_dir}; }}'.format(
+                r_path=extracted_path,
                 unzip_dir=unzip_dir_name
 
             )])
@@ -169,15 +176,10 @@ class FtpDownloader(TidenPlugin):
         :return:                unzip command
         """
 
-        unzip_cmd = "unzip -u -q {} -d {}".format(artifact_full_path, remote_path)
-
         tar_formats = [".tar", '.tar.gz', '.tgz']
         found_formats = [fmt for fmt in tar_formats if artifact_full_path.endswith(fmt)]
-        if found_formats:
-            unzip_cmd = "mkdir {dir_name}; tar -xf {artifact_path} -C {dir_name} --strip-components 1".format(
-                dir_name=remote_path,
-                artifact_path=artifact_full_path,
-            )
+        unzip_cmd = get_remote_extract_command(artifact_full_path, remote_path,
+                                               strip_components=1 if found_formats else 0)
 
         return unzip_cmd
 
@@ -186,10 +188,9 @@ class FtpDownloader(TidenPlugin):
         self.ssh.exec(download_with_wget)
 
     def _download_with_scp(self, host_from, hosts_to, artifact_full_path):
-        download_from_host = {}
-        for host in hosts_to:
-            download_from_host[host] = ['scp {}:{} {}'.format(host_from, artifact_full_path, artifact_full_path)]
-        self.ssh.exec(download_from_host)
+        TreeDistribution(self.ssh, copy_command=TreeDistribution.scp_command).distribute(
+            [artifact_full_path], host_from, hosts_to
+        )
 
     def _get_art_info(self, key):
         return self.artifacts[self.current_artifact].get(key)
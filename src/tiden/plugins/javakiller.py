@@ -27,15 +27,12 @@ class JavaKiller(TidenPlugin):
 
     def before_hosts_setup(self, *args, **kwargs):
         # Kill java process on hosts
-        skip_ps_termination, another_user_ps = self.skip_process_termination()
+        skip_ps_termination, _ = self.skip_process_termination()
         if skip_ps_termination:
             exit('WARNING: Found Java processes owned by another user')
 
-        jps_func = self.ssh.jps
-        if another_user_ps:
-            jps_func = self.ssh.get_process_and_owners
-
-        java_processes = jps_func()
+        process_table = self.ssh.get_process_table()
+        java_processes = process_table.get_processes()
         if len(java_processes) > 0:
             self.log_print('Existing java processes on hosts:')
             hosts_java_procs = set()
@@ -46,7 +43,10 @@ class JavaKiller(TidenPlugin):
                     hosts_java_procs.add(cur_host)
                     for proc_for_host in java_processes:
                         if proc_for_host['host'] == cur_host:
-                            cur_procs.append({'name': proc_for_host.get('name'), 'pid': proc_for_host.get('pid')})
+                            cur_procs.append({
+                                'name': proc_for_host.get('name') or proc_for_host.get('args'),
+                                'pid': proc_for_host.get('pid')
+                            })
                     if len(cur_procs) > 0:
                         self.log_print('\t%s:' % cur_host)
                         for cur_proc in cur_procs:
@@ -56,7 +56,7 @@ class JavaKiller(TidenPlugin):
                 self.log_put('Kill java processes on hosts: running %s' % len(java_processes))
                 self.ssh.killall('java')
                 while len(java_processes) > 0 and timeout_counter > 0:
-                    java_processes = jps_func()
+                    java_processes = process_table.get_processes(refresh=True)
                     self.log_put('Kill java processes on hosts: running %s' % len(java_processes))
                     sleep(5)
                     timeout_counter -= 5
@@ -69,18 +69,16 @@ class JavaKiller(TidenPlugin):
 
     def skip_process_termination(self):
         skip_termination, another_user_ps = False, False
-        owner_processes = self.ssh.get_process_and_owners()
-        for details in owner_processes:
-            if details.get('owner') and details.get('owner') != self.config['environment']['username']:
-                self.print_red(
-                    'Find process with PID: %s by user: %s on host: %s' % (
-                        details.get('pid'), details.get('owner'), details.get('host'))
-                )
-                another_user_ps = True
-                if self.options.get('force_setup'):
-                    self.print_red('Going to terminate processes from another user !!!')
-                else:
-                    skip_termination = True
+        for details in self.ssh.get_process_table().alien_processes(self.config['environment']['username']):
+            self.print_red(
+                'Find process with PID: %s by user: %s on host: %s' % (
+                    details.get('pid'), details.get('owner'), details.get('host'))
+            )
+            another_user_ps = True
+            if self.options.get('force_setup'):
+                self.print_red('Going to terminate processes from another user !!!')
+            else:
+                skip_termination = True
         if skip_termination:
             self.print_red('force_setup flag is not set. Runner will be stopped !!!')
         return skip_termination, another_user_ps
@@ -25,16 +25,17 @@ class Priorities(IntEnum):
     HIGH = -100000
 
 
-def get_priority_key(test_class):
+def get_priority_key(test_class, secondary_key=None):
     """
     key function to enforce ordering on test methods of given test class
     :param test_class: Tiden TestCase object instance
+    :param secondary_key: optional key function of full test name to order tests of the same priority
     :return: function to be passed to `sorted` via key argument
     """
 
-    def priority_comparator(test_name_a, test_name_b):
-        test_name_a = test_name_a.split('(')[0] if '(' in test_name_a else test_name_a
-        test_name_b = test_name_b.split('(')[0] if '(' in test_name_b else test_name_b
+    def priority_comparator(full_test_name_a, full_test_name_b):
+        test_name_a = full_test_name_a.split('(')[0] if '(' in full_test_name_a else full_test_name_a
+        test_name_b = full_test_name_b.split('(')[0] if '(' in full_test_name_b else full_test_name_b
         test_a = getattr(test_class, test_name_a)
         test_b = getattr(test_class, test_name_b)
         priority_a = int(Priorities.NORMAL) if not hasattr(test_a, '__priority__') else getattr(test_a, '__priority__')
@@ -43,6 +44,13 @@ def get_priority_key(test_class):
             return -1
         if priority_a > priority_b:
             return 1
+        if secondary_key is not None:
+            key_a = secondary_key(full_test_name_a)
+            key_b = secondary_key(full_test_name_b)
+            if key_a < key_b:
+                return -1
+            if key_a > key_b:
+                return 1
         if test_name_a < test_name_b:
             return -1
         if test_name_a > test_name_b:
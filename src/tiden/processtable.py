@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from threading import Lock
+from time import time
+
+
+class ProcessTable:
+    """
+    Snapshot of java processes of all hosts of ssh pool.
+
+    Processes are listed by a single command per host (`SshPool.get_java_processes`) for all hosts at once,
+    the snapshot is reused for `ttl` seconds. Nodes start and kill invalidate the snapshot, so liveness checks
+    in loops over nodes are answered from memory. Queries see only processes of the user tests are run by
+    (`owner`), processes of other users are listed by `alien_processes`.
+    """
+
+    # seconds to reuse snapshot
+    default_ttl = 2.0
+
+    def __init__(self, ssh, ttl=None, owner=None):
+        """
+        :param ssh: ssh pool
+        :param ttl: (optional) seconds to reuse snapshot
+        :param owner: (optional) user name tests are run by, ssh pool user by default
+        """
+        self.ssh = ssh
+        self.ttl = self.default_ttl if ttl is None else ttl
+        self.owner = owner if owner is not None else getattr(ssh, 'username', None)
+        self.lock = Lock()
+        self.processes = None
+        self.collected = 0.0
+
+    def invalidate(self):
+        """
+        Drop snapshot, processes are listed again on the next query
+        """
+        with self.lock:
+            self.processes = None
+
+    def get_processes(self, hosts=None, skip_reserved_java_processes=True, refresh=False, own_processes_only=True):
+        """
+        :param hosts: (optional) hosts to get processes of
+        :param skip_reserved_java_processes: (optional, default True) skip known developer/debugger java processes
+        :param refresh: list processes even when snapshot is not expired
+        :param own_processes_only: (optional, default True) skip processes of other users, see `is_own`
+        :return: list of dictionaries:
+           'host': host
+           'pid': java process pid (string, as `jps` returns)
+           'name': java process name by `jps -l`, None for processes not visible to `jps` (e.g. of other users)
+           'owner': java process owner, None if unknown
+           'args': command line, None if unknown
+        """
+        with self.lock:
+            if refresh or self.processes is None or time() - self.collected > self.ttl:
+                self.processes = self.ssh.get_java_processes()
+                self.collected = time()
+            processes = self.processes
+        return [
+            process for process in processes
+            if (hosts is None or process['host'] in hosts) and
+            not (skip_reserved_java_processes and self.is_reserved(process)) and
+            not (own_processes_only and not self.is_own(process))
+        ]
+
+    def is_own(self, process):
+        """
+        :return: True for process visible to `jps` or owned by the user tests are run by
+        """
+        return process.get('name') is not None or \
+            (self.owner is not None and process.get('owner') == self.owner)
+
+    def is_reserved(self, process):
+        from .sshpool import SshPool
+
+        process_line = '%s %s' % (process.get('name') or '', process.get('args') or '')
+        for proc_name in SshPool._reserved_java_processes():
+            if proc_name in process_line:
+                return True
+        return False
+
+    def is_alive(self, pid, host=None):
+        """
+        :param pid: process id
+        :param host: (optional) host of process, any host by default
+        :return: True if java process is running
+        """
+        pid = int(pid)
+        for process in self.get_processes(hosts=[host] if host else None, skip_reserved_java_processes=False):
+            if int(process['pid']) == pid:
+                return True
+        return False
+
+    def pids_by_node(self, nodes):
+        """
+        :param nodes: dictionary <node id>: <node> with 'host' and 'PID' keys, e.g. `App.nodes`
+        :return: dictionary <node id>: <PID> for nodes which processes are running
+        """
+        alive = set([
+            (process['host'], int(process['pid']))
+            for process in self.get_processes(skip_reserved_java_processes=False)
+        ])
+        pids = {}
+        for node_id, node in nodes.items():
+            if node and node.get('PID') and (node.get('host'), int(node['PID'])) in alive:
+                pids[node_id] = int(node['PID'])
+        return pids
+
+    def alien_processes(self, owner):
+        """
+        :param owner: user name tests are run by
+        :return: processes (see `get_processes`) owned by other users
+        """
+        return [
+            process for process in self.get_processes(own_processes_only=False)
+            if process.get('owner') and process['owner'] != owner
+        ]
+
+    def find(self, host, *patterns, exclude=()):
+        """
+        :param host: host of process
+        :param patterns: strings the command line must contain
+        :param exclude: strings the command line must not contain
+        :return: processes which command line (or name) matches
+        """
+        found = []
+        for process in self.get_processes(hosts=[host]):
+            process_line = process.get('args') or process.get('name') or ''
+            if all([pattern in process_line for pattern in patterns]) and \
+                    not any([pattern in process_line for pattern in exclude]):
+                found.append(process)
+        return found
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import stat
+import tarfile
+from copy import deepcopy
+from fnmatch import fnmatch
+from io import BytesIO
+from os import chmod, mkdir, umask, utime, walk
+from os import stat as os_stat
+from os.path import basename, join, normpath
+from shutil import copyfileobj, rmtree
+from tempfile import SpooledTemporaryFile, mkdtemp
+from time import localtime, time
+from zipfile import ZipInfo
+
+
+class RepackTreeError(Exception):
+    """
+    Repack rule can't be applied without extraction of archive
+    """
+    pass
+
+
+class RepackTree:
+    """
+    Content of the archive being repacked as a tree of entries.
+
+    Repack rules (delete, move, copy, mkdir) change the tree only, archive is not extracted: entry of the tree
+    refers to the member of source archive, to the local file or keeps small data in memory.
+    Repacked archive is written by streaming members from source archive, only added files are read from disk.
+
+    Entry is a dictionary: source, mtime and mode of extracted file (None - time of repack and default mode),
+    `children` for directories. Source is one of ('member', <member name>), ('path', <local path>),
+    ('data', <bytes>) or None for directories.
+    """
+
+    def __init__(self, root_path):
+        """
+        :param root_path: local path of the artifact root as it is referenced by repack rules (`self:`)
+        """
+        self.root_path = root_path
+        self.root = self._dir_entry()
+        self.now = time()
+        current_umask = umask(0)
+        umask(current_umask)
+        self.file_mode = stat.S_IFREG | (0o666 & ~current_umask)
+        self.dir_mode = stat.S_IFDIR | (0o777 & ~current_umask)
+
+    @staticmethod
+    def _dir_entry(source=None, mtime=None, mode=None):
+        return {'source': source, 'mtime': mtime, 'mode': mode, 'children': {}}
+
+    @staticmethod
+    def _file_entry(source, mtime=None, mode=None):
+        return {'source': source, 'mtime': mtime, 'mode': mode}
+
+    @staticmethod
+    def get_prefix(names):
+        """
+        The only top level directory of archive is the artifact root, like `self:` of extracted artifact
+        :param names: archive member names
+        :return: top level directory or '' when artifact root is the root of archive
+        """
+        top_dirs = set()
+        for name in names:
+            parts = RepackTree.split(name)
+            if len(parts) > 1 or (parts and name.endswith('/')):
+                top_dirs.add(parts[0])
+        return list(top_dirs)[0] if len(top_dirs) == 1 else ''
+
+    @staticmethod
+    def split(name):
+        return [part for part in normpath(name).split('/') if part not in ('', '.')]
+
+    def add_member(self, name, is_dir, mtime=None, mode=None, prefix=''):
+        """
+        Add source archive member to the tree
+        :param prefix: top level directory of the archive, members outside are skipped
+        """
+        parts = self.split(name)
+        if prefix:
+            if not parts or parts[0] != prefix:
+                return
+            parts = parts[1:]
+        if not parts:
+            return
+        parent = self.root
+        for part in parts[:-1]:
+            parent = parent['children'].setdefault(part, self._dir_entry())
+        if is_dir:
+            entry = parent['children'].setdefault(parts[-1], self._dir_entry())
+            entry['mtime'], entry['mode'] = mtime, mode
+        else:
+            parent['children'][parts[-1]] = self._file_entry(('member', name), mtime, mode)
+
+    def is_inside(self, local_path):
+        return local_path == self.root_path or local_path.startswith(self.root_path + '/')
+
+    def _parts(self, local_path):
+        return self.split(local_path[len(self.root_path):])
+
+    def _get(self, parts):
+        entry = self.root
+        for part in parts:
+            if 'children' not in entry or part not in entry['children']:
+                return None
+            entry = entry['children'][part]
+        return entry
+
+    def get(self, local_path):
+        return self._get(self._parts(local_path))
+
+    def isdir(self, local_path):
+        entry = self.get(local_path)
+        return entry is not None and 'children' in entry
+
+    def isfile(self, local_path):
+        entry = self.get(local_path)
+        return entry is not None and 'children' not in entry
+
+    def _put(self, parts, entry):
+        parent = self._get(parts[:-1])
+        if parent is None or 'children' not in parent:
+            raise FileNotFoundError(f"No such directory: {join(self.root_path, *parts[:-1])}")
+        parent['children'][parts[-1]] = entry
+
+    def _pop(self, parts):
+        return self._get(parts[:-1])['children'].pop(parts[-1])
+
+    def glob(self, pattern):
+        """
+        :return: sorted paths of entries matched by glob pattern
+        """
+        found = [[]]
+        for pattern_part in self._parts(pattern):
+            matched = []
+            for parts in found:
+                entry = self._get(parts)
+                if entry is None or 'children' not in entry:
+                    continue
+                for name in entry['children']:
+                    if name.startswith('.') and not pattern_part.startswith('.'):
+                        continue
+                    if fnmatch(name, pattern_part):
+                        matched.append(parts + [name])
+            found = matched
+        return sorted([join(self.root_path, *parts) for parts in found])
+
+    def delete(self, local_path):
+        parts = self._parts(local_path)
+        if parts and self._get(parts) is not None:
+            self._pop(parts)
+
+    def mkdir(self, local_path):
+        parts = self._parts(local_path)
+        if not parts or self._get(parts) is not None:
+            raise FileExistsError(f"File exists: {local_path}")
+        self._put(parts, self._dir_entry())
+
+    def move(self, src, dst):
+        """
+        `shutil.move` within the tree
+        """
+        src_parts = self._parts(src)
+        if not src_parts or self._get(src_parts) is None:
+            raise FileNotFoundError(f"No such file or directory: {src}")
+        dst_parts = self._parts(dst)
+        if self.isdir(dst):
+            dst_parts = dst_parts + [src_parts[-1]]
+            if self._get(dst_parts) is not None:
+                raise FileExistsError(f"Destination path {join(self.root_path, *dst_parts)} already exists")
+        if dst_parts[:len(src_parts)] == src_parts:
+            raise RepackTreeError(f"Cannot move a directory {src} into itself {dst}")
+        self._put(dst_parts, self._pop(src_parts))
+
+    def copy_file(self, src, dst):
+        """
+        `shutil.copy` of the tree entry or of the local file to the tree
+        """
+        if self.is_inside(src):
+            entry = self.get(src)
+            source, mode = entry['source'], entry['mode']
+        else:
+            source, mode = ('path', src), os_stat(src).st_mode
+        dst_parts = self._parts(dst)
+        if self.isdir(dst):
+            dst_parts = dst_parts + [basename(src)]
+        self._put(dst_parts, self._file_entry(source, None, mode))
+
+    def copy_tree(self, src, dst):
+        """
+        `shutil.copytree` of the tree directory or of the local directory to the tree
+        """
+        dst_parts = self._parts(dst)
+        if self._get(dst_parts) is not None:
+            raise FileExistsError(f"File exists: {dst}")
+        if self.is_inside(src):
+            entry = deepcopy(self.get(src))
+            self._fix_times(entry)
+            self._put(dst_parts, entry)
+            return
+        src_stat = os_stat(src)
+        self._put(dst_parts, self._dir_entry(None, src_stat.st_mtime, src_stat.st_mode))
+        for dir_name, dirs, files in walk(src):
+            rel_parts = self.split(dir_name[len(src):])
+            for name in dirs:
+                dir_stat = os_stat(join(dir_name, name))
+                self._put(dst_parts + rel_parts + [name], self._dir_entry(None, dir_stat.st_mtime, dir_stat.st_mode))
+            for name in files:
+                file_stat = os_stat(join(dir_name, name))
+                self._put(dst_parts + rel_parts + [name],
+                          self._file_entry(('path', join(dir_name, name)), file_stat.st_mtime, file_stat.st_mode))
+
+    def _fix_times(self, entry):
+        # copied files keep time of the source which is the time of extraction for archive members
+        if entry['mtime'] is None:
+            entry['mtime'] = self.now
+        for child in entry.get('children', {}).values():
+            self._fix_times(child)
+
+    def add_data(self, local_path, data):
+        self._put(self._parts(local_path), self._file_entry(('data', data)))
+
+    def read(self, local_path, read_member):
+        """
+        :param read_member: function to read source archive member by name
+        :return: content of the tree file
+        """
+        kind, value = self.get(local_path)['source']
+        if kind == 'member':
+            return read_member(value)
+        if kind == 'path':
+            with open(value, 'rb') as f:
+                return f.read()
+        return value
+
+    def walk(self):
+        """
+        Entries in order of `sorted(os.walk())` of extracted directory
+        :return: the list of tuples (directory path, directory entry, sorted list of (file name, file entry))
+        """
+        dirs = []
+
+        def _walk(rel_path, entry):
+            files = []
+            for name, child in entry['children'].items():
+                if 'children' in child:
+                    _walk(f'{rel_path}/{name}', child)
+                else:
+                    files.append((name, child))
+            dirs.append((rel_path, entry, sorted(files, key=lambda file: file[0])))
+
+        _walk('', self.root)
+        return sorted(dirs, key=lambda item: item[0])
+
+    def _get_mtime(self, entry):
+        return entry['mtime'] if entry['mtime'] is not None else self.now
+
+    def _get_mode(self, entry, is_dir):
+        if entry['mode'] is not None:
+            return entry['mode']
+        return self.dir_mode if is_dir else self.file_mode
+
+    def write_zip(self, output, source_zip, extra_files=()):
+        """
+        Write the tree to zip archive (stored, like `ZipFile.write` of extracted files)
+        :param output: opened ZipFile to write to
+        :param source_zip: opened source ZipFile
+        :param extra_files: the list of (local file, archive name) to add at the end
+        """
+        temp_dir = mkdtemp()
+        try:
+            for rel_path, dir_entry, files in self.walk():
+                if rel_path != '':
+                    # directory entry is written from empty directory with the same stat to match ZipFile.write
+                    stat_dir = join(temp_dir, 'dir')
+                    mkdir(stat_dir)
+                    chmod(stat_dir, stat.S_IMODE(self._get_mode(dir_entry, True)))
+                    utime(stat_dir, (self._get_mtime(dir_entry), self._get_mtime(dir_entry)))
+                    output.write(stat_dir, arcname=rel_path)
+                    rmtree(stat_dir)
+                for name, entry in files:
+                    self._write_zip_file(output, source_zip, f'{rel_path}/{name}'.lstrip('/'), entry)
+            for local_file, arc_name in extra_files:
+                output.write(local_file, arc_name)
+        finally:
+            rmtree(temp_dir)
+
+    def _write_zip_file(self, output, source_zip, arc_name, entry):
+        kind, value = entry['source']
+        if kind == 'path':
+            src = open(value, 'rb')
+            size = os_stat(value).st_size
+        elif kind == 'member':
+            src = source_zip.open(value)
+            size = source_zip.getinfo(value).file_size
+        else:
+            src = BytesIO(value)
+            size = len(value)
+        zinfo = ZipInfo(arc_name, localtime(self._get_mtime(entry))[0:6])
+        zinfo.external_attr = (self._get_mode(entry, False) & 0xFFFF) << 16
+        zinfo.file_size = size
+        zinfo.compress_type = output.compression
+        zinfo._compresslevel = output.compresslevel
+        with src, output.open(zinfo, 'w') as dest:
+            copyfileobj(src, dest, 1024 * 8)
+
+    def write_tar(self, output, source_path, source_mode, prefix='', extra_files=()):
+        """
+        Write the tree to tar archive, members are streamed from the source archive in a single pass
+        :param output: opened TarFile to write to
+        :param source_path: source tar archive
+        :param source_mode: mode to read source archive as a stream
+        :param prefix: top level directory of archive
+        :param extra_files: the list of (local file, archive name) to add at the end
+        """
+        member_targets = {}
+        other_files = []
+        for rel_path, dir_entry, files in self.walk():
+            if rel_path != '' or prefix:
+                info = tarfile.TarInfo(f'{prefix}{rel_path}'.lstrip('/'))
+                info.type = tarfile.DIRTYPE
+                info.mtime = self._get_mtime(dir_entry)
+                info.mode = stat.S_IMODE(self._get_mode(dir_entry, True))
+                output.addfile(info)
+            for name, entry in files:
+                arc_name = f'{prefix}{rel_path}/{name}'.lstrip('/')
+                if entry['source'][0] == 'member':
+                    member_targets.setdefault(entry['source'][1], []).append((arc_name, entry))
+                else:
+                    other_files.append((arc_name, entry))
+
+        with tarfile.open(source_path, source_mode) as source:
+            for member in source:
+                targets = member_targets.get(member.name)
+                if not targets:
+                    continue
+                src = source.extractfile(member) if member.isreg() else None
+                if src is not None and len(targets) > 1:
+                    buffer = SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+                    copyfileobj(src, buffer)
+                    src = buffer
+                for arc_name, entry in targets:
+                    info = deepcopy(member)
+                    info.name = arc_name
+                    if entry['mtime'] is not None:
+                        info.mtime = entry['mtime']
+                    if entry['mode'] is not None:
+                        info.mode = stat.S_IMODE(entry['mode'])
+                    if src is not None and len(targets) > 1:
+                        src.seek(0)
+                    output.addfile(info, src)
+
+        for arc_name, entry in other_files:
+            kind, value = entry['source']
+            if kind == 'path':
+                info = output.gettarinfo(value, arc_name)
+                with open(value, 'rb') as src:
+                    output.addfile(info, src)
+            else:
+                info = tarfile.TarInfo(arc_name)
+                info.size = len(value)
+                info.mtime = self._get_mtime(entry)
+                info.mode = stat.S_IMODE(self._get_mode(entry, False))
+                output.addfile(info, BytesIO(value))
+        for local_file, arc_name in extra_files:
+            output.add(local_file, f'{prefix}/{arc_name}'.lstrip('/'))
@@ -26,8 +26,6 @@ from traceback import format_exc
 from typing import List
 from uuid import uuid4
 
-from requests import post
-
 from ..util import log_print
 
 
@@ -187,6 +185,8 @@ def add_attachment(cls, name, data, attachment_type: AttachmentType = Attachment
             upload_logs = report_config['upload_logs']
             filename = f'{uuid4()}-{basename(data)}'
             if upload_logs:
+                from requests import post
+
                 post(f'{files_receiver_url}/files/add',
                      files={'file': open(data, 'rb')},
                      headers={'filename': filename})
@@ -21,12 +21,14 @@ import xml.etree.ElementTree as ET
 import re
 from os import path
 from copy import deepcopy
+from .xunitwriter import XUnitWriter
 
 
 class Result:
     re_escape_seq = re.compile(r'(\x1b\[|\x9b)[^@-_]*[@-_]|\x1b[@-_]', re.I)
     statuses = ['pass', 'fail', 'error', 'skip', 'total']
     testcase_started = None
+    xunit = None
 
     def __init__(self, **kwargs):
         self.tests = {}
@@ -43,6 +45,9 @@ class Result:
         self.tested_attr = None
         self.current_test = None
         self.xunit_path = None
+        # run time of tests written to xUnit report
+        self.xunit_times = {}
+        self.xunit_time = 0
         if kwargs.get('xunit_path') is not None:
             self.xunit_path = kwargs.get('xunit_path')
             suite_attributes = {
@@ -53,8 +58,10 @@ class Result:
                 "skipped": str(0),
                 "time": str(0),
             }
-            self.xunit = ET.Element('testsuite', suite_attributes)
-            self.flush_xunit()
+            self.xunit = XUnitWriter(self.xunit_path, suite_attributes)
+            if self.xunit.recovered_path is not None:
+                log_print('xUnit report of the previous unfinished run is restored to %s' %
+                          self.xunit.recovered_path, color='red')
 
     def start_testcase(self, tested_class, tested_attr):
         from tiden.tidenfabric import TidenFabric
@@ -201,53 +208,87 @@ class Result:
 
     def update_xunit(self):
         if self.xunit is not None:
-            # update counters in '<testsuite>'
-            for xunit_status, status in zip(
-                    ['tests', 'failures', 'errors', 'skipped'],
-                    ['total', 'fail', 'error', 'skip']
-            ):
-                self.xunit.attrib[xunit_status] = str(self.tests_num[status])
-            # update total run time in '<testsuite>'
-            self.xunit.attrib['time'] = str(sum([int(test['time']) for test in self.tests.values()]))
-
-            tiden_current_test = self.tests[self.current_test]
-
-            # add '<testcase>' as the child of the '<testsuite>'
-            xunit_test = ET.SubElement(
-                self.xunit,
-                'testcase',
-                {
-                    'classname': str(tiden_current_test['classname']),
-                    'name': tiden_current_test['name'],
-                    'time': tiden_current_test['time']
-                }
-            )
-
-            tiden_current_test_status = tiden_current_test['status']
-            if tiden_current_test_status != 'pass':
-                xunit_status = tiden_current_test_status
-                if tiden_current_test_status == 'skipped_no_start':
-                    # Jenkins xUnit schema does not know Tiden skipped_no_start status, replace with ordinary skipped
-                    # if we don't do this - test will be marked as 'passed' in Jenkins, which is a little confusing,
-                    # because counters won't match
-                    xunit_status = 'skipped'
-                elif tiden_current_test_status == 'errors':
-                    # same here for error (unchecked exceptions)
-                    xunit_status = 'error'
-                elif tiden_current_test_status == 'fail':
-                    # same here for failures (checked exceptions)
-                    xunit_status = 'failure'
-
-                # add resulting status as the child of the '<testcase>'
-                ET.SubElement(xunit_test,
-                              xunit_status,
-                              tiden_current_test['xunit_info'])
-
-            self.flush_xunit()
+            self._add_xunit_testcase(self.tests[self.current_test])
+            self._update_xunit_counters()
+
+    def merge(self, tests, tests_num, passed_with_issue=None):
+        """
+        Add results of tests run by another runner, e.g. by shard worker process
+        :param tests: tests dictionary of other result
+        :param tests_num: tests counters of other result
+        :param passed_with_issue: passed tests with known issues of other result
+        """
+        for test_name, test in tests.items():
+            self.tests[test_name] = test
+            if self.xunit is not None:
+                self._add_xunit_testcase(test)
+        for status, num in tests_num.items():
+            self.tests_num[status] = self.tests_num.get(status, 0) + num
+        if passed_with_issue:
+            self.passed_with_issue.update(passed_with_issue)
+        if self.xunit is not None:
+            self._update_xunit_counters()
+
+    def _update_xunit_counters(self):
+        # update counters in '<testsuite>'
+        counters = {}
+        for xunit_status, status in zip(
+                ['tests', 'failures', 'errors', 'skipped'],
+                ['total', 'fail', 'error', 'skip']
+        ):
+            counters[xunit_status] = str(self.tests_num[status])
+        # update total run time in '<testsuite>'
+        counters['time'] = str(self.xunit_time)
+        self.xunit.update_counters(**counters)
+
+    def _add_xunit_testcase(self, tiden_current_test):
+        test_key = (str(tiden_current_test['classname']), tiden_current_test['name'])
+        self.xunit_time += int(tiden_current_test['time']) - self.xunit_times.get(test_key, 0)
+        self.xunit_times[test_key] = int(tiden_current_test['time'])
+
+        # append '<testcase>' to the '<testsuite>'
+        xunit_test = ET.Element(
+            'testcase',
+            {
+                'classname': str(tiden_current_test['classname']),
+                'name': tiden_current_test['name'],
+                'time': tiden_current_test['time']
+            }
+        )
+
+        tiden_current_test_status = tiden_current_test['status']
+        if tiden_current_test_status != 'pass':
+            xunit_status = tiden_current_test_status
+            if tiden_current_test_status == 'skipped_no_start':
+                # Jenkins xUnit schema does not know Tiden skipped_no_start status, replace with ordinary skipped
+                # if we don't do this - test will be marked as 'passed' in Jenkins, which is a little confusing,
+                # because counters won't match
+                xunit_status = 'skipped'
+            elif tiden_current_test_status == 'errors':
+                # same here for error (unchecked exceptions)
+                xunit_status = 'error'
+            elif tiden_current_test_status == 'fail':
+                # same here for failures (checked exceptions)
+                xunit_status = 'failure'
+
+            # add resulting status as the child of the '<testcase>'
+            ET.SubElement(xunit_test,
+                          xunit_status,
+                          tiden_current_test['xunit_info'])
+        self.xunit.add_testcase(xunit_test)
 
     def flush_xunit(self):
-        tree = ET.ElementTree(self.xunit)
-        tree.write(self.xunit_path, xml_declaration=True)
+        # testcases are written by `update_xunit` and `merge`, only counters are patched
+        if self.xunit is not None:
+            self._update_xunit_counters()
+
+    def close_xunit(self):
+        """
+        Write final counters of xUnit report and remove its journal
+        """
+        if self.xunit is not None:
+            self._update_xunit_counters()
+            self.xunit.close()
 
     def get_tests_num(self, test_type):
         return self.tests_num[test_type]
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from copy import deepcopy
+from multiprocessing import get_context
+from os import makedirs
+from queue import Empty
+from traceback import format_exc
+
+from .tidenfabric import TidenFabric
+from .tidenpluginmanager import PluginManager
+from .tidenrunner import TidenRunner
+from .timingstore import TimingStore
+from .util import log_print, hms
+
+
+class ShardedRunner:
+    """
+    Runs test modules concurrently on disjoint slices (shards) of hosts.
+
+    `environment.server_hosts` and `environment.client_hosts` are split into `shards` slices, other hosts are
+    shared by all shards. Every shard gets its own worker process with its own ssh pool, remote suite directory
+    `<remote.suite_var_dir>/shard-<i>` and Ignite ports shifted by `ignite.ports_offset`. Workers take modules
+    from the common queue one by one, results of every module are sent back and merged to the single `Result`.
+
+    Artifacts are expected to be uploaded to all hosts before, by the main ssh pool.
+    """
+
+    sharded_hosts = ['server_hosts', 'client_hosts']
+    shard_dir_prefix = 'shard-'
+    # Ignite ports shift between shards, must be more than the range of ports used by nodes at one host
+    shard_ports_step = 1000
+    # seconds to wait for module results before checking that workers are alive
+    poll_timeout = 10
+
+    def __init__(self, config, modules, ssh_pool_factory, shards=None):
+        """
+        :param config: Tiden config
+        :param modules: test modules as collected by `TidenRunner`
+        :param ssh_pool_factory: function to create and connect ssh pool for the shard config
+        :param shards: number of shards, `shards` config option by default
+        """
+        self.config = config
+        self.modules = modules
+        self.ssh_pool_factory = ssh_pool_factory
+        self.shards = self.get_shards_num(config, shards)
+        self.setup_failed = []
+
+    @classmethod
+    def get_shards_num(cls, config, shards=None):
+        """
+        :return: the number of shards limited by the number of server hosts
+        """
+        if shards is None:
+            shards = config.get('shards', 1)
+        server_hosts = config.get('environment', {}).get('server_hosts') or []
+        return max(1, min(int(shards or 1), len(server_hosts)))
+
+    def get_shard_configs(self):
+        """
+        :return: the list of configs, one per shard
+        """
+        shard_configs = []
+        for shard_idx in range(self.shards):
+            shard_config = deepcopy(self.config)
+            for name in self.sharded_hosts:
+                hosts = shard_config['environment'].get(name) or []
+                if len(hosts) >= self.shards:
+                    shard_config['environment'][name] = hosts[shard_idx::self.shards]
+
+            shard_name = '%s%d' % (self.shard_dir_prefix, shard_idx)
+            shard_dir = '%s/%s' % (self.config['suite_var_dir'], shard_name)
+            shard_config['shard'] = {
+                'index': shard_idx,
+                'name': shard_name,
+                'shards': self.shards,
+            }
+            shard_config['tmp_dir'] = '%s/tmp' % shard_dir
+            shard_config['config_path'] = '%s/config.yaml' % shard_dir
+            shard_config['xunit_path'] = '%s/%s' % (shard_dir, self.config.get('xunit_file', 'xunit.xml'))
+            shard_config['remote']['suite_var_dir'] = '%s/%s' % (self.config['remote']['suite_var_dir'], shard_name)
+            if 'ignite' not in shard_config:
+                shard_config['ignite'] = {}
+            shard_config['ignite']['ports_offset'] = \
+                int(self.config.get('ignite', {}).get('ports_offset', 0)) + shard_idx * self.shard_ports_step
+            shard_configs.append(shard_config)
+        return shard_configs
+
+    def get_modules_order(self):
+        """
+        Longest modules first by history of test durations, so that shards finish at about the same time.
+        Modules without history go first, as they are possibly long too.
+        :return: the list of module names in order of execution
+        """
+        modules = sorted(self.modules.keys())
+        timing = TimingStore.from_config(self.config)
+        if timing is None:
+            return modules
+        durations = dict([(module_name, timing.get_module_duration(module_name)) for module_name in modules])
+        order = sorted(modules, key=lambda module_name: (
+            durations[module_name] is not None, -(durations[module_name] or 0.0)
+        ))
+        known = [duration for duration in durations.values() if duration is not None]
+        if known:
+            log_print("Predicted duration of known modules %d:%02d:%02d, %d:%02d:%02d per shard" % (
+                *hms(int(sum(known))), *hms(int(sum(known) / self.shards))
+            ))
+        return order
+
+    def process_tests(self, result):
+        """
+        Run all modules in shard workers and merge their results.
+        Unlike sequential run, failed module setup does not stop other modules, runner exits with 1 at the end.
+        :param result: Result to merge results to
+        """
+        log_print("*** Tests in %d shards ***" % self.shards, color='blue')
+        context = get_context('fork')
+        modules_queue = context.Queue()
+        results_queue = context.Queue()
+        for module_name in self.get_modules_order():
+            modules_queue.put(module_name)
+
+        workers = {}
+        for shard_config in self.get_shard_configs():
+            shard_idx = shard_config['shard']['index']
+            log_print("Shard %d: server hosts %s, client hosts %s, remote directory %s" % (
+                shard_idx,
+                ', '.join(shard_config['environment'].get('server_hosts') or []),
+                ', '.join(shard_config['environment'].get('client_hosts') or []),
+                shard_config['remote']['suite_var_dir']
+            ))
+            modules_queue.put(None)
+            workers[shard_idx] = context.Process(
+                target=self._run_shard, args=(shard_config, modules_queue, results_queue),
+                name='tiden-%s' % shard_config['shard']['name']
+            )
+        for worker in workers.values():
+            worker.start()
+
+        finished = set()
+        while len(finished) < len(workers):
+            try:
+                shard_idx, module_name, module_result = results_queue.get(timeout=self.poll_timeout)
+            except Empty:
+                for shard_idx, worker in workers.items():
+                    if shard_idx not in finished and not worker.is_alive():
+                        log_print("Shard %d worker exited with code %s" % (shard_idx, worker.exitcode), color='red')
+                        finished.add(shard_idx)
+                continue
+            if module_name is None:
+                finished.add(shard_idx)
+                continue
+            result.merge(module_result['tests'], module_result['tests_num'], module_result['passed_with_issue'])
+            if module_result['setup_failed']:
+                self.setup_failed.append(module_name)
+            log_print("Shard %d: %s done, %s" % (shard_idx, module_name, result.get_summary()), color='blue')
+
+        for worker in workers.values():
+            worker.join()
+
+        # this is for correct fail in Jenkins
+        if self.setup_failed:
+            log_print("Module setup failed: %s" % ', '.join(self.setup_failed), color='red')
+            exit(1)
+
+    def _run_shard(self, shard_config, modules_queue, results_queue):
+        shard_idx = shard_config['shard']['index']
+        try:
+            makedirs(shard_config['tmp_dir'], exist_ok=True)
+            fabric = TidenFabric()
+            fabric.config = None
+            fabric.setConfig(shard_config)
+            ssh_pool = self.ssh_pool_factory(shard_config)
+            fabric.setSshPool(ssh_pool)
+            ssh_pool.exec(['mkdir -p %s' % shard_config['remote']['suite_var_dir']])
+            pm = PluginManager(shard_config)
+            pm.set(ssh=ssh_pool)
+        except Exception:
+            log_print("Shard %d initialization failed:\n%s" % (shard_idx, format_exc()), color='red')
+            results_queue.put((shard_idx, None, None))
+            return
+
+        try:
+            for module_name in iter(modules_queue.get, None):
+                runner = TidenRunner(
+                    shard_config,
+                    modules={module_name: self.modules[module_name]},
+                    xunit_path=shard_config['xunit_path'],
+                    ssh_pool=ssh_pool,
+                    plugin_manager=pm
+                )
+                setup_failed = False
+                try:
+                    runner.process_tests()
+                except SystemExit:
+                    setup_failed = True
+                finally:
+                    module_result = runner.get_tests_results()
+                    module_result.close_xunit()
+                results_queue.put((shard_idx, module_name, {
+                    'tests': module_result.tests,
+                    'tests_num': module_result.tests_num,
+                    'passed_with_issue': module_result.passed_with_issue,
+                    'setup_failed': setup_failed,
+                }))
+        finally:
+            if hasattr(ssh_pool, 'close'):
+                ssh_pool.close()
+            results_queue.put((shard_idx, None, None))
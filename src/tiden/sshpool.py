@@ -15,19 +15,20 @@
 # limitations under the License.
 
 import socket
-from hashlib import md5
+from functools import partial
+from itertools import chain
 from multiprocessing.dummy import Pool as ThreadPool
 from os import path
 from os.path import basename
 from re import search, split, sub
+from threading import BoundedSemaphore, Lock
 from time import sleep
 from typing import Dict, List
 
-from paramiko import AutoAddPolicy, SSHClient, SSHException, SFTPClient
-from paramiko.buffered_pipe import PipeTimeout
-
 from .abstractsshpool import AbstractSshPool
+from .deltaupload import DeltaUpload
 from .tidenexception import RemoteOperationTimeout, TidenException
+from .treedistribution import TreeDistribution
 from .util import log_print, log_put, log_add, get_logger
 
 debug_ssh_pool = False
@@ -35,6 +36,13 @@ debug_ssh_pool = False
 
 class SshPool(AbstractSshPool):
     default_timeout = 400
+    # max number of concurrently opened channels per host transport, keep it below sshd MaxSessions (10 by default)
+    default_channels_per_host = 4
+    # number of attempts to upload file, interrupted upload is resumed from already uploaded blocks
+    default_upload_retries = 3
+    supports_streaming = True
+    # files smaller than this number of delta upload blocks are uploaded whole, as delta costs several round trips
+    default_delta_upload_min_blocks = 4
     no_java_commands = [
         'echo', 'cat', 'grep', 'kill', 'ps', 'ls', 'ln', 'mkdir', 'rm', 'md5sum', 'unzip', 'touch', 'chmod'
     ]
@@ -49,9 +57,21 @@ class SshPool(AbstractSshPool):
         self.home = str(self.config['home'])
         if self.retries is None:
             self.retries = 3
+        self.channels_per_host = int(self.config.get('channels_per_host', self.default_channels_per_host))
+        self.upload_retries = int(self.config.get('upload_retries', self.default_upload_retries))
+        self.delta_upload = DeltaUpload()
+        self.delta_upload_min_size = int(self.config.get(
+            'delta_upload_min_size', self.default_delta_upload_min_blocks * self.delta_upload.block_size
+        ))
         self.clients = {}
         self.docker_hosts = set()
 
+        # long-lived thread pools, created on first use and reused by all exec/upload/download calls
+        self._pool_lock = Lock()
+        self._thread_pool = None
+        self._channel_pool = None
+        self._host_channels = {}
+
         self.trace_info()
 
     def trace_info(self):
@@ -59,7 +79,55 @@ class SshPool(AbstractSshPool):
         called at startup to trace pool configuration to logs
         :return:
         """
-        log_print('SSH Pool threads: %s' % self.config['threads_num'])
+        log_print('SSH Pool threads: %s, channels per host: %s' % (self.config['threads_num'], self.channels_per_host))
+
+    def _get_thread_pool(self):
+        """
+        Thread pool used to fan out per-host work.
+        :return:
+        """
+        with self._pool_lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPool(self.threads_num)
+            return self._thread_pool
+
+    def _get_channel_pool(self):
+        """
+        Thread pool used to run independent commands of a single host in parallel channels.
+        It is separate from host fan-out pool, so that host workers never wait for their own pool slots.
+        :return:
+        """
+        with self._pool_lock:
+            if self._channel_pool is None:
+                self._channel_pool = ThreadPool(self.threads_num * self.channels_per_host)
+            return self._channel_pool
+
+    def _get_host_channels(self, host):
+        """
+        Semaphore bounding number of simultaneously opened channels at host transport.
+        :param host:
+        :return:
+        """
+        with self._pool_lock:
+            if host not in self._host_channels:
+                self._host_channels[host] = BoundedSemaphore(self.channels_per_host)
+            return self._host_channels[host]
+
+    def close(self):
+        """
+        Shutdown thread pools and close SSH connections.
+        :return:
+        """
+        with self._pool_lock:
+            for pool in (self._thread_pool, self._channel_pool):
+                if pool is not None:
+                    pool.close()
+                    pool.join()
+            self._thread_pool = None
+            self._channel_pool = None
+        for client in self.clients.values():
+            client.close()
+        self.clients = {}
 
     def available_space(self):
         """
@@ -101,70 +169,87 @@ class SshPool(AbstractSshPool):
 
     def connect(self):
         for host in self.hosts:
-            attempt = 0
-            log_put("Checking connection to %s ... " % host, 2)
-            connected = False
-            ssh = None
-            if self.private_key_path:
-                if not path.exists(self.private_key_path):
-                    raise TidenException("Private key %s not found" % self.private_key_path)
-            elif not self.use_ssh_agent:
-                raise TidenException("Either private_key_path or use_ssh_agent must be configured in the environment")
-            while attempt < self.retries and not connected:
-                try:
-                    attempt += 1
-                    ssh = SSHClient()
-                    ssh.load_system_host_keys()
-                    ssh.set_missing_host_key_policy(AutoAddPolicy())
-                    if self.use_ssh_agent:
-                        ssh.connect(
-                            host,
-                            username=self.username,
-                            allow_agent=True,
-                        )
-                    else:
-                        ssh.connect(
-                            host,
-                            username=self.username,
-                            key_filename=self.private_key_path,
-                        )
-                    ssh_stdin, ssh_stdout, ssh_stderr = ssh.exec_command('uptime')
-                    for line in ssh_stdout:
-                        if 'load average' in str(line):
-                            log_print('ok', 3)
-                            self.clients[host] = ssh
-                            attempt = self.retries + 1
-                            connected = True
-                        break
-                    # Check whether host is a Docker container
-                    ssh_stdin, ssh_stdout, ssh_stderr = ssh.exec_command('cat /proc/1/cgroup')
-                    if any(map(lambda l: 'docker' in l, ssh_stdout)):
-                        log_print(f'{host} is a Docker container')
-                        self.docker_hosts.add(host)
-                except socket.gaierror as e:
+            self.connect_host(host)
+
+    def connect_host(self, host):
+        from paramiko import AutoAddPolicy, SSHClient, SSHException
+
+        attempt = 0
+        log_put("Checking connection to %s ... " % host, 2)
+        connected = False
+        ssh = None
+        if self.private_key_path:
+            if not path.exists(self.private_key_path):
+                raise TidenException("Private key %s not found" % self.private_key_path)
+        elif not self.use_ssh_agent:
+            raise TidenException("Either private_key_path or use_ssh_agent must be configured in the environment")
+        while attempt < self.retries and not connected:
+            try:
+                attempt += 1
+                ssh = SSHClient()
+                ssh.load_system_host_keys()
+                ssh.set_missing_host_key_policy(AutoAddPolicy())
+                if self.use_ssh_agent:
+                    ssh.connect(
+                        host,
+                        username=self.username,
+                        allow_agent=True,
+                    )
+                else:
+                    ssh.connect(
+                        host,
+                        username=self.username,
+                        key_filename=self.private_key_path,
+                    )
+                ssh_stdin, ssh_stdout, ssh_stderr = ssh.exec_command('uptime')
+                for line in ssh_stdout:
+                    if 'load average' in str(line):
+                        log_print('ok', 3)
+                        self.clients[host] = ssh
+                        attempt = self.retries + 1
+                        connected = True
+                    break
+                # Check whether host is a Docker container
+                ssh_stdin, ssh_stdout, ssh_stderr = ssh.exec_command('cat /proc/1/cgroup')
+                if any(map(lambda l: 'docker' in l, ssh_stdout)):
+                    log_print(f'{host} is a Docker container')
+                    self.docker_hosts.add(host)
+            except socket.gaierror as e:
+                log_print('', 2)
+                log_print("ERROR: host '%s' is incorrect \n" % host, color='red')
+                log_print("%s\n" % str(e))
+                exit(1)
+            except TimeoutError as e:
+                log_add('T ', 3)
+                if attempt == self.retries:
                     log_print('', 2)
-                    log_print("ERROR: host '%s' is incorrect \n" % host, color='red')
+                    log_print("ERROR: connection timeout to host %s\n" % host, color='red')
                     log_print("%s\n" % str(e))
                     exit(1)
-                except TimeoutError as e:
-                    log_add('T ', 3)
-                    if attempt == self.retries:
-                        log_print('', 2)
-                        log_print("ERROR: connection timeout to host %s\n" % host, color='red')
-                        log_print("%s\n" % str(e))
-                        exit(1)
-                except (SSHException, socket.error) as e:
-                    log_add('E ', 3)
-                    if attempt == self.retries:
-                        log_print('', 2)
-                        log_print("ERROR: SSH error for host=%s, username=%s, key=%s" %
-                                  (host, str(self.username), str(self.private_key_path)), 2, color='red')
-                        log_print(str(e), 2)
-                        exit(1)
+            except (SSHException, socket.error) as e:
+                log_add('E ', 3)
+                if attempt == self.retries:
+                    log_print('', 2)
+                    log_print("ERROR: SSH error for host=%s, username=%s, key=%s" %
+                              (host, str(self.username), str(self.private_key_path)), 2, color='red')
+                    log_print(str(e), 2)
+                    exit(1)
 
     def download(self, remote_paths, local_path, prepend_host=True):
         if debug_ssh_pool:
             log_print('download: \nremote_paths:' + repr(remote_paths) + '\nlocal_paths: ' + repr(local_path))
+        files_for_hosts = self._get_files_for_hosts(remote_paths, local_path, prepend_host)
+        raw_results = self._get_thread_pool().starmap(self.download_from_host, files_for_hosts)
+        results = []
+        for raw_result in raw_results:
+            results.extend(raw_result)
+        return results
+
+    def _get_files_for_hosts(self, remote_paths, local_path, prepend_host=True):
+        """
+        Split download request to per-host lists of remote and local files.
+        :return: list of [host, remote_paths, local_paths]
+        """
         files_for_hosts = []
         if type(remote_paths) != type({}):
             remote_paths = {host: remote_paths for host in self.hosts}
@@ -196,29 +281,29 @@ class SshPool(AbstractSshPool):
                 files_for_hosts.append(
                     [host, host_remote_paths, [local_path]]
                 )
-        pool = ThreadPool(self.threads_num)
-        raw_results = pool.starmap(self.download_from_host, files_for_hosts)
-        results = []
-        for raw_result in raw_results:
-            results.extend(raw_result)
-        pool.close()
-        pool.join()
-        return results
+        return files_for_hosts
 
     def download_from_host(self, host, remote_paths, local_paths):
         if debug_ssh_pool:
             log_print('download_from_host: \nhost: ' + repr(host) +
                       '\nremote_paths:' + repr(remote_paths) + '\nlocal_paths: ' + repr(local_paths))
+        from paramiko import SSHException
+
         result = []
         try:
             if type(remote_paths) != type([]):
                 remote_paths = [remote_paths]
                 local_paths = [local_paths]
-            ssh_client: SSHClient = self.clients.get(host)
-            sftp: SFTPClient = ssh_client.open_sftp()
-            for i, remote_path in enumerate(remote_paths):
-                sftp.get(remote_path, local_paths[i])
-                result.append(local_paths[i])
+            ssh_client = self.clients.get(host)
+            # sftp session takes a channel of host transport too
+            with self._get_host_channels(host):
+                sftp = ssh_client.open_sftp()
+                try:
+                    for i, remote_path in enumerate(remote_paths):
+                        sftp.get(remote_path, local_paths[i])
+                        result.append(local_paths[i])
+                finally:
+                    sftp.close()
         except SSHException as e:
             log_print('WARN: can\'t download file(s) from host ' + str(repr(remote_paths)) + ', ' + str(e), color='red')
         return result
@@ -226,94 +311,144 @@ class SshPool(AbstractSshPool):
     def exec(self, commands, **kwargs):
         """
         :param commands: the list of commands to execute for hosts or dict of list of commands indexed by host
+        :param kwargs:
+            timeout - command timeout, seconds
+            parallel - commands for the same host are independent and may be run in parallel channels
         :return: the list of lines
         """
-        from functools import partial
-        commands_for_hosts = []
-        output = []
-        if isinstance(commands, list):
-            for host in self.hosts:
-                commands_for_hosts.append(
-                    [host, commands]
-                )
-        elif isinstance(commands, dict):
-            for host in commands.keys():
-                commands_for_hosts.append(
-                    [host, commands[host]]
-                )
-        else:
-            for host in self.hosts:
-                commands_for_hosts.append(
-                    [host, [commands]]
-                )
-        pool = ThreadPool(self.threads_num)
-        raw_results = pool.starmap(partial(self.exec_on_host, **kwargs), commands_for_hosts)
+        commands_for_hosts = self._get_commands_for_hosts(commands)
+        raw_results = self._get_thread_pool().starmap(partial(self.exec_on_host, **kwargs), commands_for_hosts)
         results = {}
         for raw_result in raw_results:
             for host in raw_result.keys():
                 results[host] = raw_result[host]
-        pool.close()
-        pool.join()
         return results
 
+    def _get_env_vars_prefix(self):
+        env_vars = ''
+        if self.config.get('env_vars'):
+            for env_var_name in self.config['env_vars'].keys():
+                val = self.config['env_vars'][env_var_name]
+                env_vars += f"export {env_var_name}=\"{val}\";"
+        return env_vars
+
+    def _prepare_command(self, host, command, env_vars=''):
+        """
+        Redirect stderr, add environment variables and strip sudo for Docker hosts
+        """
+        if '2>&1' not in command:
+            command += ' 2>&1'
+        if env_vars != '' and command.split()[0] not in self.no_java_commands:
+            command = f"{env_vars}{command}"
+        # Remove sudo with options if the host is a Docker container
+        if host in self.docker_hosts:
+            command = sub(r'sudo(\s+[-]{1,2}\S*)*', '', command)
+        return command
+
     def exec_on_host(self, host, commands, **kwargs):
         """
         Execute the list of commands on the particular host
         :param host:        host or ip address
         :param commands:    the command or the list of commands
+        :param kwargs:
+            timeout - command timeout, seconds
+            parallel - commands are independent and may be run in parallel channels of host transport
         :return:            dictionary:
             <host>: [ <string containing the output of executed commands>, ... ]
         """
+        from paramiko import SSHException
+
         output = []
-        client = self.clients[host]
-        env_vars = ''
         timeout = kwargs.get('timeout', int(self.config['default_timeout']))
 
-        if self.config.get('env_vars'):
-            for env_var_name in self.config['env_vars'].keys():
-                val = self.config['env_vars'][env_var_name]
-                env_vars += f"export {env_var_name}=\"{val}\";"
-        for command in commands:
-            try:
-                if '2>&1' not in command:
-                    command += ' 2>&1'
-                if env_vars != '' and command.split()[0] not in self.no_java_commands:
-                    command = f"{env_vars}{command}"
-                # Remove sudo with options if the host is a Docker container
-                if host in self.docker_hosts:
-                    command = sub(r'sudo(\s+[-]{1,2}\S*)*', '', command)
+        exec_command = partial(self._exec_command_on_host, host, env_vars=self._get_env_vars_prefix(), timeout=timeout)
+        if kwargs.get('parallel') and len(commands) > 1:
+            raw_results = self._get_channel_pool().map(exec_command, commands)
+        else:
+            raw_results = map(exec_command, commands)
+
+        for command_output, error in raw_results:
+            if error is None:
+                output.append(command_output)
+                continue
+            if str(error) == 'SSH session not active' and not kwargs.get('repeat'):
+                # reconnect
+                for i in range(10):
+                    try:
+                        log_print('ssh reconnect')
+                        self.connect()
+                    except SSHException:
+                        sleep(10)
+                        continue
+                    break
+                kwargs['repeat'] = True
+                return self.exec_on_host(host, commands, **kwargs)
+            print(str(error))
+        return {host: output}
+
+    def _exec_command_on_host(self, host, command, env_vars='', timeout=None):
+        """
+        Execute single command at host in its own channel.
+        :return: tuple (command output, SSHException or None)
+        """
+        from paramiko import SSHException
+        from paramiko.buffered_pipe import PipeTimeout
+
+        command = self._prepare_command(host, command, env_vars)
+        try:
+            with self._get_host_channels(host):
                 # TODO we should handle stderr
                 get_logger('ssh_pool').debug(f'{host} >> {command}')
-                stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
-                command_output = ''
-                for line in stdout:
-                    if line.strip() != '':
-                        command_output += line
-                for line in stderr:
-                    if line.strip() != '':
-                        command_output += line
-                output.append(command_output)
-                formatted_output = ''.join(output).encode('utf-8')
-                get_logger('ssh_pool').debug(f'{host} << {formatted_output}')
-            except SSHException as e:
-                if str(e) == 'SSH session not active' and not kwargs.get('repeat'):
-                    # reconnect
-                    for i in range(10):
-                        try:
-                            log_print('ssh reconnect')
-                            self.connect()
-                        except SSHException:
-                            sleep(10)
-                            continue
+                stdin, stdout, stderr = self.clients[host].exec_command(command, timeout=timeout)
+                command_output = ''.join([line for line in chain(stdout, stderr) if line.strip() != ''])
+            get_logger('ssh_pool').debug(f'{host} << {command_output.encode("utf-8")}')
+            return command_output, None
+        except SSHException as e:
+            return None, e
+        except (PipeTimeout, socket.timeout) as e:
+            raise RemoteOperationTimeout(f'Timeout {timeout} reached while executing command:\n'
+                                         f'Host: {host}\n'
+                                         f'{command}')
+
+    def exec_on_host_stream(self, host, command, **kwargs):
+        """
+        Execute command at host and yield its output line by line as soon as lines arrive.
+        Remote command is throttled by SSH channel window when lines are not consumed,
+        and it is terminated when generator is closed before the end of output.
+        :param host: host or ip address
+        :param command: the command
+        :param kwargs:
+            timeout - command timeout, seconds
+            until - predicate(line), stop reading command output after the first matched line
+        :return: generator of non-empty output lines
+        """
+        from paramiko.buffered_pipe import PipeTimeout
+
+        timeout = kwargs.get('timeout', int(self.config['default_timeout']))
+        until = kwargs.get('until')
+        command = self._prepare_command(host, command, self._get_env_vars_prefix())
+        with self._get_host_channels(host):
+            get_logger('ssh_pool').debug(f'{host} >> {command}')
+            stdin, stdout, stderr = self.clients[host].exec_command(command, timeout=timeout)
+            try:
+                for line in chain(stdout, stderr):
+                    if line.strip() == '':
+                        continue
+                    yield line
+                    if until is not None and until(line):
                         break
-                    kwargs['repeat'] = True
-                    return self.exec_on_host(host, commands, **kwargs)
-                print(str(e))
             except (PipeTimeout, socket.timeout) as e:
                 raise RemoteOperationTimeout(f'Timeout {timeout} reached while executing command:\n'
                                              f'Host: {host}\n'
                                              f'{command}')
-        return {host: output}
+            finally:
+                stdout.channel.close()
+
+    def exec_stream(self, commands, on_line, **kwargs):
+        self._get_thread_pool().starmap(
+            partial(self._stream_on_host, on_line=on_line, **kwargs),
+            self._get_commands_for_hosts(commands)
+        )
 
     @staticmethod
     def _reserved_java_processes():
@@ -405,6 +540,43 @@ class SshPool(AbstractSshPool):
                     results.append({'host': host, 'pid': m.group(1), 'name': m.group(2)})
         return results
 
+    def get_java_processes(self, hosts=None):
+        """
+        List java processes by `jps -l` and `ps` with the single command per host.
+        Processes of other users are not visible to `jps`, they are listed by `ps` only (processes of `java`
+        executable, not just mentioning java in command line).
+        :param hosts: (optional) array of hosts to run command at
+        :return: list of dictionaries:
+           'host': host
+           'pid': java process pid
+           'name': java process name or None
+           'owner': java process owner
+           'args': java process command line
+        """
+        separator = '--- ps ---'
+        command = ['jps -l 2>/dev/null; echo "%s"; ps -eo user=,pid=,comm=,args= | grep [j]ava' % separator]
+        if hosts is not None:
+            command = {host: command for host in hosts}
+        raw_results = self.exec(command)
+        results = []
+        for host in raw_results.keys():
+            jps_output, _, ps_output = ''.join(raw_results[host]).partition(separator)
+            processes = {}
+            for line in jps_output.splitlines():
+                m = search('^([0-9]+) (.+)$', line)
+                if m:
+                    processes[m.group(1)] = {
+                        'host': host, 'pid': m.group(1), 'name': m.group(2), 'owner': None, 'args': None
+                    }
+            for line in ps_output.splitlines():
+                m = search(r'^\s*(\S+)\s+([0-9]+)\s+(\S+)\s+(.*)$', line)
+                if m and (m.group(2) in processes or basename(m.group(3)) == 'java'):
+                    process = processes.setdefault(m.group(2), {'host': host, 'pid': m.group(2), 'name': None})
+                    process['owner'] = m.group(1)
+                    process['args'] = m.group(4)
+            results.extend(processes.values())
+        return results
+
     def dirsize(self, dir_path, *args):
         hosts = self.hosts
         if len(args) == 1:
@@ -430,19 +602,15 @@ class SshPool(AbstractSshPool):
             first_found_host = hosts[0]
             other_hosts = hosts[1:]
             self.upload_on_host(first_found_host, files, remote_path)
-            self.transfer_file(
-                {first_found_host: [f'{remote_path}/{basename(file)}' for file in files]},
-                dict([(host, remote_path) for host in other_hosts])
+            TreeDistribution(self).distribute(
+                [f'{remote_path}/{basename(file)}' for file in files], first_found_host, other_hosts
             )
         else:
             for host in hosts:
                 files_for_hosts.append(
                     [host, files, remote_path]
                 )
-            pool = ThreadPool(self.threads_num)
-            pool.starmap(self.upload_on_host, files_for_hosts)
-            pool.close()
-            pool.join()
+            self._get_thread_pool().starmap(self.upload_on_host, files_for_hosts)
 
     def transfer_file(self, source: Dict[str, List[str]], target: Dict[str, str]):
         command = {}
@@ -464,30 +632,101 @@ class SshPool(AbstractSshPool):
                                               f'{",".join([s for s in target.keys()])}')
 
     def not_uploaded(self, files, remote_path):
-        outdated = []
-        for file in files:
-            file_name = path.basename(file)
-            local_md5 = md5(open(file, 'rb').read()).hexdigest()
-            remote_file = f"{remote_path}/{file_name}"
-            results = self.exec([f'md5sum {remote_file}'])
-            matched_count = 0
-            for host in results.keys():
-                if len(results[host]) > 0:
-                    if f'{local_md5} ' in results[host][0]:
-                        matched_count += 1
-            if matched_count < len(results.keys()):
-                outdated.append(file)
-        return outdated
+        """
+        Find files which differ from remote copies at least at one host.
+        Local files are hashed once in a stream, all remote files of a host are checked by a single command.
+        :param files: the list of local files
+        :param remote_path: remote directory
+        :return: the list of outdated files
+        """
+        if not files:
+            return []
+        local_md5 = [self.delta_upload.get_md5(file) for file in files]
+        remote_files = [f"{remote_path}/{path.basename(file)}" for file in files]
+        results = self.exec([self.delta_upload.get_md5_command(remote_files)])
+        matched_count = [0] * len(files)
+        for host_results in results.values():
+            remote_md5 = self.delta_upload.parse_md5(''.join(host_results))
+            for idx, file_md5 in enumerate(local_md5):
+                if remote_md5.get(idx) == file_md5:
+                    matched_count[idx] += 1
+        return [file for idx, file in enumerate(files) if matched_count[idx] < len(results.keys())]
 
     def upload_on_host(self, host, files, remote_dir):
+        """
+        Upload files to host. For files of `delta_upload_min_size` bytes and larger only blocks which differ
+        from the remote copy are sent (see `DeltaUpload`), smaller files are sent whole by sftp.
+        Upload interrupted by connection failure is retried with reconnect (large files are resumed).
+        """
+        from paramiko import SSHException
+
+        for local_file in files:
+            remote_file = f'{remote_dir}/{path.basename(local_file)}'
+            if path.getsize(local_file) >= self.delta_upload_min_size:
+                upload_file = self._upload_file_on_host
+            else:
+                upload_file = self._put_file_on_host
+            for attempt in range(1, self.upload_retries + 1):
+                try:
+                    upload_file(host, local_file, remote_file)
+                    break
+                except (SSHException, socket.error, EOFError) as e:
+                    print(str(e))
+                    if attempt == self.upload_retries:
+                        break
+                    log_print(f'ssh reconnect to {host} to resume upload of {remote_file}')
+                    try:
+                        self.connect_host(host)
+                    except SSHException:
+                        sleep(10)
+
+    def _put_file_on_host(self, host, local_file, remote_file):
+        sftp = self.clients[host].open_sftp()
         try:
-            sftp = self.clients.get(host).open_sftp()
-            for local_file in files:
-                remote_path = f'{remote_dir}/{path.basename(local_file)}'
-                get_logger('ssh_pool').debug(f'sftp_put on host {host}: {local_file} -> {remote_path}')
-                sftp.put(local_file, remote_path)
-        except SSHException as e:
-            print(str(e))
+            sftp.put(local_file, remote_file)
+        finally:
+            sftp.close()
+
+    def _upload_file_on_host(self, host, local_file, remote_file):
+        part_file = f'{remote_file}.part'
+        signatures = self.delta_upload.parse_signatures(
+            self._exec_upload_command(host, self.delta_upload.get_signature_command([remote_file]))
+        )
+        segments = self.delta_upload.get_plan(local_file, signatures)
+        get_logger('ssh_pool').debug(f'delta upload on host {host}: {local_file} -> {remote_file}, '
+                                     f'{self.delta_upload.get_sent_bytes(segments)} bytes to send')
+        copy_commands = self.delta_upload.get_copy_commands(segments, part_file)
+        if copy_commands:
+            self._exec_upload_command(host, f"rm -f '{part_file}' && " + ' && '.join(copy_commands))
+        sftp = self.clients[host].open_sftp()
+        try:
+            with sftp.open(part_file, 'r+' if copy_commands else 'w') as remote, open(local_file, 'rb') as local:
+                remote.set_pipelined(True)
+                for segment in segments:
+                    if segment[0] != 'send':
+                        continue
+                    kind, offset, length = segment
+                    local.seek(offset)
+                    remote.seek(offset)
+                    while length > 0:
+                        data = local.read(min(length, self.delta_upload.read_size))
+                        remote.write(data)
+                        length -= len(data)
+            output = self._exec_upload_command(
+                host, f"mv -f '{part_file}' '{remote_file}' && rm -f '{part_file}.prev' && "
+                      f"{self.delta_upload.get_md5_command([remote_file])}"
+            )
+            if self.delta_upload.parse_md5(output).get(0) != self.delta_upload.get_md5(local_file):
+                log_print(f'WARN: delta upload of {remote_file} to {host} failed, uploading whole file', color='red')
+                sftp.put(local_file, remote_file)
+        finally:
+            sftp.close()
+
+    def _exec_upload_command(self, host, command):
+        output, error = self._exec_command_on_host(host, command, timeout=int(self.config['default_timeout']))
+        if error is not None:
+            raise error
+        return output
 
     def killall(self, name, sig=-9, skip_reserved_java_processes=True, hosts=None):
         """
@@ -533,5 +772,7 @@ class SshPool(AbstractSshPool):
             kill_command = {host: kill_command for host in hosts}
 
         res = self.exec(kill_command)
+        if self.process_table is not None:
+            self.process_table.invalidate()
         # print_blue(res)
         return res
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ast
+import sys
+from copy import deepcopy
+from hashlib import sha256
+from importlib import import_module
+from os import stat, getcwd
+from os.path import join, dirname, exists, realpath
+
+from .util import log_print, load_yaml, save_yaml
+
+
+class StaticCollectionError(Exception):
+    """
+    Test module can't be collected without import
+    """
+
+
+class StaticCollector:
+    """
+    Collects test classes for `--collect-only` from module sources, without import of test modules.
+
+    Source is parsed by `ast`: test methods, their Tiden decorators and `@test_configuration` are extracted with
+    literal arguments. Test class is replaced by stub class with empty methods decorated by the same Tiden decorators,
+    so the usual collection code sees the same test attributes as for imported class.
+
+    Parsed modules are cached in `<var_dir>/collect_manifest.yaml` by file modification time, size and sha256.
+    Modules with other decorators, non-literal decorator arguments, not resolved base classes or generated tests
+    are reported as dynamic, caller falls back to import.
+    """
+
+    manifest_file = 'collect_manifest.yaml'
+
+    # decorators of test methods and classes, which can be applied to stubs
+    known_decorators = [
+        'attr', 'known_issue', 'skip', 'repeated_test', 'test_case_id', 'with_setup', 'require',
+        'require_min_client_nodes', 'require_min_server_nodes', 'require_min_ignite_version',
+        'test_priority', 'test_configuration',
+    ]
+    class_decorators = ['test_configuration']
+
+    method_arg = '__method__'
+    test_config_arg = '__test_config__'
+    negated_arg = '__negated__'
+
+    def __init__(self, manifest_path=None):
+        """
+        :param manifest_path: YAML file to keep parsed modules between runs, not persisted if None
+        """
+        self.manifest_path = manifest_path
+        self.manifest = {}
+        if manifest_path is not None:
+            self.manifest = load_yaml(manifest_path) or {}
+        self.changed = False
+        self.decorators = None
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        :return: collector with manifest in `var_dir` or None if `static_collect` option is False
+        """
+        if config.get('static_collect') is False:
+            return None
+        if config.get('var_dir'):
+            return cls(join(config['var_dir'], cls.manifest_file))
+        return cls()
+
+    def save(self):
+        if self.manifest_path is None or not self.changed:
+            return
+        save_yaml(self.manifest_path, dict([
+            (file_path, module) for file_path, module in self.manifest.items() if exists(file_path)
+        ]))
+        self.changed = False
+
+    def get_test_class(self, module_name, file_path, class_name):
+        """
+        :param module_name: test module name, <suite>.<module file name>
+        :param file_path: test module file
+        :param class_name: test class name
+        :return: stub test class or None if module is to be imported
+        """
+        try:
+            class_info = self._get_class_info(file_path, class_name, [])
+            return self._make_class(module_name, class_name, class_info)
+        except StaticCollectionError as e:
+            log_print(f"{module_name}: {e}, module is imported to collect tests", color='debug')
+        except (OSError, SyntaxError, ValueError, TypeError, AttributeError) as e:
+            log_print(f"{module_name}: static collection failed ({e}), module is imported to collect tests",
+                      color='debug')
+        return None
+
+    def get_module_info(self, file_path):
+        """
+        Parsed module from the manifest or parsed source if module changed
+        """
+        file_path = realpath(file_path)
+        file_stat = stat(file_path)
+        cached = self.manifest.get(file_path)
+        if cached and cached['mtime'] == file_stat.st_mtime_ns and cached['size'] == file_stat.st_size:
+            return cached
+        with open(file_path, 'rb') as f:
+            source = f.read()
+        source_hash = sha256(source).hexdigest()
+        if cached and cached['sha256'] == source_hash:
+            module = cached
+        else:
+            module = self._parse_module(source, file_path)
+            module['sha256'] = source_hash
+        module.update({'mtime': file_stat.st_mtime_ns, 'size': file_stat.st_size})
+        self.manifest[file_path] = module
+        self.changed = True
+        return module
+
+    def _parse_module(self, source, file_path):
+        module = {
+            'imports': {},
+            'star_imports': [],
+            'functions': [],
+            'classes': {},
+            'dynamic': None,
+        }
+        for node in ast.parse(source, file_path).body:
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    module['imports'][alias.asname or alias.name.split('.')[0]] = [alias.name, None, 0]
+            elif isinstance(node, ast.ImportFrom):
+                for alias in node.names:
+                    if alias.name == '*':
+                        module['star_imports'].append(node.module)
+                    else:
+                        module['imports'][alias.asname or alias.name] = [node.module or '', alias.name, node.level]
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                module['functions'].append(node.name)
+            elif isinstance(node, ast.ClassDef):
+                module['classes'][node.name] = self._parse_class(node)
+            elif any([isinstance(child, ast.Call) and isinstance(child.func, ast.Name) and child.func.id == 'setattr'
+                      for child in ast.walk(node)]):
+                module['dynamic'] = 'attributes are set at module level'
+        return module
+
+    def _parse_class(self, node):
+        class_info = {
+            'bases': [],
+            'decorators': [],
+            'methods': {},
+            'dynamic': None,
+        }
+        for base in node.bases:
+            if isinstance(base, ast.Name):
+                class_info['bases'].append(base.id)
+            else:
+                class_info['dynamic'] = 'base class is not a name'
+        if node.keywords:
+            class_info['dynamic'] = 'class keywords are used'
+        for decorator in node.decorator_list:
+            parsed = self._parse_decorator(decorator)
+            if parsed is None:
+                class_info['dynamic'] = 'class decorator is not supported'
+            else:
+                class_info['decorators'].append(parsed)
+        for item in node.body:
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                decorators = []
+                if item.name.startswith('test_'):
+                    for decorator in item.decorator_list:
+                        parsed = self._parse_decorator(decorator)
+                        if parsed is None:
+                            class_info['dynamic'] = f'decorator of {item.name} is not supported'
+                        else:
+                            decorators.append(parsed)
+                class_info['methods'][item.name] = decorators
+            elif isinstance(item, (ast.Assign, ast.AnnAssign)):
+                targets = item.targets if isinstance(item, ast.Assign) else [item.target]
+                if any([isinstance(child, ast.Name) and child.id.startswith('test_')
+                        for target in targets for child in ast.walk(target)]):
+                    class_info['dynamic'] = 'test attribute is assigned'
+            elif not isinstance(item, (ast.Expr, ast.Pass)):
+                class_info['dynamic'] = 'class body has statements'
+        return class_info
+
+    def _parse_decorator(self, node):
+        """
+        :return: [<dotted name>, <the list of arguments> or None if not called, <keyword arguments>] or None
+        """
+        func = node.func if isinstance(node, ast.Call) else node
+        name = self._get_dotted_name(func)
+        if name is None:
+            return None
+        if not isinstance(node, ast.Call):
+            return [name, None, None]
+        args = []
+        for arg in node.args:
+            value = self._parse_arg(arg)
+            if value is None:
+                return None
+            args.append(value[0])
+        kwargs = {}
+        for keyword in node.keywords:
+            value = self._parse_arg(keyword.value)
+            if keyword.arg is None or value is None:
+                return None
+            kwargs[keyword.arg] = value[0]
+        return [name, args, kwargs]
+
+    def _parse_arg(self, node):
+        """
+        :return: tuple (value,) or None if argument is not supported
+        """
+        try:
+            return ast.literal_eval(node),
+        except ValueError:
+            pass
+        if isinstance(node, ast.Name):
+            # method defined above in class body, e.g. @with_setup(setup_testcase)
+            return {self.method_arg: node.id},
+        negated = isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Invert)
+        name = self._get_dotted_name(node.operand if negated else node)
+        if name is not None and name.startswith('test_config.'):
+            return {self.test_config_arg: name[len('test_config.'):], self.negated_arg: negated},
+        return None
+
+    @staticmethod
+    def _get_dotted_name(node):
+        names = []
+        while isinstance(node, ast.Attribute):
+            names.insert(0, node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        names.insert(0, node.id)
+        return '.'.join(names)
+
+    def _get_class_info(self, file_path, class_name, seen):
+        """
+        Class with methods and decorators of base classes
+        """
+        key = (realpath(file_path), class_name)
+        if key in seen:
+            raise StaticCollectionError(f'recursive base class {class_name}')
+        seen = seen + [key]
+        module = self.get_module_info(file_path)
+        if module['dynamic']:
+            raise StaticCollectionError(module['dynamic'])
+        class_info = module['classes'].get(class_name)
+        if class_info is None:
+            raise StaticCollectionError(f'class {class_name} not found')
+        if class_info['dynamic']:
+            raise StaticCollectionError(class_info['dynamic'])
+
+        result = {'decorators': [], 'methods': {}, 'framework_bases': []}
+        for base in reversed(class_info['bases']):
+            if base == 'object':
+                continue
+            if base in module['classes']:
+                base_info = self._get_class_info(file_path, base, seen)
+            elif base in module['imports']:
+                base_module, base_name, level = module['imports'][base]
+                if level == 0 and base_module.split('.')[0] == 'tiden' and base_name is not None:
+                    # framework base classes have no tests, they are imported as is
+                    result['framework_bases'].insert(0, [base_module, base_name])
+                    continue
+                base_path = self._find_module_file(base_module, level, file_path)
+                if base_name is None or base_path is None:
+                    raise StaticCollectionError(f'base class {base} not found')
+                base_info = self._get_class_info(base_path, base_name, seen)
+            else:
+                raise StaticCollectionError(f'base class {base} not found')
+            result['decorators'].extend(base_info['decorators'])
+            result['methods'].update(base_info['methods'])
+            result['framework_bases'] = base_info['framework_bases'] + result['framework_bases']
+
+        for name, args, kwargs in class_info['decorators']:
+            result['decorators'].append([self._resolve_decorator(module, name), args, kwargs])
+        for method_name, decorators in class_info['methods'].items():
+            result['methods'][method_name] = [
+                [self._resolve_decorator(module, name), args, kwargs] for name, args, kwargs in decorators
+            ]
+        return result
+
+    def _resolve_decorator(self, module, name):
+        """
+        :return: name of decorator in Tiden, e.g. 'test_priority.HIGH'
+        """
+        head, _, tail = name.partition('.')
+        resolved = None
+        if head in module['imports']:
+            import_module, import_name, level = module['imports'][head]
+            if level == 0 and import_module.split('.')[0] == 'tiden' and import_name is not None:
+                resolved = import_name + ('.' + tail if tail else '')
+        elif head not in module['functions'] and head not in module['classes'] and \
+                any([star.split('.')[0] == 'tiden' for star in module['star_imports'] if star]):
+            resolved = name
+        if resolved is None or resolved.split('.')[0] not in self.known_decorators:
+            raise StaticCollectionError(f'decorator {name} is not supported')
+        return resolved
+
+    @staticmethod
+    def _find_module_file(module_name, level, file_path):
+        parts = module_name.split('.') if module_name else []
+        if level > 0:
+            base_dir = dirname(realpath(file_path))
+            for _ in range(level - 1):
+                base_dir = dirname(base_dir)
+            roots = [base_dir]
+        else:
+            roots = [entry or getcwd() for entry in sys.path]
+        for root in roots:
+            for candidate in [join(root, *parts) + '.py', join(root, *parts, '__init__.py')]:
+                if parts and exists(candidate):
+                    return candidate
+        return None
+
+    def _get_decorator(self, name):
+        if self.decorators is None:
+            from . import util, priority_decorator, configuration_decorator
+            self.decorators = dict([(decorator, getattr(util, decorator, None)) for decorator in self.known_decorators])
+            self.decorators['test_priority'] = priority_decorator.test_priority
+            self.decorators['test_configuration'] = configuration_decorator.test_configuration
+        names = name.split('.')
+        decorator = self.decorators[names[0]]
+        for attr_name in names[1:]:
+            decorator = getattr(decorator, attr_name)
+        return decorator
+
+    def _get_arg(self, value, stubs):
+        if isinstance(value, dict) and self.method_arg in value:
+            if value[self.method_arg] not in stubs:
+                raise StaticCollectionError(f'{value[self.method_arg]} is not a method')
+            return stubs[value[self.method_arg]]
+        if isinstance(value, dict) and self.test_config_arg in value:
+            from .testconfig import test_config
+            option = test_config
+            for attr_name in value[self.test_config_arg].split('.'):
+                option = getattr(option, attr_name)
+            return ~option if value[self.negated_arg] else option
+        return value
+
+    def _apply(self, decorator, target, stubs):
+        name, args, kwargs = deepcopy(decorator)
+        if args is None:
+            return self._get_decorator(name)(target)
+        args = [self._get_arg(arg, stubs) for arg in args]
+        kwargs = dict([(key, self._get_arg(value, stubs)) for key, value in kwargs.items()])
+        return self._get_decorator(name)(*args, **kwargs)(target)
+
+    @staticmethod
+    def _make_stub(name):
+        def stub(self, *args, **kwargs):
+            pass
+
+        stub.__name__ = name
+        return stub
+
+    def _make_class(self, module_name, class_name, class_info):
+        stubs = dict([(method_name, self._make_stub(method_name)) for method_name in class_info['methods'].keys()])
+        namespace = {'__module__': f'suites.{module_name}'}
+        for method_name, decorators in class_info['methods'].items():
+            method = stubs[method_name]
+            # decorators are applied bottom to top
+            for decorator in reversed(decorators):
+                if decorator[0] in self.class_decorators:
+                    raise StaticCollectionError(f'class decorator {decorator[0]} is used for method')
+                method = self._apply(decorator, method, stubs)
+            namespace[method_name] = method
+        bases = []
+        for base_module, base_name in class_info['framework_bases']:
+            base = getattr(import_module(base_module), base_name)
+            if base not in bases:
+                bases.append(base)
+        test_class = type(class_name, tuple(bases), namespace)
+        for decorator in reversed(class_info['decorators']):
+            if decorator[0] not in self.class_decorators:
+                raise StaticCollectionError(f'decorator {decorator[0]} is used for class')
+            test_class = self._apply(decorator, test_class, stubs)
+        return test_class
@@ -48,9 +48,8 @@ class StressT:
         :param host: host for run command
         :return: pid of server node
         """
-        get_pid = \
-            'ps -ef | grep ignite | grep java | grep -v client | grep ignite.server | head -n 1 | awk \'{print $2}\''
-        return ''.join(self.ssh.exec_on_host(host, [get_pid])[host]).rstrip()
+        processes = self.ssh.get_process_table().find(host, 'ignite', 'ignite.server', exclude=('client',))
+        return processes[0]['pid'] if processes else ''
 
     def get_random_client_pid(self, host):
         """
@@ -58,8 +57,8 @@ class StressT:
         :param host: host for run command
         :return: pid of client node
         """
-        get_pid = 'ps -ef | grep ignite | grep java | grep client | head -n 1 | awk \'{print $2}\''
-        return ''.join(self.ssh.exec_on_host(host, [get_pid])[host]).rstrip()
+        processes = self.ssh.get_process_table().find(host, 'ignite', 'client')
+        return processes[0]['pid'] if processes else ''
 
     def sigstop(self, host, pid):
         """
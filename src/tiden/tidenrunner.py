@@ -18,13 +18,15 @@ from re import search
 from .tidenpluginmanager import PluginManager
 
 from .report.steps import step, InnerReportConfig, Step, add_attachment, AttachmentType
-from .util import log_print, unix_path, call_method, create_case, kill_stalled_java, exec_time
+from .util import log_print, unix_path, call_method, create_case, kill_stalled_java, exec_time, hms
 from .result import Result
 from .util import write_yaml_file, should_be_skipped
 from .logger import *
 from .runner import get_test_modules, get_long_path_len, get_class_from_module, known_issue_str
 from .priority_decorator import get_priority_key
 from .sshpool import SshPool
+from .staticcollector import StaticCollector
+from .timingstore import TimingStore
 from uuid import uuid4
 from traceback import format_exc
 
@@ -112,6 +114,12 @@ class TidenRunner:
     test_module_cache = None
     test_class_cache = None
 
+    # TimingStore instance, history of test durations
+    timing = None
+
+    # StaticCollector instance, used to collect tests without import of modules
+    static_collector = None
+
     def __init__(self, config, **kwargs):
         if kwargs.get('modules', None) is not None:
             self.modules = kwargs.get('modules')
@@ -132,6 +140,7 @@ class TidenRunner:
 
         self.test_module_cache = {}
         self.test_class_cache = {}
+        self.timing = TimingStore.from_config(config)
 
     def collect_tests(self):
         """
@@ -148,6 +157,7 @@ class TidenRunner:
             self.ssh = ssh_pool
 
         self.__prepare_session_vars()
+        self.static_collector = StaticCollector.from_config(self.config)
 
         for test_module in sorted(self.modules.keys()):
             # cleanup instance vars
@@ -162,12 +172,22 @@ class TidenRunner:
             self.collect_tests0(test_method_names)
 
             self.total.update(self.test_plan[test_module])
+            self.__print_predicted_duration(test_module, self.test_plan[test_module].tests_to_execute)
+
+        if self.static_collector is not None:
+            self.static_collector.save()
 
         log_print("*** Found %s tests. %s skipped. Going to 'run' %s tests ***" % (
             len(self.total.all_tests),
             len(self.total.skipped_tests),
             len(self.total.tests_to_execute)
         ), color='blue')
+        if self.timing is not None:
+            total_seconds = sum([
+                self.timing.predict(test_module, self.test_plan[test_module].tests_to_execute)[0]
+                for test_module in self.modules.keys()
+            ])
+            log_print("*** Predicted duration %d:%02d:%02d ***" % hms(int(total_seconds)), color='blue')
 
         test_cnt = 0
 
@@ -201,7 +221,7 @@ class TidenRunner:
             if hasattr(self.test_class, 'check_requirements'):
                 getattr(self.test_class, 'check_requirements')()
 
-        for test_module in sorted(self.modules.keys()):
+        for test_module in self.get_modules_order():
             # cleanup instance vars
             self.test_plan[test_module] = TidenTestPlan()
 
@@ -238,7 +258,8 @@ class TidenRunner:
                 self._skip_tests()
 
             if len(test_plan.tests_to_execute) > 0:
-                tests_to_execute = sorted(test_plan.tests_to_execute, key=get_priority_key(self.test_class))
+                tests_to_execute = sorted(test_plan.tests_to_execute,
+                                          key=get_priority_key(self.test_class, self.get_test_key()))
 
                 log_print("*** Found %s tests in %s. %s skipped. Going to run %s tests ***\n%s" % (
                     len(test_plan.all_tests), self.test_class_name, len(test_plan.skipped_tests),
@@ -262,6 +283,26 @@ class TidenRunner:
                 if not setup_passed:
                     exit(1)
 
+    def is_fail_fast(self):
+        return self.timing is not None and self.config.get('schedule') == 'fail_fast'
+
+    def get_modules_order(self):
+        """
+        Modules in order of execution: sorted by name, or most often failed and cheaper modules first
+        with `schedule: fail_fast` option
+        """
+        if self.is_fail_fast():
+            return sorted(sorted(self.modules.keys()), key=self.timing.get_module_key())
+        return sorted(self.modules.keys())
+
+    def get_test_key(self):
+        """
+        Order of tests of the same priority within current module, see `TimingStore.get_test_key`
+        """
+        if self.is_fail_fast():
+            return self.timing.get_test_key(self.test_module)
+        return None
+
     def create_test_module_attr_yaml(self, test_method_names):
         # create attr.yaml
         for current_test_name in test_method_names:
@@ -318,18 +359,19 @@ class TidenRunner:
                 }
             }
 
-        if self.test_module in self.test_module_cache:
-            module = self.test_module_cache[self.test_module]
-        else:
-            module = import_module("suites.%s" % self.test_module)
-            self.test_module_cache[self.test_module] = module
-
         # used for collect_only
         if fake_init:
-            self.test_class = getattr(module, self.test_class_name)
-            self.test_class.__init__ = fake_init
-            self.test_class = getattr(module, self.test_class_name)(self.config, self.ssh_pool)
+            test_class = None
+            if self.static_collector is not None:
+                test_class = self.static_collector.get_test_class(
+                    self.test_module, self.modules[self.test_module]['path'], self.test_class_name
+                )
+            if test_class is None:
+                test_class = getattr(self.__import_test_module(), self.test_class_name)
+            test_class.__init__ = fake_init
+            self.test_class = test_class(self.config, self.ssh_pool)
         else:
+            module = self.__import_test_module()
             if config_module:
                 # for process tests - prepare test directory and resources
                 self.__create_test_module_directory(remote_test_module_dir, test_module_dir)
@@ -354,6 +396,14 @@ class TidenRunner:
             if config_module:
                 self._save_config()
 
+    def __import_test_module(self):
+        if self.test_module in self.test_module_cache:
+            module = self.test_module_cache[self.test_module]
+        else:
+            module = import_module("suites.%s" % self.test_module)
+            self.test_module_cache[self.test_module] = module
+        return module
+
     def __prepare_test_vars(self, test_method_name=None, configuration=None, cfg_options=None, **kwargs):
         if not test_method_name:
             return
@@ -473,7 +523,9 @@ class TidenRunner:
                 repeated_test_continue_on_pass = test_param.get('continue_on_pass')
                 test_with_iterations = True if repeated_test_count > 1 else False
                 pad_string = self.__get_pad_string()
-                log_print("%s started (%s from %s)" % (pad_string, test_cnt, len(tests_to_execute)), color='yellow')
+                log_print("%s started (%s from %s)%s" % (pad_string, test_cnt, len(tests_to_execute),
+                                                         self.__get_eta_string(tests_to_execute[test_cnt - 1:])),
+                          color='yellow')
 
                 for self.test_iteration in range(repeated_test_count):
                     if test_with_iterations:
@@ -564,6 +616,9 @@ class TidenRunner:
             if not hasattr(self.test_class, 'keep_ignite_between_tests'):
                 kill_stalled_java(self.ssh_pool)
 
+            if self.timing is not None:
+                self.timing.add(self.test_module, self.current_test_name, test_status, time() - started)
+
             return test_status
 
     @step('logs')
@@ -899,6 +954,23 @@ class TidenRunner:
         pad_string = method_long_name.ljust(long_path_len, '.')
         log_print("%s found (%s from %s)" % (pad_string, test_cnt, len(self.total.tests_to_execute)), color='yellow')
 
+    def __print_predicted_duration(self, test_module, tests):
+        if self.timing is None or not tests:
+            return
+        seconds, unknown = self.timing.predict(test_module, tests)
+        log_print("%s predicted duration %d:%02d:%02d%s" % (
+            test_module, *hms(int(seconds)),
+            ' (%s from %s tests without history)' % (unknown, len(tests)) if unknown else ''
+        ), color='blue')
+
+    def __get_eta_string(self, tests):
+        if self.timing is None:
+            return ''
+        seconds, unknown = self.timing.predict(self.test_module, tests)
+        if unknown == len(tests):
+            return ''
+        return ", module ETA %d:%02d:%02d" % hms(int(seconds))
+
     def __print_with_format(self, msg='', current_method_name=''):
         if not current_method_name:
             if self.current_test_method:
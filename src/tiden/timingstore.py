@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sqlite3
+from os.path import join
+from threading import Lock
+from time import time
+
+
+class TimingStore:
+    """
+    History of test durations and statuses in local SQLite database `<var_dir>/<timing_db>`.
+
+    Only the last `history_size` runs of every test are kept. Statistics are read once and updated in memory,
+    database connection is opened per operation, so store is safe to use from forked shard workers.
+    """
+
+    default_file = 'test_timing.db'
+    history_size = 10
+    # busy timeout for concurrent writers, seconds
+    timeout = 30
+
+    def __init__(self, db_path, history_size=None):
+        self.db_path = db_path
+        if history_size is not None:
+            self.history_size = history_size
+        self.lock = Lock()
+        self.stats = None
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS test_runs ('
+                'module TEXT NOT NULL, test TEXT NOT NULL, status TEXT NOT NULL, '
+                'duration REAL NOT NULL, finished REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS test_runs_test ON test_runs (module, test, finished)')
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        :return: store in `var_dir` or None if `var_dir` is not set or `timing_db` option is False
+        """
+        file_name = config.get('timing_db', cls.default_file)
+        if not config.get('var_dir') or not file_name:
+            return None
+        return cls(join(config['var_dir'], file_name))
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=self.timeout)
+
+    def add(self, module, test, status, duration):
+        """
+        Record test run
+        :param module: test module name, e.g. <suite>.<module file name>
+        :param test: test name with configuration
+        :param status: test status
+        :param duration: seconds
+        """
+        with self.lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute('INSERT INTO test_runs VALUES (?, ?, ?, ?, ?)',
+                                 (module, test, status, float(duration), time()))
+                    conn.execute(
+                        'DELETE FROM test_runs WHERE module = ? AND test = ? AND rowid NOT IN ('
+                        'SELECT rowid FROM test_runs WHERE module = ? AND test = ? ORDER BY finished DESC LIMIT ?)',
+                        (module, test, module, test, self.history_size)
+                    )
+                    row = conn.execute(
+                        "SELECT AVG(duration), AVG(status != 'pass'), COUNT(*) FROM test_runs "
+                        "WHERE module = ? AND test = ?", (module, test)
+                    ).fetchone()
+            finally:
+                conn.close()
+            if self.stats is not None:
+                self.stats[(module, test)] = row
+
+    def get_stats(self):
+        """
+        :return: dictionary (<module>, <test>): (<mean duration>, <fail rate>, <number of runs>)
+        """
+        with self.lock:
+            if self.stats is None:
+                conn = self._connect()
+                try:
+                    self.stats = dict([
+                        ((module, test), (duration, fail_rate, runs))
+                        for module, test, duration, fail_rate, runs in conn.execute(
+                            "SELECT module, test, AVG(duration), AVG(status != 'pass'), COUNT(*) "
+                            "FROM test_runs GROUP BY module, test"
+                        )
+                    ])
+                finally:
+                    conn.close()
+            return self.stats
+
+    def get_duration(self, module, test):
+        """
+        :return: mean duration of test or None if test was never run
+        """
+        stats = self.get_stats().get((module, test))
+        return stats[0] if stats else None
+
+    def get_fail_rate(self, module, test):
+        stats = self.get_stats().get((module, test))
+        return stats[1] if stats else 0.0
+
+    def predict(self, module, tests):
+        """
+        Predict duration of tests, duration of test without history is the mean of known tests of the module
+        (or of all known tests)
+        :param module: test module name
+        :param tests: the list of test names
+        :return: (<seconds>, <number of tests without history>)
+        """
+        stats = self.get_stats()
+        known = [self.get_duration(module, test) for test in tests]
+        unknown = len([duration for duration in known if duration is None])
+        if unknown:
+            module_durations = [value[0] for key, value in stats.items() if key[0] == module]
+            all_durations = module_durations or [value[0] for value in stats.values()]
+            default = sum(all_durations) / len(all_durations) if all_durations else 0.0
+            known = [default if duration is None else duration for duration in known]
+        return sum(known), unknown
+
+    def get_module_duration(self, module):
+        """
+        :return: sum of mean durations of all known tests of module or None if module was never run
+        """
+        durations = [value[0] for key, value in self.get_stats().items() if key[0] == module]
+        return sum(durations) if durations else None
+
+    def get_module_fail_rate(self, module):
+        rates = [value[1] for key, value in self.get_stats().items() if key[0] == module]
+        return max(rates) if rates else 0.0
+
+    def get_test_key(self, module):
+        """
+        Secondary sort key for tests of the same priority to fail fast: most often failed tests first,
+        cheaper tests first among equally failed, never run tests last
+        """
+
+        def test_key(test):
+            duration = self.get_duration(module, test)
+            if duration is None:
+                return 1, 0.0, 0.0
+            return 0, -self.get_fail_rate(module, test), duration
+
+        return test_key
+
+    def get_module_key(self):
+        """
+        Sort key for modules to fail fast, see `get_test_key`
+        """
+
+        def module_key(module):
+            duration = self.get_module_duration(module)
+            if duration is None:
+                return 1, 0.0, 0.0
+            return 0, -self.get_module_fail_rate(module), duration
+
+        return module_key
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from .tidenexception import TidenException
+from .util import log_print, get_logger
+
+
+class TreeDistribution:
+    """
+    Copies files already present at one host to other hosts host-to-host.
+
+    Distribution goes in rounds: at every round each host which already has files sends them to one more host,
+    so the number of hosts serving files doubles every round and n hosts get files in log2(n) rounds instead
+    of n reads from the single source host. Every hop is verified by md5 of the copied file, failed hop is
+    retried from the source host.
+    """
+
+    rsync_command = 'rsync {source_host}:{file} {file}'
+    scp_command = 'scp {source_host}:{file} {file}'
+    # copy commands which send only differences from the existing target file, so it is not removed before copy
+    delta_copy_commands = ('rsync',)
+    report_header = 'hop:'
+
+    def __init__(self, ssh, copy_command=None):
+        """
+        :param ssh: ssh pool
+        :param copy_command: command to run at target host to copy file from source host,
+                with {source_host}, {target_host} and {file} placeholders, rsync by default
+        """
+        self.ssh = ssh
+        self.copy_command = copy_command if copy_command is not None else self.rsync_command
+        self.hops = []
+
+    @staticmethod
+    def get_rounds(source_hosts, target_hosts):
+        """
+        :return: the list of rounds, every round is dictionary <target host>: <source host>
+        """
+        holders = list(source_hosts)
+        pending = [host for host in target_hosts if host not in holders]
+        rounds = []
+        while pending and holders:
+            current_round = dict(zip(pending, holders))
+            pending = pending[len(current_round):]
+            holders.extend(current_round.keys())
+            rounds.append(current_round)
+        return rounds
+
+    def distribute(self, files, source_host, hosts):
+        """
+        Copy files from source host to hosts, file paths are the same at all hosts
+        :param files: the list of remote files
+        :param source_host: host which has files
+        :param hosts: the list of target hosts
+        :return: the list of hops, see `_get_hop`
+        """
+        self.hops = []
+        expected = self._exec_round({source_host: None}, files)
+        checksums = {}
+        for hop in expected:
+            if not hop['md5']:
+                raise TidenException(f"File {hop['file']} not found at host {source_host}")
+            checksums[hop['file']] = hop['md5']
+
+        failed = []
+        for round_idx, current_round in enumerate(self.get_rounds([source_host], hosts), start=1):
+            hops = self._exec_round(current_round, files)
+            for hop in hops:
+                hop['round'] = round_idx
+                self._report(hop, checksums)
+                if hop['md5'] != checksums[hop['file']]:
+                    failed.append(hop['target'])
+            self.hops.extend(hops)
+
+        if failed:
+            # retry failed hosts from the source host, hosts got files from failed host are possibly broken too
+            retry_round = dict([(host, source_host) for host in sorted(set(failed))])
+            hops = self._exec_round(retry_round, files)
+            for hop in hops:
+                hop['round'] = 'retry'
+                self._report(hop, checksums)
+            self.hops.extend(hops)
+            broken = sorted(set([hop['target'] for hop in hops if hop['md5'] != checksums[hop['file']]]))
+            if broken:
+                raise TidenException(f"Files {', '.join(files)} were not copied to hosts {', '.join(broken)}")
+        return self.hops
+
+    def _exec_round(self, current_round, files):
+        commands = {}
+        for target_host, source_host in current_round.items():
+            commands[target_host] = [
+                self._get_hop_command(idx, file, source_host, target_host) for idx, file in enumerate(files)
+            ]
+        results = self.ssh.exec(commands)
+        hops = []
+        for target_host, source_host in current_round.items():
+            for output in results.get(target_host, []):
+                hop = self._get_hop(output, files, source_host, target_host)
+                if hop is not None:
+                    hops.append(hop)
+            # host without report is failed at all
+            reported = [hop['file'] for hop in hops if hop['target'] == target_host]
+            for file in files:
+                if file not in reported:
+                    hops.append({
+                        'file': file, 'source': source_host, 'target': target_host,
+                        'size': 0, 'seconds': 0.0, 'md5': '',
+                    })
+        return hops
+
+    def _get_hop_command(self, idx, file, source_host, target_host):
+        report = f"echo \"{self.report_header}{idx} $((e - s)) " \
+                 f"$(stat -L -c %s '{file}' 2>/dev/null || echo 0) " \
+                 f"$(md5sum 2>/dev/null < '{file}' | cut -c1-32)\""
+        if source_host is None:
+            return f"s=0; e=0; {report}"
+        copy_command = self.copy_command.format(source_host=source_host, target_host=target_host, file=file)
+        remove_command = '' if copy_command.split()[0] in self.delta_copy_commands else f"rm -f '{file}'; "
+        return f"mkdir -p $(dirname '{file}'); {remove_command}s=$(date +%s%N); {copy_command}; " \
+               f"e=$(date +%s%N); {report}"
+
+    def _get_hop(self, output, files, source_host, target_host):
+        """
+        :return: dictionary {file, source, target, size, seconds, md5} or None
+        """
+        for line in output.splitlines():
+            if not line.startswith(self.report_header):
+                continue
+            values = line[len(self.report_header):].split()
+            try:
+                return {
+                    'file': files[int(values[0])],
+                    'source': source_host,
+                    'target': target_host,
+                    'seconds': int(values[1]) / 1e9,
+                    'size': int(values[2]),
+                    'md5': values[3] if len(values) > 3 else '',
+                }
+            except (ValueError, IndexError):
+                get_logger('tiden').debug(f'Unexpected distribution report from {target_host}: {line}')
+        return None
+
+    @staticmethod
+    def _report(hop, checksums):
+        if hop['md5'] != checksums[hop['file']]:
+            log_print(f"Round {hop['round']}: {hop['source']} -> {hop['target']} {hop['file']} "
+                      f"checksum mismatch", color='red')
+            return
+        speed = hop['size'] / hop['seconds'] / 1024 / 1024 if hop['seconds'] > 0 else 0.0
+        log_print(f"Round {hop['round']}: {hop['source']} -> {hop['target']} {hop['file']} "
+                  f"{hop['size'] / 1024 / 1024:.1f} MB in {hop['seconds']:.1f} s ({speed:.1f} MB/s)", 3)
@@ -23,13 +23,9 @@ from yaml import load, YAMLError, dump, Loader, FullLoader
 from datetime import datetime
 from genericpath import exists
 from time import sleep, time
-from jinja2 import Environment, FileSystemLoader
 from json import loads
 from os import path, listdir
-from inspect import stack
-from sys import stdout
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from sys import stdout, _getframe
 from enum import Enum
 from xml.etree.ElementTree import ElementTree, parse as _parse_xml
 from .logger import get_logger
@@ -170,6 +166,9 @@ def json_request(url, **kwargs):
     :param url: requested URL
     :return:    the dictionary
     """
+    from urllib.error import HTTPError, URLError
+    from urllib.request import Request, urlopen
+
     if 'auth_creds' in kwargs and 'authentication_enabled' in kwargs['auth_creds']:
         if 'sessionToken' in kwargs:
             url += "&sessionToken=%s" % kwargs['auth_creds']['sessionToken']
@@ -197,6 +196,8 @@ def json_request_with_errors(url, **kwargs):
     :param url: requested URL
     :return:    the dictionary
     """
+    from urllib.request import Request, urlopen
+
     if 'auth_creds' in kwargs and 'authentication_enabled' in kwargs['auth_creds']:
         if 'sessionToken' in kwargs:
             url += "&sessionToken=%s" % kwargs['auth_creds']['sessionToken']
@@ -237,11 +238,13 @@ def exec_time(n, mode=0):
 
 
 def __is_called_from_line():
-    data = stack()
+    # walk frames directly: inspect.stack() reads source context of every frame on each call
     file_positions = []
-    for item in data:
-        if 'suites' in item[1]:
-            file_positions.insert(0, f":{item[2]}")
+    frame = _getframe()
+    while frame is not None:
+        if 'suites' in frame.f_code.co_filename:
+            file_positions.insert(0, f":{frame.f_lineno}")
+        frame = frame.f_back
     return file_positions
 
 
@@ -765,6 +768,8 @@ def md5_for_file(f, block_size=2 ** 20):
 
 
 def render_template(glob_path, name, options):
+    from jinja2 import Environment, FileSystemLoader
+
     output = {}
     output_dir = path.dirname(glob_path)
     for tmpl_file in glob(glob_path):
@@ -1354,12 +1359,14 @@ def util_get_now():
 
 
 def kill_stalled_java(ssh):
-    java_processes = ssh.jps()
+    process_table = ssh.get_process_table()
+    # nodes could be killed by test teardown after the last snapshot
+    java_processes = process_table.get_processes(refresh=True)
     if java_processes:
         log_print('Found stalled java processes {}'.format(java_processes), color='debug')
         ssh.killall('java')
         sleep(3)
-        java_processes = ssh.jps()
+        java_processes = process_table.get_processes(refresh=True)
 
         if java_processes:
             log_print('Could not kill java processes {}'.format(java_processes), color='red')
@@ -14,13 +14,35 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .base_utility import BaseUtility
-from .control_utility import ControlUtility
-from .sqlline_utility import Sqlline
+_lazy_attrs = {
+    "BaseUtility": ".base_utility",
+    "ControlUtility": ".control_utility",
+    "ControlUtilitySession": ".control_utility",
+    "IdleVerifyDump": ".idle_verify_dump",
+    "Sqlline": ".sqlline_utility",
+}
 
 __all__ = [
     "BaseUtility",
     "ControlUtility",
+    "ControlUtilitySession",
+    "IdleVerifyDump",
     "Sqlline",
 ]
 
+
+def __getattr__(name):
+    """
+    Utilities are imported on first access, see `tiden.apps.__getattr__`
+    """
+    if name not in _lazy_attrs:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    from importlib import import_module
+
+    value = getattr(import_module(_lazy_attrs[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(__all__))
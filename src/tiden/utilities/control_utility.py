@@ -14,21 +14,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from collections import OrderedDict
-from os.path import basename
+from copy import deepcopy
+from os import getpid, replace
+from os.path import basename, exists, join
 from re import search, sub
+from threading import Lock
 from time import sleep
 from uuid import uuid4
 
 from ..apps.ignite.igniteexception import IgniteException
 from ..report.steps import step
 from ..tidenexception import TidenException
-from ..util import print_red, log_print, log_put, version_num
+from ..util import print_red, log_print, log_put, version_num, load_yaml
 from ..logger import get_logger
 from ..assertions import *
 from .base_utility import BaseUtility
+from .idle_verify_dump import IdleVerifyDump
 
 
 class ControlUtility(BaseUtility):
+    # numbers of control.sh logs by test directory, grid and command, shared by all utilities
+    log_numbers = {}
+    log_numbers_lock = Lock()
 
     def __init__(self, ignite, parent_cls=None):
         super().__init__(ignite, parent_cls=parent_cls)
@@ -40,6 +47,7 @@ class ControlUtility(BaseUtility):
         self.ssl_conn_tuple = None
         self.ignite_version = None
         self.ignite_version_num = None
+        self.latest_exit_code = None
 
     def get_ssh(self):
         if hasattr(self.ignite, 'docker_ssh'):
@@ -86,10 +94,72 @@ class ControlUtility(BaseUtility):
         log_print(f"Control utility {' '.join(args)}")
         args = list(args)
         client_host = self.ignite.get_and_inc_client_host()
+        server_host, server_port = self.get_server_host_port(client_host, **kwargs)
+
+        # log any control utility command
+        background = ''
+        if kwargs.get('background'):
+            background = '&'
+        log_path = self.get_log_path(args, **kwargs)
+
+        if log_path is not None and not background:
+            # run command and read its log by a single remote call
+            session = ControlUtilitySession(self, client_host=client_host, server_host=server_host,
+                                            server_port=server_port, ssh_options=kwargs.get('ssh_options', {}))
+            session.add(*args, log=log_path, output_limit=kwargs.get('output_limit'), show_output=False)
+            lines = session.run()[0]['output']
+            if kwargs.get('show_output', True):
+                self.__print_utility_output(lines.rstrip('\n'))
+        else:
+            bg = f'> {log_path} 2>&1 {background}' if log_path else ''
+            commands = {
+                client_host: [
+                    f"cd {self.ignite.client_ignite_home}; "
+                    f"{self.get_control_command(server_host, server_port, args)} {bg}"
+                ]
+            }
+
+            self.ignite.logger.debug(commands)
+            ssh_options = kwargs.get('ssh_options', {})
+
+            results = self.ssh.exec(commands, **ssh_options)
+            lines = results[client_host][0]
+            if kwargs.get('show_output', True):
+                self.__print_utility_output(lines)
+            self.latest_exit_code = None
+
+        self.latest_utility_output = lines
+        self.latest_utility_host = client_host
+        self.check_utility_output(lines, **kwargs)
+        return self
+
+    def session(self, **kwargs):
+        """
+        Create session to run several control.sh commands by a single remote call, e.g.:
+
+            with cu.session() as session:
+                session.add('--baseline')
+                session.add('--cache', 'idle_verify')
+            outputs = [result['output'] for result in session.results]
+
+        :param kwargs: server node selection options of `control_utility` (`node`, `use_same_host`, ...)
+            and `ssh_options`
+        :return: ControlUtilitySession
+        """
+        client_host = self.ignite.get_and_inc_client_host()
+        server_host, server_port = self.get_server_host_port(client_host, **kwargs)
+        return ControlUtilitySession(self, client_host=client_host, server_host=server_host,
+                                     server_port=server_port, ssh_options=kwargs.get('ssh_options', {}))
+
+    def get_server_host_port(self, client_host, **kwargs):
+        """
+        Find server node to connect control.sh to
+        :param client_host: host control.sh is run on
+        :param kwargs: `node`, `use_same_host`, `use_another_host` and `reverse` options of `control_utility`
+        :return: server host and binary rest port
+        """
         server_host = None
         server_port = None
-        bg = ''
-        too_many_lines_num = 100
 
         alive_server_nodes = self.ignite.get_alive_default_nodes() + self.ignite.get_alive_additional_nodes()
         if 'node' in kwargs:
@@ -113,35 +183,31 @@ class ControlUtility(BaseUtility):
             break
         if server_host is None or server_port is None:
             raise TidenException('Not found running server nodes')
+        return server_host, server_port
 
-        nohup = ''
-
-        # log any control utility command
-        background = ''
-        if kwargs.get('background'):
-            background = '&'
+    def get_log_path(self, args, **kwargs):
+        """
+        :return: remote path of control.sh log by `log` option of `control_utility`: given path, None if `log` is
+            False or new file in test directory (numbered locally, so remote directory is not listed)
+        """
         if isinstance(kwargs.get('log'), str):
-            log_path = kwargs['log']
+            return kwargs['log']
         elif isinstance(kwargs.get('log'), bool) and not kwargs['log']:
-            log_path = None
-        else:
-            test_dir = self.ignite.config['rt']['remote']['test_dir']
-            first_command = sub(r'\W+', '', args[0])
-            file_name = None
-            for i in range(1, 10000):
-                file_name = f'control.{self.ignite.grid_name}.{first_command}.{i}.log'
-                ls_out = self.ssh.exec_on_host(server_host, [f'ls {test_dir}'])[server_host]
-                if [file for file in ls_out[0].split('\n') if file_name == file]:
-                    file_name = None
-                else:
-                    break
-            if file_name is None:
-                file_name = f'control.{self.ignite.name}.{first_command}.{str(uuid4())[:6]}.log'
-            log_path = f'{test_dir}/{file_name}'
+            return None
 
-        if log_path:
-            bg = f'> {log_path} 2>&1 {background}'
+        test_dir = self.ignite.config['rt']['remote']['test_dir']
+        first_command = sub(r'\W+', '', args[0])
+        log_key = (test_dir, self.ignite.grid_name, first_command)
+        with ControlUtility.log_numbers_lock:
+            ControlUtility.log_numbers[log_key] = ControlUtility.log_numbers.get(log_key, 0) + 1
+            log_number = ControlUtility.log_numbers[log_key]
+        return f'{test_dir}/control.{self.ignite.grid_name}.{first_command}.{log_number}.log'
 
+    def get_control_command(self, server_host, server_port, args):
+        """
+        :return: control.sh command line with authentication and SSL options
+        """
+        args = list(args)
         if self.authentication_enabled:
             if self.auth_login:
                 args.append(f'--user {self.auth_login}')
@@ -151,31 +217,13 @@ class ControlUtility(BaseUtility):
         if self.ssl_connection_enabled:
             args.append(self.__return_ssl_connection_string())
 
-        commands = {
-            client_host: [
-                f"cd {self.ignite.client_ignite_home}; "
-                f"{nohup} bin/control.sh --host {server_host} --port {server_port} {' '.join(args)} {bg}"
-            ]
-        }
-
-        self.ignite.logger.debug(commands)
-        ssh_options = kwargs.get('ssh_options', {})
+        return f"bin/control.sh --host {server_host} --port {server_port} {' '.join(args)}"
 
-        results = self.ssh.exec(commands, **ssh_options)
-
-        if log_path is not None and not background:
-            limit = ''
-            if kwargs.get('output_limit'):
-                limit = f' | tail -n {kwargs["output_limit"]}'
-            lines = self.ssh.exec_on_host(client_host, [f'cat {log_path}{limit}'])[client_host][0]
-        else:
-            lines = results[client_host][0]
-
-        if kwargs.get('show_output', True):
-            self.__print_utility_output(lines)
-
-        self.latest_utility_output = lines
-        self.latest_utility_host = client_host
+    def check_utility_output(self, lines, **kwargs):
+        """
+        Check control.sh output by `all_required` and `strict` options of `control_utility`
+        """
+        too_many_lines_num = 100
         if kwargs.get('all_required'):
             success = self.check_content_all_required(
                 lines, kwargs.get('all_required'),
@@ -192,9 +240,8 @@ class ControlUtility(BaseUtility):
             if not success and not kwargs.get('background'):
                 raise TidenException(''.join(lines_to_show))
         if kwargs.get('strict'):
-            if 'Error:' in self.latest_utility_output:
+            if 'Error:' in lines:
                 raise TidenException('control.sh --baseline command end up with exceptions')
-        return self
 
     def __find_commands(self):
         nodes = self.ignite.get_all_default_nodes()
@@ -368,7 +415,32 @@ class ControlUtility(BaseUtility):
 
     def __update_commands(self):
         if self.commands is None:
+            cache_key = self.get_commands_cache_key()
+            catalog = ControlUtilityCommandsCache.get(self.ignite.config.get('var_dir'), cache_key)
+            if catalog is not None:
+                self.commands = deepcopy(catalog['commands'])
+                self.ssl_keys = deepcopy(catalog['ssl_keys'])
+                if catalog.get('ignite_version'):
+                    self.ignite_version = catalog['ignite_version']
+                    self.ignite_version_num = version_num(self.ignite_version)
+                return
             self.commands = self.__find_commands()
+            ControlUtilityCommandsCache.put(self.ignite.config.get('var_dir'), cache_key, {
+                'commands': self.commands,
+                'ssl_keys': self.ssl_keys,
+                'ignite_version': self.ignite_version,
+            })
+
+    def get_commands_cache_key(self):
+        """
+        :return: key of parsed control.sh commands: sha256 of local Ignite artifact and Ignite version,
+            None if artifact is unknown
+        """
+        artifact = self.ignite.config.get('artifacts', {}).get(getattr(self.ignite, 'artifact_name', None)) or {}
+        if not artifact.get('ignite_version') or not artifact.get('path') or not exists(artifact['path']):
+            return None
+        checksum = ControlUtilityCommandsCache.get_checksum(self.ignite.config.get('var_dir'), artifact['path'])
+        return f"{checksum}-{artifact['ignite_version']}"
 
     def __check_command_supported(self, command):
         self.__update_commands()
@@ -550,12 +622,13 @@ class ControlUtility(BaseUtility):
         return self._get_nodes_state_from_output()
 
     def idle_verify_dump(self, skip_zeros=False, cache_filter=False, exclude_caches=False,
-                         copy_dir=None, key_dump=True, **kwargs):
+                         copy_dir=None, key_dump=True, columnar=False, **kwargs):
         """
         Dump current caches metrics in file
 
         :param skip_zeros:  use option --skipZeros
         :param copy_dir:    directory to backup dump file (recommend to use test_dir)
+        :param columnar:    return IdleVerifyDump instead of the list of dictionaries
         :return:            parsed caches dump
         """
         args = ["--cache", 'idle_verify']
@@ -572,6 +645,8 @@ class ControlUtility(BaseUtility):
         print(args)
         self.control_utility(*args, **kwargs)
         if key_dump:
+            if columnar:
+                return self.get_idle_verify_dump(copy_path=copy_dir)
             return self.get_parsed_dump_items(copy_path=copy_dir)
 
     def get_idle_verify_dump_path(self):
@@ -606,62 +681,32 @@ class ControlUtility(BaseUtility):
                                         }
                             })
         """
+        return self.get_idle_verify_dump(file_path=file_path, copy_path=copy_path).to_items()
+
+    def get_idle_verify_dump(self, file_path=None, copy_path=None):
+        """
+        Read dump file from the host it is stored on
+
+        :param file_path:   dump file path
+        :param copy_path:   path to copy dump file
+        :return:            IdleVerifyDump
+        """
         if file_path is None:
             file_path = self.get_idle_verify_dump_path()
 
-        # searching on all hosts because dump file stored in first server node directory
+        # dump file is stored in directory of server node control.sh connected to, find its host
+        found_marker = 'TIDEN_DUMP_FOUND'
+        result = self.ssh.exec([f'test -f {file_path} && echo {found_marker}'])
+        hosts = [host for host, command_out in result.items() if found_marker in ''.join(command_out)]
+        if not hosts:
+            raise IgniteException(f"Can't find idle verify dump {file_path}")
+
         if copy_path:
             cmd = 'cp {src} {dst} && cat {src}'.format(src=file_path, dst=copy_path)
         else:
             cmd = 'cat {}'.format(file_path)
         print_red('Idle verify dump: %s' % cmd)
-        result = self.ssh.exec([cmd])
-        for host, command_out in result.items():
-            command_out = command_out[0]
-            if 'No such file or directory' not in command_out and command_out != '':
-                result = command_out
-
-        # filter body
-        lines = result.split("\n")
-        body_lines = []
-        for line in lines:
-            read = line.startswith("Partition")
-            if read:
-                body_lines.append(line)
-
-        result_list = []
-        structure = {}
-        for line in body_lines:
-            if line.startswith("Partition:"):
-
-                structure["info"] = {"name": line[line.index(":") + 1:line.index("[")]}
-
-                for pair in line[line.index("[") + 1:line.index("]")].split(","):
-                    key, value = pair.strip().split("=")
-                    structure["info"][key] = value
-
-            elif line.startswith("Partition instances:"):
-
-                structure["instances"] = []
-
-                items_line = line[line.index("[") + 1:line.rindex("]")]
-                for partition in items_line.split("],"):
-
-                    instance = {"name": partition[:partition.index("[")].strip()}
-
-                    for pair in partition[partition.index("[") + 1:].split(","):
-                        pair = pair.replace("]", "").strip()
-                        key, value = pair.split("=")
-                        instance[key] = value
-
-                    structure["instances"].append(instance)
-
-            # two lines for two dict keys
-            if len(structure) == 2:
-                result_list.append(structure)
-                structure = {}
-
-        return result_list
+        return IdleVerifyDump().parse(self.ssh.exec_on_host_stream(hosts[0], cmd))
 
     def check_all_msgs_in_utility_output(self, lines_to_search):
         utility_output = self.latest_utility_output.split('\n')
@@ -848,3 +893,214 @@ class ControlUtility(BaseUtility):
         for line in output.split('\n'):
             log_print(line)
 
+
+class ControlUtilityCommandsCache:
+    """
+    Parsed control.sh commands (`control.sh --help`) by Ignite artifact checksum and version.
+
+    Commands are shared by all utilities of the process and kept in `<var_dir>/control_utility_commands.yaml`
+    for other test modules, shard workers and next runs. File is read on first use. Catalog of failed help
+    (no commands or no version found) is not cached, so help is asked again.
+    """
+
+    file_name = 'control_utility_commands.yaml'
+    # commands by cache file path
+    catalogs = {}
+    hash_caches = {}
+    lock = Lock()
+
+    @classmethod
+    def get_path(cls, var_dir):
+        return join(var_dir, cls.file_name) if var_dir else None
+
+    @classmethod
+    def get_checksum(cls, var_dir, artifact_path):
+        """
+        :return: sha256 of artifact, reused while artifact file is not changed (`HashCache` of artifacts)
+        """
+        from ..artifacts import TIDEN_HASH_CACHE
+        from ..hashcache import HashCache
+
+        with cls.lock:
+            if var_dir not in cls.hash_caches:
+                cls.hash_caches[var_dir] = HashCache(join(var_dir, TIDEN_HASH_CACHE) if var_dir else None)
+            return cls.hash_caches[var_dir].get(artifact_path)
+
+    @classmethod
+    def _load(cls, var_dir):
+        path = cls.get_path(var_dir)
+        if path not in cls.catalogs:
+            cls.catalogs[path] = (load_yaml(path) or {}) if path else {}
+        return cls.catalogs[path]
+
+    @staticmethod
+    def is_valid(catalog):
+        return bool(catalog and catalog.get('commands') and catalog.get('ignite_version'))
+
+    @classmethod
+    def get(cls, var_dir, key):
+        """
+        :return: dictionary with 'commands', 'ssl_keys' and 'ignite_version' keys or None if not cached
+        """
+        if key is None:
+            return None
+        with cls.lock:
+            catalog = cls._load(var_dir).get(key)
+        return catalog if cls.is_valid(catalog) else None
+
+    @classmethod
+    def put(cls, var_dir, key, catalog):
+        import yaml
+
+        if key is None or not cls.is_valid(catalog):
+            return
+        with cls.lock:
+            catalogs = cls._load(var_dir)
+            catalogs[key] = deepcopy(catalog)
+            path = cls.get_path(var_dir)
+            if path is None:
+                return
+            # other processes could add their commands
+            for stored_key, stored_catalog in (load_yaml(path) or {}).items():
+                catalogs.setdefault(stored_key, stored_catalog)
+            tmp_path = f'{path}.{getpid()}.tmp'
+            with open(tmp_path, 'w') as cache_file:
+                yaml.dump(catalogs, cache_file)
+            replace(tmp_path, path)
+
+
+class ControlUtilitySession:
+    """
+    Queue of control.sh commands run one by one by a single remote script.
+
+    Output of every command is streamed back by the same remote call, framed by marker lines with session token and
+    command exit status. Output lines are prefixed by `line_prefix`, so blank lines are not dropped by the stream
+    and can't be taken for markers. Log files are numbered locally (`ControlUtility.get_log_path`), so the test
+    directory is not listed. Every command still starts its own control.sh JVM.
+    """
+
+    frame_marker = 'TIDEN_CU_FRAME'
+    line_prefix = '|'
+
+    def __init__(self, utility, client_host, server_host, server_port, ssh_options=None):
+        """
+        :param utility: ControlUtility
+        :param client_host: host to run control.sh on
+        :param server_host: server node host
+        :param server_port: server node binary rest port
+        :param ssh_options: options of ssh `exec`, e.g. `timeout`
+        """
+        self.utility = utility
+        self.client_host = client_host
+        self.server_host = server_host
+        self.server_port = server_port
+        self.ssh_options = ssh_options if ssh_options else {}
+        self.token = str(uuid4())[:8]
+        self.commands = []
+        self.results = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None and self.results is None and self.commands:
+            self.run()
+
+    def add(self, *args, **kwargs):
+        """
+        Queue control.sh command
+        :param args: control.sh arguments
+        :param kwargs: `log`, `output_limit`, `show_output`, `all_required`, `strict`, ... options of
+            `ControlUtility.control_utility`
+        :return: index of command result
+        """
+        args = list(args)
+        self.commands.append({
+            'args': args,
+            'log': self.utility.get_log_path(args, **kwargs),
+            'options': kwargs,
+        })
+        return len(self.commands) - 1
+
+    def get_script(self):
+        lines = [f'cd {self.utility.ignite.client_ignite_home}']
+        for idx, command in enumerate(self.commands):
+            control_command = self.utility.get_control_command(self.server_host, self.server_port, command['args'])
+            lines.append(f'echo "{self.frame_marker} {self.token} {idx} begin"')
+            if command['log']:
+                limit = ''
+                if command['options'].get('output_limit'):
+                    limit = f' | tail -n {command["options"]["output_limit"]}'
+                lines.append(f'{control_command} > {command["log"]} 2>&1; rc=$?; cat {command["log"]}{limit}')
+            else:
+                lines.append(f'{control_command} 2>&1; rc=$?')
+            lines.append(f'printf "\\n{self.frame_marker} {self.token} {idx} end %s\\n" $rc')
+        # prefix all lines except markers
+        return '{\n%s\n} 2>&1 | sed \'/^%s %s /!s/^/%s/\'' % (
+            '\n'.join(lines), self.frame_marker, self.token, self.line_prefix
+        )
+
+    def parse_output(self, lines):
+        """
+        Split script output by frames as lines arrive
+        :param lines: iterable of script output lines
+        :return: generator of (<command index>, <output>, <exit code or None if command was not completed>)
+        """
+        frame_pattern = r'^%s %s (\d+) (begin|end)(?: (\d+))?$' % (self.frame_marker, self.token)
+        idx, frame_lines = None, []
+        for line in lines:
+            m = search(frame_pattern, line.rstrip('\n'))
+            if not m:
+                if idx is not None and line.startswith(self.line_prefix):
+                    frame_lines.append(line[len(self.line_prefix):])
+                continue
+            if m.group(2) == 'begin':
+                idx, frame_lines = int(m.group(1)), []
+            elif idx is not None:
+                # newline printed before end marker is not the part of output
+                yield idx, ''.join(frame_lines)[:-1], int(m.group(3)) if m.group(3) else None
+                idx = None
+        if idx is not None:
+            yield idx, ''.join(frame_lines), None
+
+    def run(self):
+        """
+        Run queued commands, the last one becomes the latest command of utility
+        :return: list of dictionaries:
+           'args': control.sh arguments
+           'log': log file path or None
+           'output': command output
+           'exit_code': control.sh exit code, None if command was not completed
+        """
+        script = self.get_script()
+        self.utility.ignite.logger.debug(script)
+        lines = self.utility.ssh.exec_on_host_stream(self.client_host, script, **self.ssh_options)
+
+        outputs = {}
+        for idx, output, exit_code in self.parse_output(lines):
+            outputs[idx] = (output, exit_code)
+            command = self.commands[idx]
+            if command['options'].get('show_output', True):
+                log_print(f"Control utility {' '.join(command['args'])}")
+                for line in output.rstrip('\n').split('\n'):
+                    log_print(line)
+
+        self.results = []
+        for idx, command in enumerate(self.commands):
+            output, exit_code = outputs.get(idx, ('', None))
+            self.results.append({
+                'args': command['args'],
+                'log': command['log'],
+                'output': output,
+                'exit_code': exit_code,
+            })
+
+        if self.results:
+            self.utility.latest_command = self.results[-1]['args']
+            self.utility.latest_utility_output = self.results[-1]['output']
+            self.utility.latest_exit_code = self.results[-1]['exit_code']
+            self.utility.latest_utility_host = self.client_host
+
+        for command, result in zip(self.commands, self.results):
+            self.utility.check_utility_output(result['output'], **command['options'])
+        return self.results
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from array import array
+from re import compile
+
+
+class IdleVerifyDump:
+    """
+    Partitions of `control.sh --cache idle_verify --dump` file in columnar form.
+
+    Dump is parsed line by line (`parse`) into arrays: one row per partition (grpId, partId, grpName) and one row
+    per partition instance (consistentId, isPrimary, updateCntr, size, partHash). Instances of partition are
+    stored in consecutive rows, so queries over partitions scan array slices instead of nested dictionaries.
+    Strings are stored once (`strings`), rows keep their indexes.
+    """
+
+    # instance of the usual format, parsed without intermediate dictionary
+    re_instance = compile(r'([^\[\],]+)\[isPrimary=(true|false), consistentId=([^,\[\]]*), '
+                          r'updateCntr=(-?\d+), size=(-?\d+), partHash=(-?\d+)\]')
+
+    def __init__(self):
+        self.strings = []
+        self.string_ids = {}
+
+        # partitions
+        self.grp_id = array('q')
+        self.part_id = array('q')
+        self.grp_name = array('l')
+        self.partition_name = array('l')
+        # first instance row of partition, instances of partition `i` are rows `first_instance[i]:first_instance[i+1]`
+        self.first_instance = array('l', [0])
+
+        # partition instances
+        self.partition = array('l')
+        self.consistent_id = array('l')
+        self.is_primary = array('b')
+        self.update_cntr = array('q')
+        self.size = array('q')
+        self.part_hash = array('q')
+        self.instance_name = array('l')
+
+        # not numeric values and unknown attributes by ('partition' or 'instance', row)
+        self.extra = {}
+        self.pending_partition = None
+
+    def __len__(self):
+        return len(self.grp_id)
+
+    def get_string_id(self, value):
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            string_id = self.string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    @staticmethod
+    def _parse_attributes(attributes):
+        """
+        :return: dictionary of 'key=value, key=value' string
+        """
+        try:
+            return dict([pair.split('=', 1) for pair in attributes.split(', ')])
+        except ValueError:
+            # not 'key=value' pair
+            return dict([pair.strip().partition('=')[::2] for pair in attributes.split(',')])
+
+    def parse(self, lines):
+        """
+        Add partitions of dump lines
+        :param lines: iterable of dump file lines, e.g. streamed output of `cat`
+        :return: self
+        """
+        for line in lines:
+            if line.startswith('Partition:'):
+                self.pending_partition = line
+            elif line.startswith('Partition instances:') and self.pending_partition is not None:
+                self._add_partition(self.pending_partition, line)
+                self.pending_partition = None
+        return self
+
+    def _add_partition(self, partition_line, instances_line):
+        start, end = partition_line.find('['), partition_line.find(']')
+        if start < 0 or end < start:
+            return
+        row = len(self.grp_id)
+        extra = self._parse_attributes(partition_line[start + 1:end])
+        self.grp_id.append(self._pop_int(extra, 'grpId'))
+        self.part_id.append(self._pop_int(extra, 'partId'))
+        self.grp_name.append(self.get_string_id(extra.pop('grpName', '')))
+        self.partition_name.append(self.get_string_id(partition_line[len('Partition:'):start]))
+        if extra:
+            self.extra[('partition', row)] = extra
+
+        body = instances_line[instances_line.index('[') + 1:instances_line.rindex(']')]
+        instances = self.re_instance.findall(body)
+        if len(instances) == body.count('['):
+            for name, is_primary, consistent_id, update_cntr, size, part_hash in instances:
+                self.partition.append(row)
+                self.consistent_id.append(self.get_string_id(consistent_id))
+                self.is_primary.append(is_primary == 'true')
+                self.update_cntr.append(int(update_cntr))
+                self.size.append(int(size))
+                self.part_hash.append(int(part_hash))
+                self.instance_name.append(self.get_string_id(name.strip()))
+            self.first_instance.append(len(self.partition))
+            return
+
+        for record in body.split('],'):
+            start = record.find('[')
+            if start < 0:
+                continue
+            instance_row = len(self.partition)
+            extra = self._parse_attributes(record[start + 1:].rstrip().rstrip(']'))
+            self.partition.append(row)
+            self.consistent_id.append(self.get_string_id(extra.pop('consistentId', '')))
+            self.is_primary.append(extra.pop('isPrimary', 'false') == 'true')
+            self.update_cntr.append(self._pop_int(extra, 'updateCntr'))
+            self.size.append(self._pop_int(extra, 'size'))
+            self.part_hash.append(self._pop_int(extra, 'partHash'))
+            self.instance_name.append(self.get_string_id(record[:start].strip()))
+            if extra:
+                self.extra[('instance', instance_row)] = extra
+        self.first_instance.append(len(self.partition))
+
+    @staticmethod
+    def _pop_int(attributes, key):
+        """
+        :return: integer attribute, not integer value is kept in attributes
+        """
+        value = attributes.get(key)
+        if value is None:
+            return 0
+        try:
+            value = int(value)
+        except ValueError:
+            return 0
+        del attributes[key]
+        return value
+
+    def get_key(self, row):
+        """
+        :return: (grpId, partId) of partition
+        """
+        return self.grp_id[row], self.part_id[row]
+
+    def get_instances(self, row):
+        return range(self.first_instance[row], self.first_instance[row + 1])
+
+    def inconsistent_partitions(self, columns=('part_hash', 'update_cntr')):
+        """
+        :param columns: instance columns to compare, partition hash and update counter by default
+        :return: list of (grpId, partId) which instances differ in any of columns
+        """
+        inconsistent = []
+        columns = [getattr(self, column) for column in columns]
+        for row in range(len(self)):
+            start, end = self.first_instance[row], self.first_instance[row + 1]
+            if end - start < 2:
+                continue
+            for values in columns:
+                if min(values[start:end]) != max(values[start:end]):
+                    inconsistent.append(self.get_key(row))
+                    break
+        return inconsistent
+
+    def counter_skew(self, min_skew=1):
+        """
+        :param min_skew: minimal difference of update counters
+        :return: dictionary (grpId, partId): max - min update counter of partition instances
+        """
+        skew = {}
+        for row in range(len(self)):
+            start, end = self.first_instance[row], self.first_instance[row + 1]
+            if start == end:
+                continue
+            values = self.update_cntr[start:end]
+            partition_skew = max(values) - min(values)
+            if partition_skew >= min_skew:
+                skew[self.get_key(row)] = partition_skew
+        return skew
+
+    def get_instance_rows(self):
+        """
+        :return: dictionary (grpId, partId, consistentId): instance row
+        """
+        return dict([
+            ((self.grp_id[self.partition[row]], self.part_id[self.partition[row]],
+              self.strings[self.consistent_id[row]]), row)
+            for row in range(len(self.partition))
+        ])
+
+    def diff(self, other, columns=('update_cntr', 'size', 'part_hash')):
+        """
+        Compare partition instances with the dump taken later
+        :param other: IdleVerifyDump
+        :param columns: instance columns to compare
+        :return: dictionary:
+           'added': list of (grpId, partId, consistentId) of instances found only in other dump
+           'removed': list of (grpId, partId, consistentId) of instances not found in other dump
+           'changed': dictionary (grpId, partId, consistentId): {<column>: (<value>, <other value>)}
+        """
+        rows = self.get_instance_rows()
+        other_rows = other.get_instance_rows()
+        changed = {}
+        for key, row in rows.items():
+            other_row = other_rows.get(key)
+            if other_row is None:
+                continue
+            changes = {}
+            for column in columns:
+                value, other_value = getattr(self, column)[row], getattr(other, column)[other_row]
+                if value != other_value:
+                    changes[column] = (value, other_value)
+            if changes:
+                changed[key] = changes
+        return {
+            'added': [key for key in other_rows.keys() if key not in rows],
+            'removed': [key for key in rows.keys() if key not in other_rows],
+            'changed': changed,
+        }
+
+    def to_items(self):
+        """
+        :return: partitions as the list of dictionaries of strings (see `ControlUtility.get_parsed_dump_items`)
+        """
+        items = []
+        for row in range(len(self)):
+            info = {
+                'name': self.strings[self.partition_name[row]],
+                'grpId': str(self.grp_id[row]),
+                'grpName': self.strings[self.grp_name[row]],
+                'partId': str(self.part_id[row]),
+            }
+            info.update(self.extra.get(('partition', row), {}))
+            instances = []
+            for instance_row in self.get_instances(row):
+                instance = {
+                    'name': self.strings[self.instance_name[instance_row]],
+                    'isPrimary': 'true' if self.is_primary[instance_row] else 'false',
+                    'consistentId': self.strings[self.consistent_id[instance_row]],
+                    'updateCntr': str(self.update_cntr[instance_row]),
+                    'size': str(self.size[instance_row]),
+                    'partHash': str(self.part_hash[instance_row]),
+                }
+                instance.update(self.extra.get(('instance', instance_row), {}))
+                instances.append(instance)
+            items.append({'info': info, 'instances': instances})
+        return items
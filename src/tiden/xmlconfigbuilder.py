@@ -14,8 +14,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from jinja2 import Environment, FileSystemLoader
-
 from .util import get_host_list
 
 
@@ -92,6 +90,8 @@ class XMLConfigBuilder:
         self.kwargs = kwargs
 
     def build(self):
+        from jinja2 import Environment, FileSystemLoader
+
         if isinstance(self.config_templates, dict):
             for template, config in self.config_templates.items():
                 rendered_string = Environment(loader=FileSystemLoader(self.templates_dir),
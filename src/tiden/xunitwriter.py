@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from os import remove, replace
+from os.path import exists
+from xml.sax.saxutils import quoteattr
+import xml.etree.ElementTree as ET
+
+
+class XUnitWriter:
+    """
+    Streaming xUnit report writer.
+
+    Every `<testcase>` is written as a single line to the journal (`<report>.journal`, append only) and to
+    the report in place of its closing `</testsuite>` tag, so the report stays valid after every test without
+    rewriting it. `<testsuite>` start tag is padded to `header_size` bytes and its counters are patched in place.
+    Journal is removed by `close`. Journal left by the run which was not closed (e.g. killed) is used to restore
+    its report (`recover`) before the report is recreated, the restored report is kept at `<report>.recovered`.
+    """
+
+    declaration = b"<?xml version='1.0' encoding='us-ascii'?>\n"
+    closing_tag = b'</testsuite>\n'
+    journal_suffix = '.journal'
+    recovered_suffix = '.recovered'
+    # bytes reserved for '<testsuite>' start tag
+    header_size = 256
+
+    def __init__(self, path, attributes):
+        """
+        Create empty report and journal, report of the previous run which was not closed is restored first
+        :param path: report path
+        :param attributes: '<testsuite>' attributes
+        """
+        self.path = path
+        self.journal_path = path + self.journal_suffix
+        self.attributes = dict(attributes)
+        self.end = 0
+        # path of restored report of the previous run or None
+        self.recovered_path = None
+        if exists(self.journal_path) and self.recover(path, name=self.attributes.get('name', 'tiden')) is not None:
+            self.recovered_path = path + self.recovered_suffix
+            replace(path, self.recovered_path)
+        open(self.journal_path, 'wb').close()
+        self._write_report([])
+
+    def add_testcase(self, testcase):
+        """
+        Append '<testcase>' to journal and report
+        :param testcase: testcase element
+        """
+        line = ET.tostring(testcase, encoding='us-ascii') + b'\n'
+        with open(self.journal_path, 'ab') as journal:
+            journal.write(line)
+        with open(self.path, 'r+b') as report:
+            report.seek(self.end)
+            report.write(line + self.closing_tag)
+            report.truncate()
+        self.end += len(line)
+
+    def close(self):
+        """
+        Drop journal, report is complete
+        """
+        if exists(self.journal_path):
+            remove(self.journal_path)
+
+    def update_counters(self, **attributes):
+        """
+        Patch '<testsuite>' attributes in place
+        """
+        self.attributes.update(attributes)
+        start_tag = self._get_start_tag()
+        if len(start_tag) > self.header_size:
+            # no room for attributes, the only case report is rewritten
+            self._write_report(self.read_journal(self.journal_path))
+            return
+        with open(self.path, 'r+b') as report:
+            report.seek(len(self.declaration))
+            report.write(start_tag)
+
+    def _get_start_tag(self):
+        start_tag = ('<testsuite %s' % ' '.join([
+            '%s=%s' % (name, quoteattr(str(value))) for name, value in self.attributes.items()
+        ])).encode('ascii', 'xmlcharrefreplace')
+        return start_tag + b' ' * max(self.header_size - len(start_tag) - 2, 0) + b'>\n'
+
+    def _write_report(self, lines):
+        start_tag = self._get_start_tag()
+        if len(start_tag) > self.header_size:
+            self.header_size = len(start_tag) * 2
+            start_tag = self._get_start_tag()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as report:
+            report.write(self.declaration)
+            report.write(start_tag)
+            for line in lines:
+                report.write(line)
+            self.end = report.tell()
+            report.write(self.closing_tag)
+        replace(tmp_path, self.path)
+
+    @staticmethod
+    def read_journal(journal_path):
+        """
+        :return: complete '<testcase>' lines of journal, line cut by crash is skipped
+        """
+        lines = []
+        if not exists(journal_path):
+            return lines
+        with open(journal_path, 'rb') as journal:
+            for line in journal:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    ET.fromstring(line)
+                except ET.ParseError:
+                    continue
+                lines.append(line)
+        return lines
+
+    @classmethod
+    def recover(cls, path, name='tiden'):
+        """
+        Restore report from journal, e.g. after the run was killed while report was written
+        :param path: report path
+        :param name: test suite name
+        :return: number of recovered test cases or None if report is valid or there is no journal
+        """
+        try:
+            ET.parse(path)
+            return None
+        except (ET.ParseError, OSError):
+            pass
+        if not exists(path + cls.journal_suffix):
+            return None
+
+        lines = cls.read_journal(path + cls.journal_suffix)
+        testcases = [ET.fromstring(line) for line in lines]
+        writer = cls.__new__(cls)
+        writer.path = path
+        writer.journal_path = path + cls.journal_suffix
+        writer.attributes = {
+            'name': name,
+            'tests': str(len(testcases)),
+            'errors': str(len([testcase for testcase in testcases if testcase.find('error') is not None])),
+            'failures': str(len([testcase for testcase in testcases if testcase.find('failure') is not None])),
+            'skipped': str(len([testcase for testcase in testcases if testcase.find('skipped') is not None])),
+            'time': str(sum([int(float(testcase.get('time', 0))) for testcase in testcases])),
+        }
+        writer._write_report(lines)
+        return len(testcases)
@@ -19,7 +19,6 @@ from .tidenexception import TidenException
 
 import time
 from datetime import datetime
-from requests import post
 from json import dumps, loads
 
 
@@ -203,6 +202,8 @@ class ZabbixApi():
         :param params: ZabbixAPI method arguments.
 
         """
+        from requests import post
+
         request_json = {
             'jsonrpc': '2.0',
             'method': method,
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+ansiblepool = pytest.importorskip('tiden.ansiblepool')
+
+
+def test_ansible_pool_exec_on_host_stream():
+    executed = []
+
+    class MockAnsiblePool(ansiblepool.AnsiblePool):
+        def __init__(self):
+            # no ansible inventory and no SSH clients
+            self.config = {}
+            self.hosts = ['host1']
+
+        def exec_on_host(self, host, commands):
+            executed.append((host, commands))
+            return {host: ['line 1\nline 2\nline 3\n']}
+
+    pool = MockAnsiblePool()
+    assert not pool.supports_streaming
+    assert list(pool.exec_on_host_stream('host1', 'cat log', timeout=10)) == ['line 1\n', 'line 2\n', 'line 3\n']
+    assert list(pool.exec_on_host_stream('host1', 'cat log', until=lambda line: line == 'line 2\n')) == \
+        ['line 1\n', 'line 2\n']
+    assert executed == [('host1', ['cat log'])] * 2
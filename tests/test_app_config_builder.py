@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from os.path import basename
+
+from tiden.apps.appconfigbuilder import AppConfigBuilder
+
+
+class MockApp:
+    __name__ = 'MockApp'
+
+    @staticmethod
+    def get_config_types():
+        return {
+            'server': 'server.tmpl.xml',
+            'client': 'client.tmpl.xml',
+        }
+
+
+class MockSsh:
+
+    def __init__(self):
+        self.uploaded = []
+
+    def upload(self, files, remote_dir):
+        self.uploaded.append(sorted([basename(file) for file in files]))
+
+
+def test_build_config_and_deploy(tmpdir):
+    resource_dir = tmpdir.mkdir('res')
+    resource_dir.join('server.tmpl.xml').write('<server port="{{ port }}" host="{{ environment.host }}"/>\n'
+                                               '{% include "common.xml" %}')
+    resource_dir.join('client.tmpl.xml').write('<client/>')
+    resource_dir.join('common.xml').write('<common consistent_id="{{ consistent_id }}"/>')
+    ssh = MockSsh()
+    config = {
+        'environment': {'host': 'host1'},
+        'rt': {
+            'test_resource_dir': str(resource_dir),
+            'remote': {'test_module_dir': '/remote'},
+        },
+    }
+    builder = AppConfigBuilder(ssh, config, MockApp)
+    builder.register_config_set('base')
+    builder.add_template_variables('base', port=47500, unused='a')
+
+    _, names = AppConfigBuilder.get_template_variable_names(str(resource_dir), 'server.tmpl.xml')
+    assert names == {'port', 'environment', 'consistent_id'}
+
+    builder.build_config_and_deploy(config_set_name='base')
+    server_config = resource_dir.join(builder.get_config('server', 'base'))
+    assert server_config.read() == '<server port="47500" host="host1"/>\n<common consistent_id=""/>'
+    assert ssh.uploaded == [['client.tmpl.xml', 'client_base.xml', 'common.xml', 'server.tmpl.xml',
+                             'server_base.xml']]
+
+    # unused variables do not cause render and nothing is uploaded when nothing is changed
+    server_config_mtime = server_config.stat().mtime
+    builder.add_template_variables('base', unused='b')
+    builder.build_config_and_deploy(config_set_name='base')
+    assert server_config.stat().mtime == server_config_mtime
+    assert ssh.uploaded[1:] == []
+
+    # per-node configs are rendered with node variables, only new configs are uploaded
+    for node_id in [1, 2]:
+        builder.add_template_variables('base', node_id=node_id, consistent_id='node_%s' % node_id)
+        builder.build_config_and_deploy(config_set_name='base', config_type='server', node_id=node_id)
+        assert ssh.uploaded[-1] == ['server_base_%s.xml' % node_id]
+    assert resource_dir.join('server_base_2.xml').read().endswith('<common consistent_id="node_2"/>')
+
+    # change of included template is deployed
+    resource_dir.join('common.xml').write('<common id="{{ consistent_id }}"/>')
+    builder.build_config_and_deploy(config_set_name='base', config_type='server', node_id=2)
+    assert ssh.uploaded[-1] == ['common.xml', 'server_base_2.xml']
+    assert resource_dir.join('server_base_2.xml').read().endswith('<common id="node_2"/>')
+
+    # touched file with the same content is not uploaded again
+    uploaded_num = len(ssh.uploaded)
+    resource_dir.join('client.tmpl.xml').setmtime(resource_dir.join('client.tmpl.xml').mtime() + 10)
+    builder.build_config_and_deploy(config_set_name='base', config_type='server', node_id=2)
+    assert len(ssh.uploaded) == uploaded_num
+
+    # all files are deployed to the other remote directory
+    config['rt']['remote']['test_module_dir'] = '/remote/other_module'
+    builder.build_config_and_deploy(config_set_name='base', config_type='server', node_id=2)
+    assert 'client.tmpl.xml' in ssh.uploaded[-1]
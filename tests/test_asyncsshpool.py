@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+from collections import namedtuple
+
+import pytest
+
+pytest.importorskip('asyncssh')
+
+from tiden.asyncsshpool import AsyncSshPool
+
+CompletedProcess = namedtuple('CompletedProcess', ['stdout', 'stderr', 'exit_status'])
+
+
+class MockConnection:
+    """
+    Stand-in for asyncssh connection, command output is a command itself.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.active_channels = 0
+        self.max_active_channels = 0
+
+    async def run(self, command, check=False, timeout=None):
+        self.active_channels += 1
+        self.max_active_channels = max(self.max_active_channels, self.active_channels)
+        await asyncio.sleep(self.latency)
+        self.active_channels -= 1
+        return CompletedProcess(command.replace(' 2>&1', '') + '\n', '', 0)
+
+    def create_process(self, command):
+        return MockProcess(command)
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+class MockProcess:
+    """
+    Stand-in for asyncssh process, `seq N` command produces N lines in small chunks.
+    """
+
+    class Stdout:
+        def __init__(self, data):
+            self.data = data
+
+        async def read(self, size):
+            chunk, self.data = self.data[:7], self.data[7:]
+            return chunk
+
+    def __init__(self, command):
+        count = int(command.split()[1])
+        self.stdout = MockProcess.Stdout(''.join(['%d\n' % i for i in range(1, count + 1)]))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def _create_pool(hosts, latency=0.0, **kwargs):
+    config = {
+        'username': '',
+        'home': '',
+        'threads_num': 1,
+        'default_timeout': 10,
+        'hosts': hosts,
+    }
+    config.update(kwargs)
+    pool = AsyncSshPool(config)
+    pool.connections = {host: MockConnection(latency) for host in hosts}
+    return pool
+
+
+def test_async_ssh_pool_exec_many_hosts_single_thread():
+    hosts = ['10.0.%d.%d' % (i // 250, i % 250 + 1) for i in range(200)]
+    pool = _create_pool(hosts, latency=0.01)
+    try:
+        threads_before = threading.active_count()
+        results = pool.exec(['echo 1', 'echo 2'])
+        assert threading.active_count() == threads_before + 1
+        assert sorted(results.keys()) == sorted(hosts)
+        for host in hosts:
+            assert results[host] == ['echo 1\n', 'echo 2\n']
+    finally:
+        pool.close()
+
+
+@pytest.mark.parametrize('parallel,channels_per_host,expected_channels', [
+    (False, 3, 1),
+    (True, 3, 3),
+])
+def test_async_ssh_pool_exec_on_host_channels(parallel, channels_per_host, expected_channels):
+    host = '10.0.0.1'
+    pool = _create_pool([host], latency=0.01, channels_per_host=channels_per_host)
+    try:
+        commands = ['echo %d' % i for i in range(10)]
+        results = pool.exec_on_host(host, commands, parallel=parallel)
+        assert results[host] == ['%s\n' % command for command in commands]
+        assert pool.connections[host].max_active_channels == expected_channels
+    finally:
+        pool.close()
+
+
+def test_async_ssh_pool_awaitable_exec():
+    hosts = ['10.0.0.1', '10.0.0.2']
+    pool = _create_pool(hosts)
+
+    async def _exec_both():
+        return await asyncio.gather(
+            pool.exec_async({hosts[0]: ['echo 1']}),
+            pool.exec_on_host_async(hosts[1], ['echo 2']),
+        )
+
+    try:
+        first, second = pool.run_async(_exec_both())
+        assert first == {hosts[0]: ['echo 1\n']}
+        assert second == {hosts[1]: ['echo 2\n']}
+        # jps and other helpers of SshPool work through the event loop too
+        assert pool.jps() == []
+    finally:
+        pool.close()
+
+
+def test_async_ssh_pool_streaming():
+    hosts = ['10.0.0.1', '10.0.0.2']
+    pool = _create_pool(hosts)
+    found = {}
+
+    def _on_line(host, command_idx, line):
+        found.setdefault((host, command_idx), []).append(line)
+        return int(line) >= 3
+
+    try:
+        lines = list(pool.exec_on_host_stream(hosts[0], 'seq 100'))
+        assert lines == ['%d\n' % i for i in range(1, 101)]
+
+        lines = list(pool.exec_on_host_stream(hosts[0], 'seq 100', until=lambda line: line == '5\n'))
+        assert lines == ['%d\n' % i for i in range(1, 6)]
+
+        pool.exec_stream(['seq 2', 'seq 10'], _on_line)
+        for host in hosts:
+            assert found[(host, 0)] == ['1\n', '2\n']
+            assert found[(host, 1)] == ['1\n', '2\n', '3\n']
+    finally:
+        pool.close()
+
+
+@pytest.mark.filterwarnings('error::pytest.PytestUnraisableExceptionWarning')
+def test_async_ssh_pool_streaming_cancellation():
+    pool = _create_pool(['10.0.0.1'])
+
+    async def _get_tasks():
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    try:
+        # producer blocked by the full queue is stopped when consumer has gone
+        for _ in range(20):
+            lines = pool.exec_on_host_stream('10.0.0.1', 'seq 1000')
+            assert next(lines) == '1\n'
+            lines.close()
+            assert pool.run_async(_get_tasks()) == []
+
+        # stream abandoned until the pool is closed is drained by close
+        lines = pool.exec_on_host_stream('10.0.0.1', 'seq 1000')
+        assert next(lines) == '1\n'
+        assert len(pool.run_async(_get_tasks())) == 1
+    finally:
+        pool.close()
+    lines.close()
@@ -18,7 +18,8 @@ import pytest
 from pprint import PrettyPrinter
 import os.path
 
-from tiden.utilities.control_utility import ControlUtility
+from tiden.tidenexception import TidenException
+from tiden.utilities.control_utility import ControlUtility, ControlUtilitySession
 
 help_activate_deactivate_only = {
     'activate': 'activate',
@@ -305,3 +306,181 @@ def test_parse_help(data):
 
         for command, use_force in data['commands'].items():
             assert use_force == commands[command]['force'], f"Force {command} argument matches"
+
+
+class MockSsh:
+    """
+    Runs commands locally by bash
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def exec(self, commands, **kwargs):
+        from subprocess import run, PIPE, STDOUT
+
+        self.calls.append(commands)
+        return dict([
+            (host, [run(['bash', '-c', command], stdout=PIPE, stderr=STDOUT).stdout.decode('utf-8')
+                    for command in host_commands])
+            for host, host_commands in commands.items()
+        ])
+
+    def exec_on_host_stream(self, host, command, **kwargs):
+        from subprocess import Popen, PIPE, STDOUT
+
+        self.calls.append({host: [command]})
+        with Popen(['bash', '-c', command], stdout=PIPE, stderr=STDOUT, universal_newlines=True) as process:
+            for line in process.stdout:
+                # blank lines are skipped as by SshPool
+                if line.strip() != '':
+                    yield line
+
+
+def _get_mock_ignite(tmpdir):
+    from tiden.logger import get_logger
+
+    ignite_home = tmpdir.mkdir('ignite')
+    control_sh = ignite_home.mkdir('bin').join('control.sh')
+    control_sh.write('#!/bin/bash\n'
+                     'echo "Control utility [ver. 2.9.0#20200101-sha1:00000000]"\n'
+                     'echo "args: $@"\n'
+                     'echo\n'
+                     'if [[ "$*" == *--fail* ]]; then echo "Error: failed" >&2; exit 3; fi\n'
+                     'printf "last line without newline"\n')
+    control_sh.chmod(0o755)
+
+    class MockIgnite:
+        name = 'ignite'
+        grid_name = '1'
+        client_ignite_home = str(ignite_home)
+        config = {'rt': {'remote': {'test_dir': str(tmpdir.mkdir('test_dir'))}}}
+        nodes = {1: {'host': 'host1', 'binary_rest_port': 11211}}
+        logger = get_logger('tiden')
+        ssh = MockSsh()
+
+        def get_and_inc_client_host(self):
+            return 'host1'
+
+        def get_alive_default_nodes(self):
+            return [1]
+
+        def get_alive_additional_nodes(self):
+            return []
+
+    return MockIgnite()
+
+
+def test_control_utility_session(tmpdir):
+    ignite = _get_mock_ignite(tmpdir)
+    cu = ControlUtility(ignite)
+
+    with cu.session() as session:
+        assert session.add('--baseline') == 0
+        session.add('--cache', 'idle_verify', '--fail', log=False)
+        session.add('--baseline', 'version 1', output_limit=1)
+    # all commands are run by a single remote call
+    assert len(ignite.ssh.calls) == 1
+    assert [result['exit_code'] for result in session.results] == [0, 3, 0]
+    assert session.results[0]['output'] == 'Control utility [ver. 2.9.0#20200101-sha1:00000000]\n' \
+                                           'args: --host host1 --port 11211 --baseline\n' \
+                                           '\n' \
+                                           'last line without newline'
+    assert session.results[1]['output'].endswith('Error: failed\n')
+    assert session.results[2]['output'] == 'last line without newline'
+
+    # log files are numbered locally
+    test_dir = ignite.config['rt']['remote']['test_dir']
+    assert [result['log'] for result in session.results] == [
+        f'{test_dir}/control.1.baseline.1.log', None, f'{test_dir}/control.1.baseline.2.log'
+    ]
+    assert cu.latest_exit_code == 0
+    assert cu.latest_utility_output == 'last line without newline'
+
+    cu.control_utility('--baseline', all_required=['args: .* --baseline'])
+    assert len(ignite.ssh.calls) == 2
+    assert cu.latest_command == ['--baseline']
+    assert open(f'{test_dir}/control.1.baseline.3.log').read().startswith('Control utility')
+
+    with pytest.raises(TidenException):
+        cu.control_utility('--fail', strict=True)
+
+
+def test_control_utility_session_parse_output():
+    session = ControlUtilitySession(None, 'host1', 'host1', 11211)
+    marker = f'{session.frame_marker} {session.token}'
+    outputs = session.parse_output(iter([
+        f'{marker} 0 begin\n', '|line\n', '|\n', f'{marker} 0 end 1\n',
+        f'{marker} 1 begin\n', '|\n', 'not a command output\n', f'{marker} 1 end 0\n',
+        f'{marker} 2 begin\n', '|interrupted\n',
+    ]))
+    assert list(outputs) == [(0, 'line\n', 1), (1, '', 0), (2, 'interrupted\n', None)]
+
+
+def test_commands_cache(tmpdir, monkeypatch):
+    from tiden.utilities.control_utility import ControlUtilityCommandsCache
+
+    monkeypatch.setattr(ControlUtilityCommandsCache, 'catalogs', {})
+    monkeypatch.setattr(ControlUtilityCommandsCache, 'hash_caches', {})
+    help_file_path = os.path.join(os.path.dirname(__file__), 'res', 'control_utility', 'test_parse_help_2.9.0.txt')
+    with open(help_file_path) as help_file:
+        help_text = help_file.read()
+    artifact = tmpdir.join('ignite.zip')
+    artifact.write('ignite 2.9.0')
+
+    class MockHelpSsh:
+        def __init__(self):
+            self.calls = 0
+
+        def exec_on_host(self, host, commands, **kwargs):
+            assert commands == ['cd /ignite_home; bin/control.sh --help']
+            self.calls += 1
+            return {host: [help_text]}
+
+    class MockIgnite:
+        name = 'ignite'
+        artifact_name = 'ignite'
+        config = {
+            'var_dir': str(tmpdir),
+            'artifacts': {'ignite': {'path': str(artifact), 'ignite_version': '2.9.0'}},
+        }
+        nodes = {1: {'host': 'host1', 'ignite_home': '/ignite_home'}}
+        ssh = MockHelpSsh()
+
+        def get_all_default_nodes(self):
+            return [1]
+
+    ignite = MockIgnite()
+    assert ControlUtility(ignite).is_baseline_autoajustment_supported()
+    assert ignite.ssh.calls == 1
+
+    # commands are shared by utilities and test modules
+    cu = ControlUtility(ignite)
+    assert cu.is_baseline_autoajustment_supported()
+    assert cu.get_force_attr('baseline_add') == '--yes'
+    ControlUtilityCommandsCache.catalogs.clear()
+    assert ControlUtility(ignite).get_force_attr('deactivate') == '--yes'
+    assert ignite.ssh.calls == 1
+    assert tmpdir.join(ControlUtilityCommandsCache.file_name).exists()
+
+    # another artifact is asked for help again
+    artifact.write('ignite 2.9.0 rebuilt')
+    assert ControlUtility(ignite).is_baseline_autoajustment_supported()
+    assert ignite.ssh.calls == 2
+
+    # failed help is not cached
+    monkeypatch.setattr(ControlUtility, 'get_ignite_version', lambda self: '2.9.0')
+    full_help_text = help_text
+    artifact.write('ignite 2.9.0 broken')
+    help_without_version = '\n'.join([
+        line for line in full_help_text.split('\n') if 'Control utility [ver.' not in line
+    ])
+    for help_text in ['', help_without_version]:
+        cu = ControlUtility(ignite)
+        cu.is_baseline_autoajustment_supported()
+        assert cu.ignite_version is None
+    assert ignite.ssh.calls == 4
+    help_text = full_help_text
+    assert ControlUtility(ignite).get_force_attr('deactivate') == '--yes'
+    assert ControlUtility(ignite).get_force_attr('deactivate') == '--yes'
+    assert ignite.ssh.calls == 5
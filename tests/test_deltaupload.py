@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from hashlib import md5
+from os import path, urandom
+from subprocess import check_output
+
+from tiden.deltaupload import DeltaUpload
+
+
+def _sh(command):
+    return check_output(command, shell=True).decode('utf-8')
+
+
+def _upload(delta, local_file, remote_file):
+    """
+    Replay delta upload the way `SshPool.upload_on_host` does, with local shell as remote host
+    """
+    part_file = remote_file + '.part'
+    signatures = delta.parse_signatures(_sh(delta.get_signature_command([remote_file])))
+    segments = delta.get_plan(local_file, signatures)
+    copy_commands = delta.get_copy_commands(segments, part_file)
+    if copy_commands:
+        _sh(f"rm -f '{part_file}' && " + ' && '.join(copy_commands))
+    with open(part_file, 'r+b' if copy_commands else 'wb') as remote, open(local_file, 'rb') as local:
+        for segment in segments:
+            if segment[0] == 'send':
+                local.seek(segment[1])
+                remote.seek(segment[1])
+                remote.write(local.read(segment[2]))
+    output = _sh(f"mv -f '{part_file}' '{remote_file}' && rm -f '{part_file}.prev' && "
+                 f"{delta.get_md5_command([remote_file])}")
+    assert delta.parse_md5(output)[0] == delta.get_md5(local_file)
+    return delta.get_sent_bytes(segments)
+
+
+def _write(file_path, *chunks):
+    with open(file_path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def test_delta_upload(tmpdir):
+    delta = DeltaUpload(block_size=64 * 1024)
+    local_file = path.join(str(tmpdir), 'local.zip')
+    remote_file = path.join(str(tmpdir), 'remote.zip')
+    head, jar, tail = urandom(300 * 1024), urandom(50 * 1024), urandom(400 * 1024)
+
+    # new file is sent whole
+    _write(local_file, head, jar, tail)
+    assert _upload(delta, local_file, remote_file) == path.getsize(local_file)
+
+    # unchanged file is not sent
+    assert _upload(delta, local_file, remote_file) == 0
+
+    # changed part of different size is sent and the rest is found shifted
+    _write(local_file, head, urandom(70 * 1024), tail)
+    sent = _upload(delta, local_file, remote_file)
+    assert 70 * 1024 <= sent < 3 * 64 * 1024
+
+    # interrupted upload is resumed from the partial file
+    remote_md5 = md5(open(remote_file, 'rb').read()).hexdigest()
+    _write(local_file, urandom(600 * 1024))
+    with open(local_file, 'rb') as local:
+        _write(remote_file + '.part', local.read(256 * 1024 + 100))
+    sent = _upload(delta, local_file, remote_file)
+    assert sent == 600 * 1024 - 256 * 1024 - 100
+    assert md5(open(remote_file, 'rb').read()).hexdigest() != remote_md5
+    assert not path.exists(remote_file + '.part.prev')
+
+
+def test_delta_upload_md5_command(tmpdir):
+    delta = DeltaUpload()
+    existing = path.join(str(tmpdir), 'existing')
+    _write(existing, b'data')
+    output = _sh(delta.get_md5_command([path.join(str(tmpdir), 'missing'), existing]))
+    assert delta.parse_md5(output) == {1: md5(b'data').hexdigest()}
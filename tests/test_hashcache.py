@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import tiden.hashcache
+from tiden.hashcache import HashCache
+from tiden.util import calculate_sha256
+
+
+def test_hash_cache_reuses_hashes(tmpdir, monkeypatch):
+    files = []
+    for i in range(4):
+        file = tmpdir.join('artifact-%d.zip' % i)
+        file.write('content %d' % i * 1000)
+        files.append(str(file))
+    cache_path = str(tmpdir.join('hash_cache.yaml'))
+
+    cache = HashCache(cache_path)
+    # cold cache: files are hashed in parallel processes
+    assert cache.get_many(files) == {file: calculate_sha256(file) for file in files}
+    cache.save()
+
+    hashed = []
+
+    def _calculate_sha256(file):
+        hashed.append(file)
+        return calculate_sha256(file)
+
+    monkeypatch.setattr(tiden.hashcache, 'calculate_sha256', _calculate_sha256)
+
+    # warm cache survives between runs
+    cache = HashCache(cache_path)
+    assert cache.get_many(files) == {file: calculate_sha256(file) for file in files}
+    assert hashed == []
+
+    # changed file is hashed again
+    tmpdir.join('artifact-0.zip').write('changed')
+    assert cache.get(files[0]) == calculate_sha256(files[0])
+    assert hashed == [files[0]]
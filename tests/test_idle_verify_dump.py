@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from time import time
+
+import pytest
+
+from tiden.apps.ignite.igniteexception import IgniteException
+from tiden.utilities.control_utility import ControlUtility
+from tiden.utilities.idle_verify_dump import IdleVerifyDump
+
+nodes = ['node_1', 'node_2', 'node_3']
+
+
+def _get_dump_lines(partitions_num, counters=None, hashes=None):
+    """
+    :param counters: dictionary (partId, consistentId): update counter
+    :param hashes: dictionary (partId, consistentId): partition hash
+    """
+    counters = counters or {}
+    hashes = hashes or {}
+    lines = ['idle_verify check has finished, found %d partitions\n' % partitions_num, '\n']
+    for part_id in range(partitions_num):
+        lines.append('Partition: PartitionKeyV2 [grpId=-1368047377, grpName=cache_group_1, partId=%d]\n' % part_id)
+        instances = []
+        for node_idx, node in enumerate(nodes):
+            instances.append(
+                'PartitionHashRecordV2 [isPrimary=%s, consistentId=%s, updateCntr=%d, size=%d, partHash=%d]' % (
+                    'true' if node_idx == part_id % len(nodes) else 'false', node,
+                    counters.get((part_id, node), 100 + part_id), 10 + part_id,
+                    hashes.get((part_id, node), -5000 + part_id)))
+        lines.append('Partition instances: [%s]\n' % ', '.join(instances))
+    return lines
+
+
+def _parse_dump_items_legacy(result):
+    lines = result.split("\n")
+    body_lines = [line for line in lines if line.startswith("Partition")]
+    result_list = []
+    structure = {}
+    for line in body_lines:
+        if line.startswith("Partition:"):
+            structure["info"] = {"name": line[line.index(":") + 1:line.index("[")]}
+            for pair in line[line.index("[") + 1:line.index("]")].split(","):
+                key, value = pair.strip().split("=")
+                structure["info"][key] = value
+        elif line.startswith("Partition instances:"):
+            structure["instances"] = []
+            items_line = line[line.index("[") + 1:line.rindex("]")]
+            for partition in items_line.split("],"):
+                instance = {"name": partition[:partition.index("[")].strip()}
+                for pair in partition[partition.index("[") + 1:].split(","):
+                    pair = pair.replace("]", "").strip()
+                    key, value = pair.split("=")
+                    instance[key] = value
+                structure["instances"].append(instance)
+        if len(structure) == 2:
+            result_list.append(structure)
+            structure = {}
+    return result_list
+
+
+def test_parse():
+    lines = _get_dump_lines(1000)
+
+    started = time()
+    dump = IdleVerifyDump().parse(lines)
+    parsed = time() - started
+    started = time()
+    legacy_items = _parse_dump_items_legacy(''.join(lines))
+    legacy_parsed = time() - started
+    print('\nPartitions parsed per sec: columnar %d, dictionaries %d' % (
+        len(lines) / 2 / parsed, len(lines) / 2 / legacy_parsed))
+
+    assert len(dump) == 1000
+    assert len(dump.partition) == 3000
+    assert dump.get_key(5) == (-1368047377, 5)
+    assert [dump.strings[dump.consistent_id[row]] for row in dump.get_instances(5)] == nodes
+    assert dump.to_items() == legacy_items
+
+    # records with other attributes are parsed as well
+    lines = [line.replace(', size=', ', partitionState=OWNING, size=').replace('updateCntr=102,', 'updateCntr=n/a,')
+             for line in _get_dump_lines(5)]
+    dump = IdleVerifyDump().parse(lines)
+    assert dump.to_items() == _parse_dump_items_legacy(''.join(lines))
+    assert dump.update_cntr[dump.first_instance[2]] == 0
+
+
+def test_queries():
+    dump = IdleVerifyDump().parse(_get_dump_lines(100))
+    assert dump.inconsistent_partitions() == []
+    assert dump.counter_skew() == {}
+
+    later_dump = IdleVerifyDump().parse(_get_dump_lines(
+        101, counters={(3, 'node_2'): 110, (7, 'node_1'): 90}, hashes={(3, 'node_2'): 1, (9, 'node_3'): 2}))
+    assert later_dump.inconsistent_partitions() == [(-1368047377, 3), (-1368047377, 7), (-1368047377, 9)]
+    assert later_dump.inconsistent_partitions(columns=('part_hash',)) == [(-1368047377, 3), (-1368047377, 9)]
+    assert later_dump.counter_skew() == {(-1368047377, 3): 7, (-1368047377, 7): 17}
+    assert later_dump.counter_skew(min_skew=10) == {(-1368047377, 7): 17}
+
+    diff = dump.diff(later_dump)
+    assert sorted(diff['added']) == [(-1368047377, 100, node) for node in nodes]
+    assert diff['removed'] == []
+    assert diff['changed'] == {
+        (-1368047377, 3, 'node_2'): {'update_cntr': (103, 110), 'part_hash': (-4997, 1)},
+        (-1368047377, 7, 'node_1'): {'update_cntr': (107, 90)},
+        (-1368047377, 9, 'node_3'): {'part_hash': (-4991, 2)},
+    }
+
+
+def test_get_dump_from_host():
+    lines = _get_dump_lines(10)
+
+    class MockSsh:
+        def __init__(self):
+            self.streamed = []
+
+        def exec(self, commands, **kwargs):
+            found = 'TIDEN_DUMP_FOUND\n' if commands == ['test -f /work/dump.txt && echo TIDEN_DUMP_FOUND'] else ''
+            return {'host1': [''], 'host2': [found], 'host3': ['']}
+
+        def exec_on_host_stream(self, host, command, **kwargs):
+            self.streamed.append((host, command))
+            for line in lines:
+                yield line
+
+    class MockIgnite:
+        name = 'ignite'
+        ssh = MockSsh()
+
+    ignite = MockIgnite()
+    cu = ControlUtility(ignite)
+    assert len(cu.get_idle_verify_dump('/work/dump.txt')) == 10
+    assert cu.get_parsed_dump_items('/work/dump.txt', copy_path='/test_dir') == \
+           _parse_dump_items_legacy(''.join(lines))
+    assert ignite.ssh.streamed == [
+        ('host2', 'cat /work/dump.txt'),
+        ('host2', 'cp /work/dump.txt /test_dir && cat /work/dump.txt'),
+    ]
+
+    with pytest.raises(IgniteException):
+        cu.get_idle_verify_dump('/work/dump_2.txt')
@@ -83,3 +83,136 @@ def test_ignite_jvm_options():
     assert '.mygrid.node.1.42.' in start_commands[server_host][0]
     assert '-gc-1.42.'in start_commands[server_host][0]
 
+
+def test_ignite_find_fails(tmpdir):
+    log_lines = ['[10:00:%02d,000][INFO][main] line %d\n' % (i % 60, i) for i in range(200)] + [
+        'class org.apache.ignite.IgniteException: Bad thing\n',
+        '\tat org.apache.ignite.Some.method(Some.java:1)\n',
+        '\tat java.lang.Thread.run(Thread.java:748)\n',
+        '[10:01:00,000][INFO][main] line 203\n',
+    ]
+    remote_logs = {}
+    for node_id in (1, 2):
+        remote_logs['/remote/grid.%d.log' % node_id] = log_lines if node_id == 1 else log_lines[:10]
+
+    class MockSsh:
+        threads_num = 2
+
+        def download_from_host(self, host, remote_path, local_path):
+            if remote_path not in remote_logs:
+                raise FileNotFoundError(remote_path)
+            with open(local_path, 'w') as f:
+                f.writelines(remote_logs[remote_path])
+
+    ignite_app = Ignite('ignite', {'environment': {}}, MockSsh())
+    # log of node 3 is missing on host and is skipped
+    ignite_app.nodes = {
+        node_id: {'host': '127.0.0.1', 'log': '/remote/grid.%d.log' % node_id} for node_id in (1, 2, 3)
+    }
+    store_files = str(tmpdir.mkdir('logs'))
+
+    fails = ignite_app.find_fails(store_files=store_files)
+    assert list(fails.keys()) == ['grid.1.log']
+    exceptions = fails['grid.1.log']['exceptions']
+    assert len(exceptions) == 1
+    assert exceptions[0]['line'] == 201
+    assert exceptions[0]['exception'] == [line.rstrip() for line in log_lines[200:203]]
+    assert len(exceptions[0]['context']) == Ignite.find_fails_context_lines
+    # time is taken from the last line before exception
+    assert exceptions[0]['time'].strftime('%H:%M:%S') == '10:00:19'
+    assert 'body' not in fails['grid.1.log']
+
+    fails = ignite_app.find_fails(1, store_files=store_files, keep_body=True)
+    assert fails['grid.1.log']['body'] == log_lines
+    # downloaded logs are kept in store_files
+    assert sorted(f.basename for f in tmpdir.join('logs').listdir()) == ['0.grid.1.log', '1.grid.2.log']
+
+
+def test_ignite_exception_index(tmpdir):
+    from datetime import datetime
+    from tiden.apps.ignite.exceptionindex import ExceptionIndex
+
+    def _trace(message, line):
+        return [
+            'class org.apache.ignite.IgniteException: %s' % message,
+            '\tat org.apache.ignite.Some.method(Some.java:%d)' % line,
+            '\tat java.lang.Thread.run(Thread.java:748)',
+        ]
+
+    found_exceptions = {
+        'grid.1.log': {'exceptions': [
+            {'line': 10, 'exception': _trace('Failed for node 1', 10), 'time': datetime(2020, 1, 1, 10, 0, 5)},
+            {'line': 20, 'exception': _trace('Failed for node 1', 11), 'time': datetime(2020, 1, 1, 10, 0, 55)},
+            {'line': 30, 'exception': ['java.lang.NullPointerException: null']},
+        ]},
+        'grid.2.log': {'exceptions': [
+            {'line': 10, 'exception': _trace('Failed for node 2', 12), 'time': datetime(2020, 1, 1, 10, 1, 5)},
+        ]},
+    }
+    ignite_app = Ignite('ignite', {'environment': {}, 'suite_var_dir': str(tmpdir)}, None)
+    index = ignite_app.build_exception_index(found_exceptions=found_exceptions)
+
+    signatures = index.get_signatures()
+    assert len(signatures) == 2
+    assert signatures[0]['exception'] == 'org.apache.ignite.IgniteException'
+    assert signatures[0]['frames'] == ['org.apache.ignite.Some.method(Some.java)', 'java.lang.Thread.run(Thread.java)']
+    assert signatures[0]['count'] == 3
+    assert signatures[0]['nodes'] == {'grid.1.log': 2, 'grid.2.log': 1}
+    assert signatures[0]['windows'] == {'10:00:00': 2, '10:01:00': 1}
+    assert signatures[1]['windows'] == {'unknown': 1}
+    assert [entry['signature'] for entry in index.get_signatures(node='grid.2.log')] == [signatures[0]['signature']]
+
+    loaded = ExceptionIndex.load(str(tmpdir.join(ExceptionIndex.file_name)))
+    assert loaded.get_signatures() == signatures
+
+
+def test_ignite_exception_index_per_test(tmpdir):
+    from tiden.apps.ignite.exceptionindex import ExceptionIndex
+
+    class MockSsh:
+        def download_from_host(self, host, remote_path, local_path):
+            with open(local_path, 'w') as f:
+                f.writelines([
+                    'class org.apache.ignite.IgniteException: Bad thing\n',
+                    '\tat org.apache.ignite.Some.method(Some.java:1)\n',
+                ])
+
+    test_dir = tmpdir.mkdir('test_module').mkdir('test_method')
+    config = {
+        'environment': {},
+        'suite_var_dir': str(tmpdir),
+        'tmp_dir': str(tmpdir.mkdir('tmp')),
+        'rt': {'test_dir': str(test_dir)},
+    }
+    ignite_app = Ignite('ignite', config, MockSsh())
+    ignite_app.nodes = {1: {'host': '127.0.0.1', 'log': '/remote/grid.1.log'}}
+
+    # logs are downloaded to temporary directory, index is saved to test directory
+    index = ignite_app.build_exception_index()
+    assert index.get_signatures()[0]['nodes'] == {'grid.1.log': 1}
+    assert ExceptionIndex.load(str(test_dir.join(ExceptionIndex.file_name))).get_signatures() == \
+        index.get_signatures()
+    assert not tmpdir.join(ExceptionIndex.file_name).exists()
+    assert tmpdir.join('tmp').listdir() == []
+
+
+def test_topology_watcher_only_for_streaming_pools():
+    class MockSsh:
+        supports_streaming = True
+        channels_per_host = 4
+
+    ignite_app = Ignite('ignite', {'environment': {}}, None)
+    ignite_app.ssh = MockSsh()
+    watcher = ignite_app._get_topology_watcher()
+    assert watcher is not None
+    assert ignite_app._get_topology_watcher() is watcher
+
+    # failed watcher is replaced by polling of logs
+    watcher.failed = True
+    assert ignite_app._get_topology_watcher() is None
+
+    # e.g. AnsiblePool
+    ignite_app = Ignite('ignite', {'environment': {}}, None)
+    ignite_app.ssh = MockSsh()
+    ignite_app.ssh.supports_streaming = False
+    assert ignite_app._get_topology_watcher() is None
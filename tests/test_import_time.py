@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+from os import environ
+from os.path import abspath, dirname, join
+from subprocess import run, PIPE
+
+import pytest
+
+# budget for cumulative import time of CLI entry point, seconds (best of `benchmark_runs`)
+IMPORT_TIME_BUDGET = 0.4
+benchmark_runs = 3
+
+# third party modules which must be imported only when they are really used
+deferred_modules = [
+    'ansible',
+    'asyncssh',
+    'jinja2',
+    'paramiko',
+    'psutil',
+    'requests',
+    'tiden.apps.ignite',
+]
+
+
+def measure_import_time(module_name):
+    """
+    Import module in clean interpreter with `-X importtime`
+    :param module_name: module to import
+    :return: dictionary <imported module>: <cumulative import time, seconds>
+    """
+    env = dict(environ)
+    env['PYTHONPATH'] = abspath(join(dirname(__file__), '..', 'src'))
+    proc = run([sys.executable, '-X', 'importtime', '-c', 'import %s' % module_name],
+               stdout=PIPE, stderr=PIPE, env=env, universal_newlines=True, check=True)
+    import_times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        import_times[name.strip()] = int(cumulative) / 1000000.0
+    return import_times
+
+
+def test_run_tests_import_time():
+    module_name = 'tiden.console.entry_points.run_tests'
+    best = None
+    for _ in range(benchmark_runs):
+        import_times = measure_import_time(module_name)
+        loaded = [name for name in deferred_modules if name in import_times]
+        assert not loaded, 'Modules %s are imported at CLI startup' % ', '.join(loaded)
+        if best is None or import_times[module_name] < best:
+            best = import_times[module_name]
+    assert best < IMPORT_TIME_BUDGET, \
+        'Import of %s took %.3fs, budget is %.3fs' % (module_name, best, IMPORT_TIME_BUDGET)
+
+
+def test_lazy_package_attributes():
+    import tiden
+    import tiden.apps
+    import tiden.utilities
+
+    assert tiden.SshPool.__name__ == 'SshPool'
+    assert tiden.apps.JavaApp.__name__ == 'JavaApp'
+    assert tiden.utilities.ControlUtility.__name__ == 'ControlUtility'
+    assert 'SshPool' in dir(tiden)
+    for package in [tiden, tiden.apps, tiden.utilities]:
+        with pytest.raises(AttributeError):
+            getattr(package, 'NoSuchName')
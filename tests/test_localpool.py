@@ -49,3 +49,15 @@ def test_local_pool_exec_on_host_rm_files_by_mask(local_config):
     assert not os.path.exists(file1_path)
     assert not os.path.exists(file2_path)
 
+
+def test_local_pool_exec_on_host_stream(local_config):
+    pool = LocalPool(local_config['ssh'])
+    pool.connect()
+    host = local_config['ssh']['hosts'][0]
+
+    lines = list(pool.exec_on_host_stream(host, 'seq 1 5'))
+    assert lines == ['1\n', '2\n', '3\n', '4\n', '5\n']
+
+    # early termination must not wait for the rest of output
+    lines = list(pool.exec_on_host_stream(host, 'seq 1 100000000', until=lambda line: line == '3\n'))
+    assert lines == ['1\n', '2\n', '3\n']
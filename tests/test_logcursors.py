@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from tiden.apps.logcursors import LogCursors
+from tiden.localpool import LocalPool
+
+
+def _create_log(local_config):
+    pool = LocalPool(local_config['ssh'])
+    pool.connect()
+    host = local_config['ssh']['hosts'][0]
+    home = local_config['environment']['home']
+    host_home = os.path.join(home, host)
+    os.makedirs(host_home, exist_ok=True)
+    # local pool maps remote home to host directory
+    log = os.path.join(home, 'grid.log')
+    local_log = os.path.join(host_home, 'grid.log')
+    return pool, host, log, local_log
+
+
+def test_log_cursors_scan_only_new_bytes(local_config):
+    pool, host, log, local_log = _create_log(local_config)
+
+    cursors = LogCursors(pool)
+    errors = (host, log, 'grep -E "ERROR"')
+    warnings = (host, log, 'grep "WARN"')
+
+    with open(local_log, 'w') as f:
+        f.write('INFO started\nERROR first\nWARN slow\n')
+    assert cursors.grep([errors, warnings]) == [['ERROR first\n'], ['WARN slow\n']]
+    assert cursors.cursors[errors]['offset'] == os.path.getsize(local_log)
+
+    with open(local_log, 'a') as f:
+        f.write('ERROR second\n')
+    assert cursors.grep([errors]) == [['ERROR first\n', 'ERROR second\n']]
+    assert cursors.cursors[errors]['offset'] == os.path.getsize(local_log)
+    # other filter has its own cursor
+    assert cursors.grep([warnings]) == [['WARN slow\n']]
+
+    # log recreated for the next run
+    os.remove(local_log)
+    with open(local_log, 'w') as f:
+        f.write('ERROR third\nWARN fast\n' + 'INFO padding\n' * 10)
+    assert cursors.grep([errors, warnings]) == [['ERROR third\n'], ['WARN fast\n']]
+
+    # log truncated
+    with open(local_log, 'w') as f:
+        f.write('ERROR fourth\n')
+    assert cursors.grep([errors]) == [['ERROR fourth\n']]
+
+    # missing log
+    os.remove(local_log)
+    assert cursors.grep([errors]) == [[]]
+
+
+def test_log_cursors_skip_unterminated_line(local_config):
+    pool, host, log, local_log = _create_log(local_config)
+
+    cursors = LogCursors(pool)
+    errors = (host, log, 'grep "ERROR"')
+
+    # the last line is being written at the scan
+    with open(local_log, 'w') as f:
+        f.write('ERROR first\nERROR sec')
+    assert cursors.grep([errors]) == [['ERROR first\n']]
+    assert cursors.cursors[errors]['offset'] == len('ERROR first\n')
+
+    with open(local_log, 'a') as f:
+        f.write('ond\nINFO started')
+    assert cursors.grep([errors]) == [['ERROR first\n', 'ERROR second\n']]
+
+    with open(local_log, 'a') as f:
+        f.write('\n')
+    assert cursors.grep([errors]) == [['ERROR first\n', 'ERROR second\n']]
+    assert cursors.cursors[errors]['offset'] == os.path.getsize(local_log)
+
+    # log of single unterminated line
+    with open(local_log, 'w') as f:
+        f.write('ERROR third')
+    assert cursors.grep([errors]) == [[]]
+    assert cursors.cursors[errors]['offset'] == 0
+
+
+def test_log_cursors_grep_patterns_in_single_pass(local_config):
+    pool, host, log, local_log = _create_log(local_config)
+    with open(local_log, 'w') as f:
+        f.write('# A fatal error has been detected\n'
+                'Exception java.lang.OutOfMemoryError: heap\n'
+                'Failed to read magic header\n'
+                'Started in 15 ms\n'
+                'INFO started\n')
+
+    cursors = LogCursors(pool)
+    patterns = [
+        ('-E', '(^\\# A fatal error has been detected.*)'),
+        ('-E', '(.+java.lang.OutOfMemoryError.+)'),
+        ('-E', '(Error: Could not create the Java Virtual Machine)'),
+        ('', 'magic header'),
+        ('-E', 'in [[:digit:]]+ ms'),
+    ]
+    assert cursors.grep_patterns([(host, log, patterns)]) == [[
+        ['# A fatal error has been detected\n'],
+        ['Exception java.lang.OutOfMemoryError: heap\n'],
+        [],
+        ['Failed to read magic header\n'],
+        ['Started in 15 ms\n'],
+    ]]
+    # all -E patterns are scanned by one remote grep, except the one with POSIX bracket class
+    assert len(cursors.cursors) == 3
+
+
+def test_log_cursors_perl_patterns(local_config):
+    pool, host, log, local_log = _create_log(local_config)
+    with open(local_log, 'w') as f:
+        f.write('Exception in thread\n'
+                'Node 12 left\n'
+                'INFO started\n')
+
+    cursors = LogCursors(pool)
+    patterns = [
+        ('-P', 'Exception\\s+in'),
+        ('-P', 'Node \\d+ left'),
+    ]
+    # 'grep -P' accepts single pattern, so patterns are scanned separately
+    assert cursors.grep_patterns([(host, log, patterns)]) == [[
+        ['Exception in thread\n'],
+        ['Node 12 left\n'],
+    ]]
+    assert len(cursors.cursors) == 2
+
+
+def test_log_cursors_keep_offset_on_filter_error(local_config):
+    pool, host, log, local_log = _create_log(local_config)
+    with open(local_log, 'w') as f:
+        f.write('ERROR first\n')
+
+    cursors = LogCursors(pool)
+    broken = (host, log, 'grep -P -e "ERROR" -e "WARN"')
+    assert cursors.grep([broken]) == [[]]
+    assert cursors.cursors[broken]['offset'] == 0
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from inspect import stack
+from io import StringIO
+from time import time
+
+import pytest
+
+from tiden import util
+from tiden.logger import TidenLogger
+
+benchmark_messages = 500
+
+
+@pytest.fixture
+def file_logger(tmpdir):
+    log_file = str(tmpdir.join('tiden.log'))
+    env_config = TidenLogger.env_config
+    TidenLogger.set_logger_env_config({'file_handler': {'log_file': log_file, 'log_level': 'INFO'}})
+    logger = TidenLogger('test_logger_%s' % tmpdir.basename)
+    yield logger, log_file
+    logger.stop_writer()
+    for handler in logger.handlers:
+        handler.close()
+    TidenLogger.set_logger_env_config(env_config)
+
+
+def test_file_formatting(file_logger):
+    logger, log_file = file_logger
+    assert logger.writer is not None
+    logger.set_test('test_one')
+    logger.info('plain')
+    logger.info('no newline', skip_newline=True)
+    logger.info('rewritten', rewrite=True)
+    logger.info('bare', skip_prefix=True)
+    logger.info('bare rewritten', skip_prefix=True, rewrite=True)
+    logger.info('colored', color='red')
+    logger.stop_writer()
+    assert logger.writer is None
+
+    lines = open(log_file, newline='').read().split('\n')
+    assert ' - INFO     - ' in lines[0] and lines[0].endswith('test_one plain')
+    # the record without newline is followed by the rewritten one on the same line
+    assert 'no newline\r' in lines[1] and lines[1].endswith('test_one rewritten')
+    assert lines[2] == 'bare'
+    assert lines[3] == '\rbare rewritten'
+    assert lines[4].endswith('\x1b[31;1mcolored\x1b[0m')
+
+    # records are written directly after the writer is stopped
+    logger.info('direct', skip_prefix=True)
+    assert open(log_file).read().endswith('\ndirect\n')
+
+
+def _legacy_is_called_from_line():
+    file_positions = []
+    for item in stack():
+        if 'suites' in item[1]:
+            file_positions.insert(0, f":{item[2]}")
+    return file_positions
+
+
+def _call_from_suite(func):
+    # the code object gets a file name under 'suites' like test modules have
+    code = compile('def suite_call(func):\n    return func()\n', '/tmp/suites/mock/test_mock.py', 'exec')
+    namespace = {}
+    exec(code, namespace)
+    return namespace['suite_call'](func)
+
+
+def _messages_per_second(func):
+    started = time()
+    for _ in range(benchmark_messages):
+        _call_from_suite(func)
+    return benchmark_messages / (time() - started)
+
+
+def test_called_from_line():
+    is_called_from_line = getattr(util, '__is_called_from_line')
+    assert is_called_from_line() == []
+    assert _call_from_suite(is_called_from_line) == [':2']
+    assert _call_from_suite(is_called_from_line) == _call_from_suite(_legacy_is_called_from_line)
+
+    before = _messages_per_second(_legacy_is_called_from_line)
+    after = _messages_per_second(is_called_from_line)
+    print('\nCaller lookup, messages/sec: inspect.stack() %d, frame walk %d' % (before, after))
+    assert after > before
+
+
+def test_log_put_throughput(file_logger, monkeypatch):
+    logger, log_file = file_logger
+    console = StringIO()
+    monkeypatch.setattr(util, 'stdout', console)
+    monkeypatch.setattr(util, 'get_logger', lambda name: logger)
+
+    started = time()
+    for idx in range(benchmark_messages):
+        _call_from_suite(lambda: util.log_put('message %d' % idx))
+    queued = benchmark_messages / (time() - started)
+    logger.stop_writer()
+    print('\nlog_put to file, messages/sec: %d' % queued)
+
+    assert console.getvalue().count('\r[') == benchmark_messages
+    assert len(open(log_file).readlines()) == benchmark_messages
@@ -15,15 +15,17 @@
 # limitations under the License.
 
 import tarfile
-from os import mkdir, walk, listdir
-from os.path import abspath, join, pardir, exists, basename, dirname, getmtime
+from os import makedirs, mkdir, walk, listdir
+from subprocess import check_call
+from os.path import abspath, join, pardir, exists, basename, dirname, getmtime, realpath
 from shutil import rmtree
 from time import time, sleep
 from zipfile import ZipFile
 
 from pytest import fixture
 
-from tiden.artifacts import prepare
+from tiden.artifacts import prepare, get_remote_extract_command, TIDEN_EXTRACTED_MARKER, _repack_extracted, \
+    _repack_streaming, _get_command, TIDEN_EXTRACTED_DIR
 from tiden.localpool import LocalPool
 from tiden.runner import setup_test_environment, init_remote_hosts, upload_artifacts
 
@@ -583,7 +585,9 @@ def test_upload_artifacts(temp_dir, prepare_artifacts_with_ssh_structure):
     expected_artifacts_dir_files = [
         config['_test_artifacts']["source"]["arch"]["repack_name"],
         config['_test_artifacts']["additional"]["file"]["name"],
-        config['_test_artifacts']["additional"]["arch"]["name"]
+        config['_test_artifacts']["additional"]["arch"]["name"],
+        # archives extracted for all runs
+        TIDEN_EXTRACTED_DIR,
     ]
     actual_artifacts_files_list = listdir(join(ssh_home_dir, 'artifacts'))
     assert sorted(expected_artifacts_dir_files) == sorted(actual_artifacts_files_list)
@@ -698,7 +702,121 @@ def test_repeat_upload_tar_artifacts(temp_dir, simple_structure):
     for name, art in config["artifacts"].items():
         assert join(config["remote"]["suite_var_dir"], name) == art["remote_path"]
 
-        actual_dirs_list = listdir(art["remote_path"].replace("remote", "remote/127.0.0.1"))
+        actual_dirs_list = [name for name in listdir(art["remote_path"].replace("remote", "remote/127.0.0.1"))
+                            if name != TIDEN_EXTRACTED_MARKER]
         expected_dirs_list = for_repack if 'repack' in name else [for_repack[0]]
         assert sorted(actual_dirs_list) == sorted(expected_dirs_list)
 
+
+def test_remote_extract_command(temp_dir):
+    """
+    archive should be extracted once while it is not changed
+    """
+    source_dir = join(var_dir, 'source', 'top')
+    ensure_dir(get_parent(source_dir))
+    ensure_dir(source_dir)
+    with open(join(source_dir, 'a [1].txt'), 'w') as f:
+        f.write('a')
+    zip_path = join(var_dir, 'a.zip')
+    tar_path = join(var_dir, 'a.tar.gz')
+    with ZipFile(zip_path, 'w') as zip_file:
+        zip_file.write(join(source_dir, 'a [1].txt'), 'top/a [1].txt')
+    with tarfile.open(tar_path, 'w:gz') as tar_file:
+        tar_file.add(source_dir, 'top')
+
+    for archive_path, strip_components, expected_files in [(zip_path, 0, ['top']), (tar_path, 1, ['a [1].txt'])]:
+        target_dir = join(var_dir, 'test', basename(archive_path).replace('.', '_'))
+        command = get_remote_extract_command(archive_path, target_dir, strip_components=strip_components)
+        check_call(command, shell=True)
+        assert sorted(listdir(target_dir)) == sorted([TIDEN_EXTRACTED_MARKER] + expected_files)
+
+        # not changed archive is not extracted again
+        open(join(target_dir, 'stamp'), 'w').close()
+        check_call(command, shell=True)
+        assert exists(join(target_dir, 'stamp'))
+
+        # other archive replaces extracted directory
+        command = get_remote_extract_command(archive_path, target_dir, key='other',
+                                             strip_components=strip_components)
+        check_call(command, shell=True)
+        assert sorted(listdir(target_dir)) == sorted([TIDEN_EXTRACTED_MARKER] + expected_files)
+    assert sorted(listdir(join(var_dir, 'test'))) == ['a_tar_gz', 'a_zip']
+
+
+def test_remote_extract_command_between_runs(temp_dir):
+    """
+    archive extracted by previous run is reused by the next run with the other suite var dir
+    """
+    source_dir = join(var_dir, 'source')
+    ensure_dir(source_dir)
+    with open(join(source_dir, 'a.txt'), 'w') as f:
+        f.write('a')
+    zip_path = join(var_dir, 'a.zip')
+    with ZipFile(zip_path, 'w') as zip_file:
+        zip_file.write(join(source_dir, 'a.txt'), 'a.txt')
+
+    remote_dir = join(var_dir, 'remote')
+    extracted = []
+    for run in ['test-1', 'test-2']:
+        run_config = {'remote': {'artifacts_dir': join(remote_dir, 'artifacts'),
+                                 'suite_var_dir': join(remote_dir, run)}}
+        command, remote_path = _get_command(run_config, 'art', zip_path, zip_path)
+        check_call(command, shell=True)
+        assert remote_path == join(remote_dir, run, 'art')
+        extracted.append(realpath(remote_path))
+        if run == 'test-1':
+            assert sorted(listdir(remote_path)) == sorted([TIDEN_EXTRACTED_MARKER, 'a.txt'])
+            # stamp is kept unless archive is extracted again
+            open(join(remote_path, 'stamp'), 'w').close()
+    assert extracted[0] == extracted[1]
+    assert sorted(listdir(join(remote_dir, 'test-2', 'art'))) == sorted([TIDEN_EXTRACTED_MARKER, 'a.txt', 'stamp'])
+    assert listdir(join(remote_dir, 'artifacts', 'extracted')) == [basename(extracted[0])]
+
+
+def test_repack_streaming_same_as_extracted(temp_dir):
+    """
+    repack without extraction should produce the same archive entries as repack of extracted artifact
+    """
+    source_root = join(var_dir, 'source')
+    artifact_root = join(source_root, 'gridgain-1.0')
+    for dir_name in ['libs/optional/mod-a', 'bin', 'config/empty']:
+        makedirs(join(artifact_root, dir_name))
+    with ZipFile(join(artifact_root, 'libs', 'ignite-core-1.0.jar'), 'w') as core:
+        core.writestr('ignite.properties', 'ignite.version=1.0\nignite.build=42\n')
+    for file_name in ['libs/a.jar', 'libs/b.jar', 'libs/optional/mod-a/x.jar', 'bin/run.sh', 'README.txt',
+                      'config/c.xml']:
+        with open(join(artifact_root, file_name), 'w') as f:
+            f.write(file_name * 100)
+    zip_path = join(var_dir, 'gridgain.zip')
+    with ZipFile(zip_path, 'w') as zip_file:
+        for dir_name, dirs, files in walk(source_root):
+            for name in dirs + files:
+                zip_file.write(join(dir_name, name), join(dir_name, name)[len(source_root):])
+    extra_file = join(var_dir, 'extra.txt')
+    with open(extra_file, 'w') as f:
+        f.write('extra')
+
+    rules = [
+        'delete self:/libs/b.jar',
+        'move self:/libs/optional/mod-a self:/libs',
+        'copy {} self:/libs'.format(extra_file),
+        'mkdir self:/work',
+        'copy $gridgain$/libs/a* self:/work',
+        'copy self:/config self:/config2',
+        'move self:/README.txt self:/README2.txt',
+    ]
+    artifacts = {'gridgain': {'glob_path': zip_path}}
+    results = []
+    for repack_function in [_repack_extracted, _repack_streaming]:
+        work_dir = join(var_dir, repack_function.__name__)
+        mkdir(work_dir)
+        results.append(repack_function('gridgain', zip_path, 'checksum', work_dir, rules, var_dir, artifacts))
+
+    assert results[0]['ignite_build'] == results[1]['ignite_build'] == '42'
+    with ZipFile(results[0]['new_file']) as expected, ZipFile(results[1]['new_file']) as actual:
+        expected_entries = [(info.filename, info.external_attr, info.compress_type, info.CRC)
+                            for info in expected.infolist()]
+        actual_entries = [(info.filename, info.external_attr, info.compress_type, info.CRC)
+                          for info in actual.infolist()]
+    assert expected_entries == actual_entries
+    assert 'libs/mod-a/x.jar' in [entry[0] for entry in actual_entries]
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from tiden.sshpool import SshPool
+
+host_outputs = {
+    'host1': '101 org.apache.ignite.startup.cmdline.CommandLineStartup\n'
+             '102 sun.tools.jps.Jps\n'
+             '--- ps ---\n'
+             'tiden      101 java     java -DIGNITE_HOME=/ignite.server.1 '
+             'org.apache.ignite.startup.cmdline.CommandLineStartup\n'
+             'tiden      102 java     java sun.tools.jps.Jps -l\n'
+             'tiden      103 vim      vim Test.java\n',
+    'host2': '201 org.apache.ignite.startup.cmdline.CommandLineStartup\n'
+             '--- ps ---\n'
+             'tiden      201 java     /usr/bin/java -DIGNITE_HOME=/ignite.client.1 '
+             'org.apache.ignite.startup.cmdline.CommandLineStartup\n'
+             'other      202 java     java -jar jenkins-agent.jar\n',
+}
+
+
+class MockSsh:
+    process_table = None
+    username = 'tiden'
+
+    def __init__(self):
+        self.commands = []
+        self.outputs = dict(host_outputs)
+        self.killed = []
+
+    def exec(self, commands, **kwargs):
+        self.commands.append(commands)
+        return dict([(host, [output]) for host, output in self.outputs.items()])
+
+    def killall(self, name):
+        self.killed.append(name)
+
+    def get_java_processes(self, hosts=None):
+        return SshPool.get_java_processes(self, hosts)
+
+    get_process_table = SshPool.get_process_table
+
+
+def test_process_table():
+    ssh = MockSsh()
+    table = ssh.get_process_table()
+    assert ssh.get_process_table() is table
+
+    processes = table.get_processes(skip_reserved_java_processes=False, own_processes_only=False)
+    assert len(ssh.commands) == 1
+    assert sorted([(process['host'], process['pid'], process['owner']) for process in processes]) == [
+        ('host1', '101', 'tiden'), ('host1', '102', 'tiden'), ('host2', '201', 'tiden'), ('host2', '202', 'other'),
+    ]
+    assert [process['name'] for process in processes if process['pid'] == '202'] == [None]
+    # processes of other users are not seen by default
+    assert sorted([process['pid'] for process in table.get_processes(skip_reserved_java_processes=False)]) == \
+           ['101', '102', '201']
+    assert [process['pid'] for process in table.get_processes(hosts=['host2'])] == ['201']
+    assert not table.is_alive(202)
+
+    # queries are answered from the snapshot
+    assert [process['pid'] for process in table.get_processes(hosts=['host1'])] == ['101']
+    assert table.is_alive(101)
+    assert table.is_alive('201', 'host2')
+    assert not table.is_alive(201, 'host1')
+    nodes = {
+        1: {'host': 'host1', 'PID': 101},
+        2: {'host': 'host1', 'PID': 103},
+        3: {'host': 'host2', 'PID': '201'},
+        4: {'host': 'host2'},
+    }
+    assert table.pids_by_node(nodes) == {1: 101, 3: 201}
+    assert [process['pid'] for process in table.alien_processes('tiden')] == ['202']
+    assert [process['pid'] for process in table.find('host2', 'ignite', exclude=('server',))] == ['201']
+    assert table.find('host1', 'ignite.client') == []
+    assert len(ssh.commands) == 1
+
+    # snapshot is listed again after invalidation or expiration
+    table.invalidate()
+    table.is_alive(101)
+    assert len(ssh.commands) == 2
+    table.ttl = 0
+    table.collected -= 1
+    table.is_alive(101)
+    assert len(ssh.commands) == 3
+
+
+def test_kill_stalled_java_lists_processes_again():
+    from tiden.util import kill_stalled_java
+
+    ssh = MockSsh()
+    assert ssh.get_process_table().get_processes()
+    # nodes are killed by test teardown after the snapshot was taken
+    ssh.outputs = {'host1': '--- ps ---\n', 'host2': '--- ps ---\n'}
+    kill_stalled_java(ssh)
+    assert ssh.killed == []
+    assert len(ssh.commands) == 2
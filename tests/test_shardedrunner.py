@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from os import getpid
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import tiden.shardedrunner
+from tiden.result import Result
+from tiden.shardedrunner import ShardedRunner
+
+
+def _config(tmpdir, server_hosts, client_hosts):
+    return {
+        'environment': {
+            'server_hosts': server_hosts,
+            'client_hosts': client_hosts,
+            'zk_hosts': ['zk1'],
+        },
+        'ignite': {},
+        'suite_var_dir': str(tmpdir),
+        'remote': {
+            'suite_var_dir': '/remote/suite',
+            'artifacts_dir': '/remote/artifacts',
+        },
+        'xunit_file': 'xunit.xml',
+        'shards': 3,
+    }
+
+
+class MockSsh:
+    def __init__(self, config):
+        self.hosts = config['environment']['server_hosts']
+
+    def exec(self, commands):
+        return {}
+
+    def close(self):
+        pass
+
+
+class MockRunner:
+    """
+    Passes one test per module, fails module setup for modules named 'broken'
+    """
+
+    def __init__(self, config, modules=None, xunit_path=None, ssh_pool=None, plugin_manager=None):
+        self.config = config
+        self.modules = modules
+        self.result = Result()
+        self.ssh_pool = ssh_pool
+
+    def process_tests(self):
+        module_name = list(self.modules.keys())[0]
+        if module_name.endswith('broken'):
+            exit(1)
+        test = f'{module_name}.test_{getpid()}_{self.config["shard"]["index"]}_{"_".join(self.ssh_pool.hosts)}'
+        self.result.tests[test] = {
+            'status': 'pass', 'classname': module_name, 'name': test, 'time': '1', 'started': 0,
+        }
+        self.result.tests_num['total'] += 1
+        self.result.tests_num['pass'] += 1
+
+    def get_tests_results(self):
+        return self.result
+
+
+def test_shard_configs(tmpdir):
+    config = _config(tmpdir, ['s%d' % i for i in range(7)], ['c1', 'c2'])
+    shard_configs = ShardedRunner(config, {}, MockSsh).get_shard_configs()
+    assert len(shard_configs) == 3
+    assert [c['environment']['server_hosts'] for c in shard_configs] == [
+        ['s0', 's3', 's6'], ['s1', 's4'], ['s2', 's5']
+    ]
+    # not enough hosts to split, shared by shards
+    assert all([c['environment']['client_hosts'] == ['c1', 'c2'] for c in shard_configs])
+    assert all([c['environment']['zk_hosts'] == ['zk1'] for c in shard_configs])
+    assert [c['remote']['suite_var_dir'] for c in shard_configs] == [
+        '/remote/suite/shard-0', '/remote/suite/shard-1', '/remote/suite/shard-2'
+    ]
+    assert [c['ignite']['ports_offset'] for c in shard_configs] == [0, 1000, 2000]
+    assert len(set([c['config_path'] for c in shard_configs])) == 3
+    assert config['remote']['suite_var_dir'] == '/remote/suite'
+
+    assert ShardedRunner.get_shards_num(_config(tmpdir, ['s1', 's2'], [])) == 2
+    assert ShardedRunner.get_shards_num(_config(tmpdir, ['s1', 's2'], []), 1) == 1
+
+
+def test_sharded_run(tmpdir, monkeypatch):
+    monkeypatch.setattr(tiden.shardedrunner, 'TidenRunner', MockRunner)
+    config = _config(tmpdir, ['s%d' % i for i in range(3)], ['c%d' % i for i in range(3)])
+    modules = dict([('suite.test_module_%d' % i, {}) for i in range(7)])
+    xunit_path = str(tmpdir.join('xunit.xml'))
+    result = Result(xunit_path=xunit_path)
+
+    ShardedRunner(config, modules, MockSsh).process_tests(result)
+    assert result.tests_num['total'] == 7
+    assert result.tests_num['pass'] == 7
+    assert sorted([test['classname'] for test in result.tests.values()]) == sorted(modules.keys())
+    # every shard runs on its own hosts
+    for test in result.tests.values():
+        shard_idx = int(test['name'].split('_')[-2])
+        assert test['name'].endswith('_s%d' % shard_idx)
+
+    xunit = ET.parse(xunit_path).getroot()
+    assert xunit.attrib['tests'] == '7'
+    assert len(xunit.findall('testcase')) == 7
+
+    modules['suite.test_module_broken'] = {}
+    with pytest.raises(SystemExit):
+        ShardedRunner(config, modules, MockSsh).process_tests(Result(xunit_path=xunit_path))
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from functools import partial
+from multiprocessing.dummy import Pool as ThreadPool
+from threading import Lock
+from time import sleep, time
+
+import pytest
+from paramiko import SSHException
+
+from tiden.sshpool import SshPool
+
+
+class MockChannelFile(list):
+    """
+    Stand-in for paramiko ChannelFile: iterable over lines with closeable channel
+    """
+
+    class Channel:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    def __init__(self, lines):
+        super().__init__(lines)
+        self.channel = MockChannelFile.Channel()
+
+
+class MockSshClient:
+    """
+    Stand-in for paramiko SSHClient connected to local sshd: every channel open costs `latency` seconds,
+    command output is a command itself.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.lock = Lock()
+        self.active_channels = 0
+        self.max_active_channels = 0
+        self.commands = []
+        self.fail_once = None
+
+    def exec_command(self, command, timeout=None):
+        with self.lock:
+            if self.fail_once and self.fail_once in command:
+                self.fail_once = None
+                raise SSHException('SSH session not active')
+            self.active_channels += 1
+            self.max_active_channels = max(self.max_active_channels, self.active_channels)
+            self.commands.append(command)
+        sleep(self.latency)
+        with self.lock:
+            self.active_channels -= 1
+        if command.startswith('seq '):
+            lines = ['%d\n' % i for i in range(1, int(command.split()[1]) + 1)]
+        else:
+            lines = [command.replace(' 2>&1', '') + '\n']
+        return None, MockChannelFile(lines), MockChannelFile([])
+
+    def close(self):
+        pass
+
+
+def _create_pool(hosts, latency=0.0, **kwargs):
+    config = {
+        'username': '',
+        'home': '',
+        'threads_num': len(hosts),
+        'default_timeout': 10,
+        'hosts': hosts,
+    }
+    config.update(kwargs)
+    pool = SshPool(config)
+    pool.clients = {host: MockSshClient(latency) for host in hosts}
+    pool.connect = lambda: None
+    return pool
+
+
+def test_sshpool_exec_keeps_commands_order():
+    hosts = ['10.0.0.%d' % i for i in range(1, 5)]
+    pool = _create_pool(hosts)
+    try:
+        commands = ['echo %d' % i for i in range(10)]
+        for parallel in (False, True):
+            results = pool.exec(commands, parallel=parallel)
+            assert sorted(results.keys()) == sorted(hosts)
+            for host in hosts:
+                assert results[host] == ['%s\n' % command for command in commands]
+    finally:
+        pool.close()
+
+
+def test_sshpool_reuses_thread_pool():
+    pool = _create_pool(['10.0.0.1'])
+    try:
+        pool.exec(['echo 1'])
+        thread_pool = pool._thread_pool
+        assert thread_pool is not None
+        pool.exec(['echo 2'])
+        assert pool._thread_pool is thread_pool
+    finally:
+        pool.close()
+    assert pool._thread_pool is None
+
+
+@pytest.mark.parametrize('channels_per_host', [1, 3])
+def test_sshpool_channels_per_host_bound(channels_per_host):
+    host = '10.0.0.1'
+    pool = _create_pool([host], latency=0.02, channels_per_host=channels_per_host)
+    try:
+        pool.exec(['echo %d' % i for i in range(12)], parallel=True)
+        assert pool.clients[host].max_active_channels == channels_per_host
+    finally:
+        pool.close()
+
+
+def test_sshpool_reconnect_repeats_commands():
+    host = '10.0.0.1'
+    pool = _create_pool([host])
+    try:
+        pool.clients[host].fail_once = 'echo 2'
+        results = pool.exec_on_host(host, ['echo 1', 'echo 2', 'echo 3'])
+        assert results[host] == ['echo 1\n', 'echo 2\n', 'echo 3\n']
+    finally:
+        pool.close()
+
+
+def test_sshpool_exec_on_host_stream_until():
+    host = '10.0.0.1'
+    pool = _create_pool([host])
+    try:
+        lines = list(pool.exec_on_host_stream(host, 'seq 100', until=lambda line: line == '5\n'))
+        assert lines == ['%d\n' % i for i in range(1, 6)]
+    finally:
+        pool.close()
+
+
+def test_sshpool_exec_stream():
+    hosts = ['10.0.0.1', '10.0.0.2']
+    pool = _create_pool(hosts)
+    found = {}
+
+    def _on_line(host, command_idx, line):
+        found.setdefault((host, command_idx), []).append(line)
+        return command_idx == 1 and int(line) >= 3
+
+    try:
+        pool.exec_stream(['seq 4', 'seq 10'], _on_line)
+    finally:
+        pool.close()
+    for host in hosts:
+        assert found[(host, 0)] == ['1\n', '2\n', '3\n', '4\n']
+        assert found[(host, 1)] == ['1\n', '2\n', '3\n']
+
+
+def test_sshpool_upload_small_files_whole(tmpdir):
+    host = '10.0.0.1'
+    pool = _create_pool([host], delta_upload_min_size=1024)
+    put, delta = [], []
+
+    class MockSftp:
+        def put(self, local_file, remote_file):
+            put.append(remote_file)
+
+        def close(self):
+            pass
+
+    client = pool.clients[host]
+    client.open_sftp = MockSftp
+    pool._upload_file_on_host = lambda host, local_file, remote_file: delta.append(remote_file)
+    small_file, large_file = tmpdir.join('small.zip'), tmpdir.join('large.zip')
+    small_file.write('x' * 1023)
+    large_file.write('x' * 1024)
+    try:
+        pool.upload_on_host(host, [str(small_file), str(large_file)], '/remote')
+    finally:
+        pool.close()
+    assert put == ['/remote/small.zip']
+    assert delta == ['/remote/large.zip']
+    # no remote commands for the small file
+    assert client.commands == []
+
+
+def test_sshpool_exec_benchmark():
+    """
+    Compare polling loop over the pool with the old behaviour: fresh thread pool per exec call
+    and serial channels per host.
+    """
+    hosts = ['10.0.0.%d' % i for i in range(1, 9)]
+    commands = ['echo %d' % i for i in range(4)]
+    iterations = 10
+    pool = _create_pool(hosts, latency=0.005)
+
+    def _old_exec():
+        thread_pool = ThreadPool(pool.threads_num)
+        thread_pool.starmap(partial(pool.exec_on_host), [[host, commands] for host in hosts])
+        thread_pool.close()
+        thread_pool.join()
+
+    try:
+        started = time()
+        for i in range(iterations):
+            _old_exec()
+        old_time = time() - started
+
+        started = time()
+        for i in range(iterations):
+            pool.exec(commands, parallel=True)
+        new_time = time() - started
+    finally:
+        pool.close()
+
+    print('SshPool.exec: %d calls x %d hosts x %d commands: per-call pool %.3f sec, persistent pool %.3f sec' % (
+        iterations, len(hosts), len(commands), old_time, new_time))
+    assert new_time < old_time
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from re import findall
+
+import pytest
+
+from tiden.apps.appexception import AppException
+from tiden.apps.ignite.ignite import Ignite
+from tiden.apps.ignite.startorchestrator import StartOrchestrator
+from tiden.apps.nodestatus import NodeStatus
+
+
+class MockSsh:
+    """
+    Emulates hosts where started node processes listen ports after the first probe
+    """
+
+    def __init__(self, dead_nodes=()):
+        self.dead_nodes = dead_nodes
+        self.pids = {}
+        self.ports = {}
+        self.started = []
+
+    def exec(self, commands, **kwargs):
+        results = {}
+        for host, host_commands in commands.items():
+            results[host] = []
+            for command in host_commands:
+                if 'bin/ignite.sh' in command:
+                    node_idx = int(findall(r'TIDEN_START_PID (\d+)', command)[0])
+                    self.started.append(node_idx)
+                    self.pids[node_idx] = 1000 + node_idx
+                    results[host].append('TIDEN_START_PID %s %s\n' % (node_idx, self.pids[node_idx]))
+                elif command.startswith('for pid in'):
+                    alive = [pid for pid in findall(r'\d+', command.split(';')[0])
+                             if int(pid) - 1000 not in self.dead_nodes]
+                    output = ''.join(['TIDEN_START_PID %s\n' % pid for pid in alive])
+                    output += 'State Recv-Q Send-Q Local Address:Port Peer Address:Port\n'
+                    output += ''.join(['LISTEN 0 128 *:%d *:*\n' % port for port in self.ports.get(host, [])])
+                    # ports are opened by the next probe
+                    self.ports[host] = []
+                    for node_idx, pid in self.pids.items():
+                        if node_idx not in self.dead_nodes and \
+                                ('h1' if node_idx in (1, 2) else 'h2') == host:
+                            self.ports[host].extend([47500 + len(self.ports[host]) // 2,
+                                                     47100 + len(self.ports[host]) // 2])
+                    results[host].append(output)
+                else:
+                    results[host].append('')
+        return results
+
+    def exec_on_host(self, host, commands, **kwargs):
+        return {host: ['[ERROR] Failed to start node\n']}
+
+
+def _get_ignite(ssh, **ignite_config):
+    config = {
+        'environment': {
+            'server_hosts': ['h1', 'h2'],
+            'servers_per_host': 2,
+            'client_hosts': [],
+        },
+        'rt': {
+            'remote': {
+                'test_module_dir': '/REMOTE_TEST_MODULE_DIR',
+                'test_dir': '/REMOTE_TEST_DIR',
+            }
+        },
+        'remote': {
+            'suite_var_dir': '/REMOTE_SUITE_VAR_DIR',
+        },
+        'artifacts': {
+            'ignite': {
+                'path': None,
+                'remote_path': '/REMOTE_ARTIFACT_DIR',
+            }
+        },
+        'ignite': ignite_config,
+    }
+    ignite = Ignite('ignite', config, ssh)
+    ignite.setup()
+    ignite.set_node_option('*', 'config', 'mock.xml')
+    return ignite
+
+
+def test_start_in_waves(monkeypatch):
+    monkeypatch.setattr(StartOrchestrator, 'probe_interval', 0)
+    ssh = MockSsh()
+    ignite = _get_ignite(ssh, start_wave_size=2)
+    topology_waits = []
+    ignite.wait_for_topology_snapshot = lambda server_num, client_num, comment, **kwargs: \
+        topology_waits.append((list(ssh.started), server_num))
+
+    orchestrator = ignite.get_start_orchestrator()
+    assert orchestrator.get_waves([2, 3, 4]) == [[2, 3], [4]]
+    assert ignite.get_start_orchestrator(wave_size=0).get_waves([2, 3, 4]) == [[2, 3, 4]]
+
+    orchestrator.start([1], 1)
+    orchestrator.start([2, 3, 4], 4)
+    # every wave joins topology before the next one is started
+    assert topology_waits == [([1], 1), ([1, 2, 3], 3), ([1, 2, 3, 4], 4)]
+    assert orchestrator.pids == {1: 1001, 2: 1002, 3: 1003, 4: 1004}
+    assert orchestrator.probe_ports
+
+
+def test_start_fails_on_process_exit(monkeypatch):
+    monkeypatch.setattr(StartOrchestrator, 'probe_interval', 0)
+    ssh = MockSsh(dead_nodes=(3,))
+    ignite = _get_ignite(ssh)
+    ignite.wait_for_topology_snapshot = lambda *args, **kwargs: pytest.fail('Topology must not be awaited')
+
+    with pytest.raises(AppException) as e:
+        ignite.get_start_orchestrator().start([1, 2, 3, 4], 4)
+    assert 'Node 3 process (PID 1003) exited on host h2' in str(e.value)
+    assert 'Failed to start node' in str(e.value)
+    assert ignite.nodes[3]['status'] == NodeStatus.KILLED
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+from glob import glob
+from os.path import join, dirname, basename
+
+from tiden.staticcollector import StaticCollector
+
+
+def _collect(tmpdir, name, static_collect):
+    from tiden.tidenrunner import TidenRunner
+
+    var_dir = tmpdir.mkdir(name)
+    suite_dir = join(dirname(__file__), 'res', 'decorators', 'suites')
+    config = {
+        'artifacts': {},
+        'var_dir': str(var_dir),
+        'suite_var_dir': str(var_dir.mkdir('suite-mock')),
+        'suite_name': 'mock',
+        'test_name': '*',
+        'suite_dir': suite_dir,
+        'remote': {
+            'suite_var_dir': '',
+        },
+        'static_collect': static_collect,
+    }
+    modules = {}
+    for module_path in glob(join(suite_dir, 'mock*', 'mock_test_module*.py')):
+        if 'exceptions' in module_path:
+            continue
+        module_name = basename(module_path)[:-3]
+        modules[f'{basename(dirname(module_path))}.{module_name}'] = {
+            'path': module_path,
+            'module_short_name': module_name,
+        }
+    tr = TidenRunner(config, modules=modules, xunit_path=str(var_dir.join('xunit.xml')), collect_only=True)
+    tr.collect_tests()
+    tests = {}
+    for test_name, test in tr.get_tests_results().tests.items():
+        tests[test_name] = dict([(key, value) for key, value in test.items() if key != 'started'])
+    for test_module, test_plan in tr.test_plan.items():
+        for test_name, test_param in test_plan.all_tests.items():
+            tests[f'{test_module}.{test_name}'] = dict([
+                (key, value) for key, value in test_param.items() if not key.endswith('_method')
+            ])
+    return tests, config
+
+
+def test_static_collection_same_as_import(with_dec_classpath, tmpdir):
+    static_tests, config = _collect(tmpdir, 'static', None)
+    assert not [module for module in sys.modules.keys() if module.startswith('suites.mock')]
+    imported_tests, _ = _collect(tmpdir, 'imported', False)
+    assert len(static_tests) > 10
+    assert static_tests == imported_tests
+
+    # manifest is reused while files are not changed
+    collector = StaticCollector.from_config(config)
+    collector._parse_module = None
+    module_path = join(config['suite_dir'], 'mock3', 'mock_test_module_with_decorators.py')
+    test_class = collector.get_test_class('mock3.mock_test_module_with_decorators', module_path,
+                                          'MockTestModuleWithDecorators')
+    assert test_class.test_repeated_test.repeated_test_count == 2
+    assert test_class.test_repeated_test.__setup__.__name__ == 'setup_testcase'
+
+
+def test_static_collection_fallback(tmpdir):
+    module_path = str(tmpdir.join('test_dynamic.py'))
+    collector = StaticCollector(str(tmpdir.join(StaticCollector.manifest_file)))
+
+    tmpdir.join('test_dynamic.py').write(
+        'from tiden.util import attr, skip\n'
+        'from tiden.priority_decorator import test_priority as priority\n'
+        '\n'
+        'class TestDynamic:\n'
+        '    @attr("smoke")\n'
+        '    @priority.LOW(2)\n'
+        '    def test_one(self):\n'
+        '        pass\n'
+        '\n'
+        '    @skip("not ready")\n'
+        '    def test_two(self):\n'
+        '        pass\n'
+    )
+    test_class = collector.get_test_class('suite.test_dynamic', module_path, 'TestDynamic')
+    assert test_class.__module__ == 'suites.suite.test_dynamic'
+    assert test_class.test_one.__attrib__ == ['smoke']
+    assert test_class.test_one.__priority__ == 100002
+    assert test_class.test_two.__skipped_message__ == 'not ready'
+    collector.save()
+    assert StaticCollector(collector.manifest_path).manifest == collector.manifest
+
+    # decorators with side effects, computed arguments and generated tests need import
+    for source in [
+        'from mylib import retry\n\nclass TestDynamic:\n    @retry(3)\n    def test_one(self):\n        pass\n',
+        'from tiden.util import attr\nATTRS = ["a"]\n\nclass TestDynamic:\n'
+        '    @attr(*ATTRS)\n    def test_one(self):\n        pass\n',
+        'class TestDynamic:\n    pass\n\nsetattr(TestDynamic, "test_one", lambda self: None)\n',
+        'from mylib import Base\n\nclass TestDynamic(Base):\n    pass\n',
+    ]:
+        tmpdir.join('test_dynamic.py').write(source)
+        assert collector.get_test_class('suite.test_dynamic', module_path, 'TestDynamic') is None
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from tiden import priority_decorator
+from tiden.priority_decorator import get_priority_key
+from tiden.timingstore import TimingStore
+
+
+class MockTestClass:
+
+    def test_slow(self):
+        pass
+
+    def test_fast(self):
+        pass
+
+    def test_flaky(self):
+        pass
+
+    def test_new(self):
+        pass
+
+    @priority_decorator.test_priority.HIGH
+    def test_first(self):
+        pass
+
+
+def test_timing_store(tmpdir):
+    config = {'var_dir': str(tmpdir)}
+    timing = TimingStore.from_config(config)
+    for duration in range(1, 13):
+        timing.add('suite.test_a', 'test_slow', 'pass', 100 + duration)
+    timing.add('suite.test_a', 'test_fast', 'pass', 10)
+    timing.add('suite.test_a', 'test_flaky', 'fail', 50)
+    timing.add('suite.test_a', 'test_flaky', 'pass', 70)
+    timing.add('suite.test_b', 'test_fast', 'pass', 1)
+
+    # history is persisted and limited
+    timing = TimingStore.from_config(config)
+    assert timing.get_stats()[('suite.test_a', 'test_slow')] == (107.5, 0, 10)
+    assert timing.get_fail_rate('suite.test_a', 'test_flaky') == 0.5
+    assert timing.get_duration('suite.test_a', 'test_new') is None
+
+    # tests without history are predicted by mean of module
+    seconds, unknown = timing.predict('suite.test_a', ['test_slow', 'test_fast', 'test_new'])
+    assert unknown == 1
+    assert seconds == 107.5 + 10 + (107.5 + 10 + 60) / 3
+    assert timing.get_module_duration('suite.test_a') == 107.5 + 10 + 60
+    assert timing.get_module_duration('suite.test_c') is None
+
+    # stats are updated on add
+    timing.add('suite.test_b', 'test_fast', 'pass', 3)
+    assert timing.get_duration('suite.test_b', 'test_fast') == 2
+
+    # fail fast: flaky first, then cheap, never run last, priority is kept
+    tests = sorted(['test_slow', 'test_fast', 'test_flaky', 'test_new', 'test_first'],
+                   key=get_priority_key(MockTestClass(), timing.get_test_key('suite.test_a')))
+    assert tests == ['test_first', 'test_flaky', 'test_fast', 'test_slow', 'test_new']
+    modules = sorted(['suite.test_a', 'suite.test_b', 'suite.test_c'], key=timing.get_module_key())
+    assert modules == ['suite.test_a', 'suite.test_b', 'suite.test_c']
+
+    assert TimingStore.from_config({'var_dir': str(tmpdir), 'timing_db': False}) is None
+    assert TimingStore.from_config({}) is None
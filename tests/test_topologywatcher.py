@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os.path
+
+from tiden.localpool import LocalPool
+from tiden.apps.ignite.topologywatcher import TopologyWatcher
+
+snapshot_line = '[12:00:00,000][INFO][disco-event-worker-#37] Topology snapshot ' \
+                '[ver=%d, locNode=a, servers=%d, clients=0, state=ACTIVE, CPUs=8, offheap=1.0GB, heap=1.0GB]\n'
+
+fatal_errors = {
+    'Out of memory': {'regex': '(.+java.lang.OutOfMemoryError.+)'},
+}
+
+
+def _wait_for(watcher, condition, timeout=10):
+    events_seen = watcher.events_count
+    while not condition():
+        assert watcher.wait_for_events(events_seen, timeout), 'No events from logs watcher'
+        events_seen = watcher.events_count
+
+
+def test_topology_watcher_follows_logs(local_config):
+    pool = LocalPool(local_config['ssh'])
+    pool.connect()
+    host = local_config['ssh']['hosts'][0]
+    home = local_config['environment']['home']
+    host_home = os.path.join(home, host)
+    os.makedirs(host_home, exist_ok=True)
+    # local pool maps remote home to host directory
+    logs = [os.path.join(home, 'grid.%d.log' % i) for i in range(2)]
+    local_logs = [os.path.join(host_home, 'grid.%d.log' % i) for i in range(2)]
+    with open(local_logs[0], 'w') as f:
+        f.write('some line\n' + snapshot_line % (1, 1))
+
+    watcher = TopologyWatcher(pool, fatal_errors)
+    try:
+        watcher.watch({host: logs[:1]})
+        _wait_for(watcher, lambda: len(watcher.get_snapshots(logs[0])) == 1)
+
+        with open(local_logs[0], 'a') as f:
+            f.write(snapshot_line % (2, 2) + 'Exception in thread: java.lang.OutOfMemoryError: heap\n')
+        _wait_for(watcher, lambda: watcher.get_errors(logs[0]))
+        assert watcher.get_errors(logs[0]) == {
+            'Out of memory': 'Exception in thread: java.lang.OutOfMemoryError: heap'
+        }
+        assert watcher.logs[logs[0]]['offset'] == os.path.getsize(local_logs[0])
+
+        # new log restarts host watcher, already read log is resumed from known offset
+        with open(local_logs[1], 'w') as f:
+            f.write(snapshot_line % (2, 2))
+        watcher.watch({host: logs})
+        _wait_for(watcher, lambda: len(watcher.get_snapshots(logs[1])) == 1)
+        with open(local_logs[0], 'a') as f:
+            f.write(snapshot_line % (3, 3))
+        _wait_for(watcher, lambda: len(watcher.get_snapshots(logs[0])) == 3)
+        assert watcher.get_snapshots(logs[0]) == [
+            (snapshot_line % (ver, ver)).rstrip('\n') for ver in range(1, 4)
+        ]
+    finally:
+        watcher.stop()
+
+
+def test_topology_watcher_failure():
+    class MockSsh:
+        def exec_on_host_stream(self, host, command, **kwargs):
+            raise KeyError(host)
+
+    watcher = TopologyWatcher(MockSsh(), fatal_errors)
+    events_seen = watcher.events_count
+    watcher.watch({'host1': ['grid.1.log']})
+    # waiting for events is woken up by failure
+    assert watcher.wait_for_events(events_seen, 10)
+    assert watcher.failed
+    watcher.stop()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from os import makedirs, path, urandom
+from subprocess import run, PIPE, STDOUT
+
+import pytest
+
+from tiden.tidenexception import TidenException
+from tiden.treedistribution import TreeDistribution
+
+
+class MockSsh:
+    """
+    Every host is a directory, commands are run by local shell in the host directory.
+    """
+
+    def __init__(self, root, hosts):
+        self.root = root
+        for host in hosts:
+            makedirs(path.join(root, host), exist_ok=True)
+
+    def exec(self, commands):
+        results = {}
+        for host, host_commands in commands.items():
+            results[host] = [
+                run(command, shell=True, cwd=path.join(self.root, host), stdout=PIPE, stderr=STDOUT).stdout.decode()
+                for command in host_commands
+            ]
+        return results
+
+
+def test_tree_distribution_rounds():
+    hosts = ['host%d' % i for i in range(10)]
+    rounds = TreeDistribution.get_rounds(hosts[:1], hosts)
+    assert len(rounds) == 4
+    assert rounds[0] == {'host1': 'host0'}
+    assert rounds[1] == {'host2': 'host0', 'host3': 'host1'}
+    assert len(rounds[2]) == 4
+    assert sorted(sum([list(r.keys()) for r in rounds], [])) == sorted(hosts[1:])
+
+
+def test_tree_distribution_keeps_target_for_rsync():
+    rsync_command = TreeDistribution(None)._get_hop_command(0, 'artifacts/a.zip', 'host0', 'host1')
+    assert 'rsync host0:artifacts/a.zip artifacts/a.zip' in rsync_command
+    assert 'rm -f' not in rsync_command
+    scp_command = TreeDistribution(None, copy_command=TreeDistribution.scp_command)._get_hop_command(
+        0, 'artifacts/a.zip', 'host0', 'host1')
+    assert "rm -f 'artifacts/a.zip'; " in scp_command
+
+
+def test_tree_distribution(tmpdir):
+    root = str(tmpdir)
+    hosts = ['host%d' % i for i in range(7)]
+    ssh = MockSsh(root, hosts)
+    makedirs(path.join(root, hosts[0], 'artifacts'))
+    data = urandom(100 * 1024)
+    with open(path.join(root, hosts[0], 'artifacts', 'a.zip'), 'wb') as f:
+        f.write(data)
+
+    distribution = TreeDistribution(ssh, copy_command='cp ../{source_host}/{file} {file}')
+    hops = distribution.distribute(['artifacts/a.zip'], hosts[0], hosts[1:])
+    assert len(hops) == 6
+    assert max([hop['round'] for hop in hops]) == 3
+    assert all([hop['size'] == len(data) for hop in hops])
+    for host in hosts[1:]:
+        with open(path.join(root, host, 'artifacts', 'a.zip'), 'rb') as f:
+            assert f.read() == data
+
+    # broken hop is retried from the source host
+    distribution = TreeDistribution(
+        ssh, copy_command='cp ../{source_host}/{file} {file}; [ {source_host} != host1 ] || echo >> {file}'
+    )
+    hops = distribution.distribute(['artifacts/a.zip'], hosts[0], hosts[1:])
+    assert [hop['target'] for hop in hops if hop['round'] == 'retry'] == ['host3', 'host5']
+    with pytest.raises(TidenException):
+        distribution.distribute(['artifacts/missing.zip'], hosts[0], hosts[1:])
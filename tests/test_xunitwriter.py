@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+#
+# Copyright 2017-2020 GridGain Systems.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from time import time
+import xml.etree.ElementTree as ET
+
+from tiden.result import Result
+from tiden.xunitwriter import XUnitWriter
+
+
+def _add_tests(result, statuses):
+    for idx, status in enumerate(statuses):
+        result.current_test = 'suite.test_module.TestModule.test_%d' % idx
+        result.tests_num['total'] += 1
+        result.tests_num[status] += 1
+        result.tests[result.current_test] = {
+            'status': {'pass': 'pass', 'fail': 'fail', 'error': 'errors', 'skip': 'skipped'}[status],
+            'classname': 'suite.test_module.TestModule',
+            'name': 'test_%d(option=%d)' % (idx, idx),
+            'time': str(idx),
+            'xunit_info': {'type': 'AssertionError', 'message': 'line 1\nline 2 <&>'},
+        }
+        result.update_xunit()
+
+
+def test_streaming_report(tmpdir):
+    xunit_path = str(tmpdir.join('xunit.xml'))
+    result = Result(xunit_path=xunit_path)
+    xunit = ET.parse(xunit_path).getroot()
+    assert xunit.attrib['tests'] == '0'
+    assert xunit.findall('testcase') == []
+
+    _add_tests(result, ['pass', 'fail', 'error', 'skip'])
+    # report is valid after every test
+    xunit = ET.parse(xunit_path).getroot()
+    assert [xunit.attrib[name] for name in ['tests', 'failures', 'errors', 'skipped', 'time']] == \
+           ['4', '1', '1', '1', '6']
+    testcases = xunit.findall('testcase')
+    assert [testcase.attrib['name'] for testcase in testcases] == ['test_%d(option=%d)' % (i, i) for i in range(4)]
+    assert testcases[0].find('failure') is None
+    assert testcases[1].find('failure').attrib['message'] == 'line 1\nline 2 <&>'
+    assert testcases[2].find('error') is not None
+    assert testcases[3].find('skipped') is not None
+
+    # counters which do not fit reserved header are written by rewrite of the report
+    result.xunit.update_counters(name='x' * 1000)
+    result.flush_xunit()
+    xunit = ET.parse(xunit_path).getroot()
+    assert xunit.attrib['name'] == 'x' * 1000
+    assert xunit.attrib['tests'] == '4'
+    assert len(xunit.findall('testcase')) == 4
+
+
+def test_recover(tmpdir):
+    xunit_path = str(tmpdir.join('xunit.xml'))
+    result = Result(xunit_path=xunit_path)
+    _add_tests(result, ['pass', 'fail', 'pass'])
+    assert XUnitWriter.recover(xunit_path) is None
+
+    # crash while the next test case is written
+    with open(xunit_path, 'r+b') as report:
+        report.truncate(result.xunit.end + 10)
+    with open(xunit_path + XUnitWriter.journal_suffix, 'ab') as journal:
+        journal.write(b'<testcase classname="suite.test_module.TestModule" na')
+
+    assert XUnitWriter.recover(xunit_path) == 3
+    xunit = ET.parse(xunit_path).getroot()
+    assert [xunit.attrib[name] for name in ['tests', 'failures', 'errors', 'skipped', 'time']] == \
+           ['3', '1', '0', '0', '3']
+    assert len(xunit.findall('testcase')) == 3
+
+
+def test_recover_on_next_run(tmpdir):
+    xunit_path = str(tmpdir.join('xunit.xml'))
+    result = Result(xunit_path=xunit_path)
+    _add_tests(result, ['pass', 'fail'])
+    # run is killed while the report is written
+    with open(xunit_path, 'r+b') as report:
+        report.truncate(result.xunit.end + 10)
+
+    result = Result(xunit_path=xunit_path)
+    assert result.xunit.recovered_path == xunit_path + XUnitWriter.recovered_suffix
+    assert len(ET.parse(result.xunit.recovered_path).getroot().findall('testcase')) == 2
+    assert ET.parse(xunit_path).getroot().findall('testcase') == []
+
+    # journal of the closed report is removed
+    _add_tests(result, ['pass'])
+    result.close_xunit()
+    assert not tmpdir.join('xunit.xml' + XUnitWriter.journal_suffix).exists()
+    assert ET.parse(xunit_path).getroot().attrib['tests'] == '1'
+    assert Result(xunit_path=xunit_path).xunit.recovered_path is None
+
+
+def test_valid_report_is_not_recovered(tmpdir):
+    xunit_path = str(tmpdir.join('xunit.xml'))
+    result = Result(xunit_path=xunit_path)
+    _add_tests(result, ['pass', 'fail'])
+    # run is stopped between test cases, report is valid but its journal is left
+    assert tmpdir.join('xunit.xml' + XUnitWriter.journal_suffix).exists()
+
+    result = Result(xunit_path=xunit_path)
+    assert result.xunit.recovered_path is None
+    assert not tmpdir.join('xunit.xml' + XUnitWriter.recovered_suffix).exists()
+
+
+def test_report_write_is_linear(tmpdir):
+    xunit_path = str(tmpdir.join('xunit.xml'))
+    result = Result(xunit_path=xunit_path)
+    tests_num = 5000
+
+    started = time()
+    _add_tests(result, ['pass'] * tests_num)
+    duration = time() - started
+    print('\n%d test cases written in %.2f sec' % (tests_num, duration))
+
+    xunit = ET.parse(xunit_path).getroot()
+    assert xunit.attrib['tests'] == str(tests_num)
+    assert len(xunit.findall('testcase')) == tests_num
+    assert len(XUnitWriter.read_journal(xunit_path + XUnitWriter.journal_suffix)) == tests_num